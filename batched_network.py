@@ -0,0 +1,160 @@
+"""
+Batched Population Network
+==========================
+
+Compiles every genome of a generation into one padded, layered weight-matrix
+form so a single activate() call evaluates the networks of all living birds
+with a handful of NumPy operations, instead of one FeedForwardNetwork.activate
+dict walk per bird per frame.
+
+The compiled form follows neat.nn.FeedForwardNetwork.create exactly: the same
+nodes, the same link order inside each node and the same tanh clamping, so
+outputs match FeedForwardNetwork for the tanh/sum genomes allowed by
+config-feedforward.txt. The sums and products are bit-identical; only NumPy's
+tanh may differ from math.tanh in the last bit (around 1e-16). Networks are
+pruned first (see pruning.py), which leaves every output bit unchanged.
+"""
+
+import numpy as np
+
+from compact_genome import CompactGenome
+from pruning import prune_network
+
+
+def _network_genes(genome, genome_config):
+    """
+    A genome's enabled connection keys, {connection key: weight} and
+    {node key: (bias, response, activation, aggregation)}.
+    """
+    if isinstance(genome, CompactGenome):
+        layout = genome_config.layout
+        c = genome.connection_genes[genome.connection_genes["enabled"]]
+        connections = list(zip(c["input"].tolist(), c["output"].tolist()))
+        weights = dict(zip(connections, c["weight"].tolist()))
+        n = genome.node_genes
+        nodes = dict(zip(n["key"].tolist(), zip(n["bias"].tolist(), n["response"].tolist(),
+                                                 layout.strings("activation", n["activation"]),
+                                                 layout.strings("aggregation", n["aggregation"]))))
+        return connections, weights, nodes
+    connections = [cg.key for cg in genome.connections.values() if cg.enabled]
+    weights = {key: genome.connections[key].weight for key in connections}
+    nodes = {key: (ng.bias, ng.response, ng.activation, ng.aggregation) for key, ng in genome.nodes.items()}
+    return connections, weights, nodes
+
+
+class BatchedNetwork:
+    """
+    The feed-forward networks of many genomes, evaluated together.
+
+    Every genome gets a row of node-value slots: the inputs first, then the
+    outputs, then its hidden nodes, followed by a slot that always reads 0.0 and
+    a sink slot that padding nodes write to. Layer l of every genome is padded
+    to the same number of nodes and each node to the same number of links, so
+    networks of different depths and widths share one set of arrays.
+
+    sizes holds the total (nodes, enabled connections) of the genomes and
+    (nodes, links) evaluated after pruning.
+    """
+
+    def __init__(self, num_inputs, output_slots, layers, num_slots, sizes=None):
+        self.num_inputs = num_inputs
+        self.output_slots = output_slots
+        self.layers = layers  # list of (dst, bias, response, offset or None, src, weights) arrays
+        self.num_slots = num_slots
+        self.sizes = sizes
+
+    def activate(self, inputs, rows=None):
+        """
+        Evaluate the networks of the given rows (default: all genomes).
+
+        inputs has shape (len(rows), num_inputs); returns the outputs with shape
+        (len(rows), num_outputs).
+        """
+        inputs = np.asarray(inputs, dtype=np.float64)
+        if rows is None:
+            rows = np.arange(inputs.shape[0])
+        if inputs.shape[1] != self.num_inputs:
+            raise RuntimeError("Expected {0:n} inputs, got {1:n}".format(self.num_inputs, inputs.shape[1]))
+
+        values = np.zeros((len(rows), self.num_slots))
+        values[:, :self.num_inputs] = inputs
+        r = np.arange(len(rows))
+
+        for dst, bias, response, offset, src, weights in self.layers:
+            dst = dst[rows]
+            gathered = values[r[:, None, None], src[rows]]
+            weights = weights[rows]
+
+            # Accumulate links one at a time to keep the same summation order as sum()
+            s = np.zeros(dst.shape) if offset is None else offset[rows]
+            for k in range(weights.shape[2]):
+                s = s + gathered[:, :, k] * weights[:, :, k]
+
+            # tanh_activation clamps its scaled argument to [-60, 60]
+            z = bias[rows] + response[rows] * s
+            values[r[:, None], dst] = np.tanh(np.clip(2.5 * z, -60.0, 60.0))
+
+        return values[:, self.output_slots]
+
+    @staticmethod
+    def create(genomes, config):
+        """Receives a list of genomes and returns their batched phenotype."""
+        genome_config = config.genome_config
+        input_keys = genome_config.input_keys
+        output_keys = genome_config.output_keys
+
+        # Compile each genome into per-layer lists of (node, bias, response, offset, links)
+        compiled = []
+        max_slots = 0
+        genome_nodes = genome_links = nodes_kept = links_kept = 0
+        for genome in genomes:
+            slots = {key: i for i, key in enumerate(input_keys + output_keys)}
+            connections, weights, genes = _network_genes(genome, genome_config)
+            layers = prune_network(input_keys, output_keys, connections, weights, genes)
+            for nodes in layers:
+                for node, _, _, _, links in nodes:
+                    slots.setdefault(node, len(slots))
+                    links_kept += len(links)
+                nodes_kept += len(nodes)
+            genome_nodes += len(genes)
+            genome_links += len(connections)
+            compiled.append((slots, layers))
+            max_slots = max(max_slots, len(slots))
+
+        zero_slot = max_slots
+        sink_slot = max_slots + 1
+        num_genomes = len(compiled)
+        depth = max((len(layers) for _, layers in compiled), default=0)
+
+        batched_layers = []
+        for l in range(depth):
+            width = max((len(layers[l]) for _, layers in compiled if l < len(layers)), default=0)
+            fan_in = max((len(links) for _, layers in compiled if l < len(layers)
+                          for *_, links in layers[l]), default=0)
+
+            dst = np.full((num_genomes, width), sink_slot, dtype=np.int64)
+            bias = np.zeros((num_genomes, width))
+            response = np.zeros((num_genomes, width))
+            offset = np.zeros((num_genomes, width))
+            src = np.full((num_genomes, width, fan_in), zero_slot, dtype=np.int64)
+            weights = np.zeros((num_genomes, width, fan_in))
+
+            for g, (slots, layers) in enumerate(compiled):
+                if l >= len(layers):
+                    continue
+                for j, (node, node_bias, node_response, node_offset, links) in enumerate(layers[l]):
+                    dst[g, j] = slots[node]
+                    bias[g, j] = node_bias
+                    response[g, j] = node_response
+                    offset[g, j] = node_offset
+                    for k, (inode, weight) in enumerate(links):
+                        src[g, j, k] = slots[inode]
+                        weights[g, j, k] = weight
+
+            # Most layers fold no constants, and start their sums from zeros
+            batched_layers.append((dst, bias, response, offset if offset.any() else None, src, weights))
+
+        num_inputs = len(input_keys)
+        output_slots = np.arange(num_inputs, num_inputs + len(output_keys))
+        return BatchedNetwork(num_inputs, output_slots, batched_layers, max_slots + 2,
+                              ((genome_nodes, genome_links), (nodes_kept, links_kept)))
@@ -0,0 +1,440 @@
+"""
+Benchmark Suite
+===============
+
+Reproducible throughput benchmarks for the training hot path:
+
+- simulation: bird-steps per second of PopulationSimulator
+- activation: network activations per second of BatchedNetwork
+- collision: bird-vs-pipe collision checks per second of the sprite collider;
+  once, PIPE_COLLIDE_BIRDS Bird objects against Pipe.collide with the cached
+  masks and with masks built for every check as before the cache
+- rendering: frames per second of draw_window (SDL dummy video driver)
+- generation: wall time of one headless generation (capped episode), on one
+  and on MULTI_COURSES courses per genome
+- speciation: wall time of speciating a population from scratch
+- policy: observations per second of a compiled winner policy (policy.py)
+  against neat's FeedForwardNetwork, on a batch of that size; single
+  observation latency and artifact load time are measured once
+- import: time to import the modules in a fresh interpreter
+- solve (with --solve): generations until the champion genome reaches the
+  fitness threshold on held-out courses, for several courses per genome
+
+Everything runs headless on fixed seeds, at several population sizes. Results
+are written as JSON and can be compared against a stored baseline; the run
+fails when a metric regresses by more than the threshold.
+
+Usage:
+    python benchmarks.py --output results.json
+    python benchmarks.py --baseline results.json --threshold 0.15
+    python benchmarks.py --sizes 1000 --solve 5 --solve-courses 1 3 5
+"""
+
+import os
+
+# Render without a window; must be set before pygame is imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import neat
+import pygame
+
+import flappy_bird
+import neat_config
+from batched_network import BatchedNetwork
+from course import course_seeds, get_course
+from policy import Policy, compile_genome
+from simulation import PopulationSimulator
+from speciation import VectorizedSpeciesSet
+
+LOCAL_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(LOCAL_DIR, "config-feedforward.txt")
+DEFAULT_SIZES = [100, 1000, 5000]
+SEED = 1234
+EPISODE_FRAMES = 500  # Frame cap of the generation benchmark
+MULTI_COURSES = 4  # Courses per genome in the multi-course generation benchmark
+SOLVE_FRAMES = 1500  # Frame cap of training and validation episodes in the solve benchmark
+VALIDATION_COURSES = 10
+VALIDATION_SEED = 10**7  # Held-out courses, never flown in training
+PIPE_COLLIDE_BIRDS = 1000  # Birds in the Pipe.collide benchmark
+IMPORTED_MODULES = ["simulation", "flappy_bird", "game"]
+
+
+def load_config():
+    return neat_config.load_config(CONFIG_PATH, species_set_type=VectorizedSpeciesSet)
+
+
+def make_genomes(config, size, mutations=10, seed=SEED):
+    """size genomes with a few rounds of mutation, so networks have hidden nodes."""
+    random.seed(seed)
+    genomes = []
+    for key in range(1, size + 1):
+        genome = config.genome_type(key)
+        genome.configure_new(config.genome_config)
+        for _ in range(mutations):
+            genome.mutate(config.genome_config)
+        genomes.append(genome)
+    return genomes
+
+
+def best_time(function, repeat):
+    """Smallest wall time of repeat calls to function(), after one warm-up call."""
+    function()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def hovering_jumps(sim, rng):
+    """Jump decisions that keep most birds alive around the middle of the screen."""
+    return sim.y > rng.normal(350, 60, sim.size)
+
+
+def new_simulator(size):
+    sim = PopulationSimulator(
+        size, flappy_bird.ASSETS.sprite_collider,
+        bird_height=flappy_bird.ASSETS.bird_imgs[0].get_height(),
+        pipe_width=flappy_bird.ASSETS.pipe_img.get_width(),
+        pipe_height=flappy_bird.ASSETS.pipe_img.get_height(),
+    )
+    sim.reset(SEED)
+    return sim
+
+
+def bench_simulation(size, repeat):
+    """Bird-steps per second over the first frames of an episode."""
+    def episode():
+        rng = np.random.default_rng(SEED)
+        sim = new_simulator(size)
+        for _ in range(200):
+            if sim.done:
+                break
+            sim.step(hovering_jumps(sim, rng))
+        return sim
+
+    steps = episode().bird_steps
+    return {"simulation.bird_steps_per_s": steps / best_time(episode, repeat)}
+
+
+def bench_activation(config, size, repeat):
+    """Network activations per second for a batch of mutated genomes."""
+    nets = BatchedNetwork.create(make_genomes(config, size), config)
+    inputs = np.random.default_rng(SEED).uniform(-1, 1, (size, 4))
+    rows = np.arange(size)
+    frames = 20
+
+    def activate():
+        for _ in range(frames):
+            nets.activate(inputs, rows)
+
+    return {"activation.activations_per_s": size * frames / best_time(activate, repeat)}
+
+
+def bench_collision(size, repeat):
+    """Collision checks per second with birds spread over a pipe's height."""
+    collide = flappy_bird.ASSETS.sprite_collider
+    rng = np.random.default_rng(SEED)
+    ys = rng.uniform(0, 680, size)
+    frames = rng.integers(0, 3, size)
+    # Pipe positions sweeping past the birds, including the overlapping range
+    positions = [(x, int(h)) for x in range(120, 280, 8) for h in rng.integers(50, 450, 2)]
+
+    def check():
+        for pipe_x, pipe_height in positions:
+            collide(pipe_x, pipe_height, ys, frames)
+
+    return {"collision.checks_per_s": size * len(positions) / best_time(check, repeat)}
+
+
+def uncached_collide(pipe, bird):
+    """Pipe.collide as it was before the mask cache: every check builds three masks."""
+    bird_mask = pygame.mask.from_surface(bird.img)
+    top_mask = pygame.mask.from_surface(flappy_bird.ASSETS.pipe_top_img)
+    bottom_mask = pygame.mask.from_surface(flappy_bird.ASSETS.pipe_img)
+    top_offset = (pipe.x - bird.x, pipe.top - round(bird.y))
+    bottom_offset = (pipe.x - bird.x, pipe.bottom - round(bird.y))
+    return bird_mask.overlap(top_mask, top_offset) or bird_mask.overlap(bottom_mask, bottom_offset)
+
+
+def bench_pipe_collide(repeat, size=PIPE_COLLIDE_BIRDS):
+    """Pipe.collide checks per second for size birds, with cached and with per-check masks."""
+    assets = flappy_bird.ASSETS
+    rng = np.random.default_rng(SEED)
+    birds = []
+    for y, frame in zip(rng.uniform(0, 680, size), rng.integers(0, 3, size)):
+        bird = flappy_bird.Bird(PopulationSimulator.BIRD_X, y)
+        bird.img = assets.bird_imgs[frame]
+        birds.append(bird)
+    # Pipes overlapping the birds, where every check reaches the pixel test
+    pipes = [flappy_bird.Pipe(x, int(h)) for x in (190, 250) for h in rng.integers(50, 450, 2)]
+
+    def check(collide):
+        return [collide(pipe, bird) is not None for pipe in pipes for bird in birds]
+
+    if check(flappy_bird.Pipe.collide) != check(uncached_collide):
+        raise RuntimeError("Cached and per-check collision masks disagree")
+    checks = size * len(pipes)
+    return {"collision.pipe_collide_per_s": checks / best_time(lambda: check(flappy_bird.Pipe.collide), repeat),
+            "collision.pipe_collide_uncached_per_s": checks / best_time(lambda: check(uncached_collide), repeat)}
+
+
+def bench_rendering(size, repeat):
+    """draw_window frames per second with size birds alive."""
+    win = pygame.display.set_mode((flappy_bird.WINDOW_WIDTH, flappy_bird.WINDOW_HEIGHT))
+    flappy_bird.ASSETS.convert()
+    base = flappy_bird.Base(730)
+    rng = np.random.default_rng(SEED)
+    sim = new_simulator(size)
+    for _ in range(40):
+        sim.step(hovering_jumps(sim, rng))
+    frames = 20
+
+    def draw():
+        for _ in range(frames):
+            flappy_bird.draw_window(win, sim, base, 1)
+
+    return {"rendering.frames_per_s": frames / best_time(draw, repeat),
+            "rendering.birds_alive": float(sim.alive_indices().size)}
+
+
+def bench_generation(config, size, repeat):
+    """
+    Wall time of one headless generation, capped at EPISODE_FRAMES frames, on
+    one course and on MULTI_COURSES courses per genome.
+    """
+    genomes = make_genomes(config, size, mutations=3)
+    courses = [get_course(seed) for seed in course_seeds(SEED, 0, MULTI_COURSES)]
+
+    def generation(course):
+        return lambda: flappy_bird.simulate_episode(genomes, config, course, max_frames=EPISODE_FRAMES)
+
+    return {"generation.wall_s": best_time(generation(courses[0]), repeat),
+            "generation.multi_course_wall_s": best_time(generation(courses), repeat)}
+
+
+def bench_speciation(config, size, repeat):
+    """Wall time of speciating a fresh population from scratch."""
+    population = {g.key: g for g in make_genomes(config, size)}
+
+    def speciate():
+        species_set = config.species_set_type(config.species_set_config, neat.reporting.ReporterSet())
+        species_set.speciate(config, population, 0)
+
+    return {"speciation.wall_s": best_time(speciate, repeat)}
+
+
+def policy_genome(config):
+    """The largest of a few mutated genomes, standing in for a trained winner."""
+    return max(make_genomes(config, 50), key=lambda g: g.size())
+
+
+def bench_policy(config, size, repeat):
+    """Observations per second of a compiled policy and of FeedForwardNetwork on size observations."""
+    genome = policy_genome(config)
+    policy = compile_genome(genome, config)
+    net = neat.nn.FeedForwardNetwork.create(genome, config)
+    observations = np.random.default_rng(SEED).uniform(-1, 1, (size, 4))
+    rows = observations.tolist()
+
+    def activate_feed_forward():
+        for row in rows:
+            net.activate(row)
+
+    return {"policy.batch_per_s": size / best_time(lambda: policy.activate_batch(observations), repeat),
+            "policy.feed_forward_per_s": size / best_time(activate_feed_forward, repeat)}
+
+
+def bench_policy_latency(config, repeat, calls=2000):
+    """Microseconds per single-observation call, and seconds to load a saved policy."""
+    genome = policy_genome(config)
+    policy = compile_genome(genome, config)
+    net = neat.nn.FeedForwardNetwork.create(genome, config)
+    observation = np.random.default_rng(SEED).uniform(-1, 1, 4).tolist()
+
+    def single(function):
+        def call():
+            for _ in range(calls):
+                function(observation)
+        return best_time(call, repeat) / calls * 1e6
+
+    # Saved outside the project folder, so an interrupted run leaves nothing behind
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "policy.npz")
+        policy.save(path)
+        load_s = best_time(lambda: Policy.load(path), repeat)
+    return {"policy.latency_us": single(policy.activate),
+            "policy.feed_forward_latency_us": single(net.activate),
+            "policy.load_s": load_s}
+
+
+def generations_to_solve(config, courses, run, max_generations, aggregate="mean"):
+    """
+    Train one population with every genome flying courses seeded courses per
+    generation, until the best genome of a generation averages at least the
+    config's fitness_threshold on VALIDATION_COURSES held-out courses.
+    Returns (generations, wall time); generations is None if not solved.
+    """
+    random.seed(run)
+    population = neat.Population(config)
+    validation = [get_course(VALIDATION_SEED + i) for i in range(VALIDATION_COURSES)]
+    base_seed = SEED + run * 100000
+
+    def evaluate(genomes, config):
+        seeds = course_seeds(base_seed, population.generation, courses)
+        ge = [g for _, g in genomes]
+        sim = flappy_bird.simulate_episode(ge, config, [get_course(s) for s in seeds], max_frames=SOLVE_FRAMES,
+                                           aggregate=aggregate)
+        for g, fitness in zip(ge, sim.genome_fitness.tolist()):
+            g.fitness = fitness
+
+    start = time.perf_counter()
+    for generation in range(1, max_generations + 1):
+        best = population.run(evaluate, 1)
+        sim = flappy_bird.simulate_episode([best], config, validation, max_frames=SOLVE_FRAMES)
+        if sim.genome_fitness[0] >= config.fitness_threshold:
+            return generation, time.perf_counter() - start
+    return None, time.perf_counter() - start
+
+
+def bench_solve(runs, course_counts, max_generations):
+    """Mean generations and wall time to solve over runs seeds, per number of courses."""
+    config = load_config()
+    config.no_fitness_termination = True  # Solved is judged on the held-out courses
+    results = {}
+    for courses in course_counts:
+        outcomes = [generations_to_solve(config, courses, run, max_generations) for run in range(runs)]
+        solved = [generations for generations, _ in outcomes if generations is not None]
+        # Unsolved runs count as max_generations, so the mean is a lower bound
+        generations = [max_generations if g is None else g for g, _ in outcomes]
+        results["solve.generations[courses={0}]".format(courses)] = float(np.mean(generations))
+        results["solve.solved_fraction[courses={0}]".format(courses)] = len(solved) / runs
+        results["solve.wall_s[courses={0}]".format(courses)] = float(np.mean([t for _, t in outcomes]))
+    return results
+
+
+def bench_imports(repeat):
+    """Seconds to import each module in a fresh interpreter (best of repeat)."""
+    results = {}
+    for module in IMPORTED_MODULES:
+        code = "import time; t = time.perf_counter(); import {0}; print(time.perf_counter() - t)".format(module)
+        times = []
+        for _ in range(repeat):
+            output = subprocess.run([sys.executable, "-c", code], cwd=LOCAL_DIR, env=os.environ,
+                                    capture_output=True, text=True, check=True).stdout
+            times.append(float(output.split()[-1]))
+        results["import.{0}_s".format(module)] = min(times)
+    return results
+
+
+def run_benchmarks(sizes, repeat, solve_runs=0, solve_courses=(1,), max_generations=50):
+    """Run every benchmark at every size; returns {metric name: value}."""
+    config = load_config()
+    results = {}
+    for size in sizes:
+        for metrics in (bench_simulation(size, repeat),
+                        bench_activation(config, size, repeat),
+                        bench_collision(size, repeat),
+                        bench_rendering(size, repeat),
+                        bench_generation(config, size, repeat),
+                        bench_speciation(config, size, repeat),
+                        bench_policy(config, size, repeat)):
+            for name, value in metrics.items():
+                results["{0}[pop={1}]".format(name, size)] = value
+    results.update(bench_pipe_collide(repeat))
+    results.update(bench_policy_latency(config, repeat))
+    results.update(bench_imports(repeat))
+    if solve_runs:
+        results.update(bench_solve(solve_runs, solve_courses, max_generations))
+    return results
+
+
+def higher_is_better(metric):
+    return "_per_s" in metric or "solved_fraction" in metric
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare results with baseline metrics. Returns the list of regressions:
+    throughputs that dropped, or times that grew, by more than threshold.
+    """
+    regressions = []
+    for metric, value in results.items():
+        if metric not in baseline or metric.startswith("rendering.birds_alive"):
+            continue
+        old = baseline[metric]
+        change = (value - old) / old if old else 0.0
+        worse = -change if higher_is_better(metric) else change
+        flag = "REGRESSION" if worse > threshold else ""
+        print(f"{metric:48s} {old:14.4g} -> {value:14.4g} ({change:+7.1%}) {flag}")
+        if flag:
+            regressions.append(metric)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark simulation, activation, collision and rendering")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="population sizes to benchmark (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="repetitions per benchmark; the best time is kept (default: 3)")
+    parser.add_argument("--output", metavar="FILE", help="write the results as JSON to FILE")
+    parser.add_argument("--baseline", metavar="FILE", help="compare against results stored in FILE")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="relative slowdown counted as a regression (default: 0.15)")
+    parser.add_argument("--solve", type=int, default=0, metavar="RUNS",
+                        help="also measure generations-to-solve over RUNS training runs (default: off)")
+    parser.add_argument("--solve-courses", type=int, nargs="+", default=[1, 3, 5],
+                        help="courses per genome compared by --solve (default: %(default)s)")
+    parser.add_argument("--max-generations", type=int, default=50,
+                        help="generations before a --solve run counts as unsolved (default: 50)")
+    args = parser.parse_args()
+
+    os.chdir(LOCAL_DIR)  # Assets are loaded relative to the project folder
+    results = run_benchmarks(args.sizes, args.repeat, args.solve, args.solve_courses, args.max_generations)
+    for metric, value in results.items():
+        print(f"{metric:48s} {value:14.4g}")
+
+    if args.output:
+        report = {
+            "meta": {
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "pygame": pygame.version.ver,
+                "platform": platform.platform(),
+                "sizes": args.sizes,
+                "repeat": args.repeat,
+                "seed": SEED,
+                "solve_runs": args.solve,
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        print(f"\nComparison with {args.baseline} (threshold {args.threshold:.0%}):")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+        print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+Resumable Checkpointing
+=======================
+
+A NEAT reporter that periodically saves the full evolution state - population,
+species, generation counter, innovation counters, random state and the
+StatisticsReporter history - so long training runs survive crashes and
+pre-emption.
+
+Genomes are stored with genome_codec as flat arrays rather than pickled gene
+objects, the whole state is xz-compressed, and compression and file writing
+happen on a background thread so training does not wait for the disk. Only the
+last few checkpoints are kept.
+"""
+
+import glob
+import lzma
+import os
+import pickle
+import queue
+import random
+import re
+import threading
+import time
+from itertools import count
+
+import numpy as np
+import neat
+from neat.reporting import BaseReporter, ReporterSet
+from neat.species import Species
+
+from genome_codec import decode_genomes, encode_genomes
+
+CHECKPOINT_FORMAT = 1
+
+
+def _next_value(owner, attribute, default):
+    """
+    The next value of the itertools.count stored as owner.attribute (default if
+    it is None). The counter is replaced by a new one starting at that value,
+    so the value is not used up.
+    """
+    counter = getattr(owner, attribute)
+    if counter is None:
+        return default
+    value = next(counter)
+    setattr(owner, attribute, count(value))
+    return value
+
+
+def _optional(values):
+    """Float array with NaN standing in for None."""
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+def _ragged(lists, dtype):
+    """Encode a list of lists as (offsets, flat values)."""
+    offsets = np.concatenate(([0], np.cumsum([len(x) for x in lists], dtype=np.int64)))
+    values = np.array([v for x in lists for v in x], dtype=dtype)
+    return offsets, values
+
+
+def _unragged(offsets, values):
+    offsets = offsets.tolist()
+    values = values.tolist()
+    return [values[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+
+def snapshot(config, population, species_set, generation, stats=None, extra=None):
+    """
+    Capture the evolution state after a finished generation as plain data.
+
+    generation is the generation that just ended; a restored run continues with
+    the next one. The snapshot shares nothing with the live objects, so it can
+    be written out on another thread.
+    """
+    genome_config = config.genome_config
+    genomes = encode_genomes(list(population.values()), genome_config)
+    node_keys = genomes["node_key"]
+    species = list(species_set.species.values())
+    member_offsets, member_keys = _ragged([list(s.members) for s in species], np.int64)
+    history_offsets, history = _ragged([s.fitness_history for s in species], np.float64)
+
+    state = {
+        "format": CHECKPOINT_FORMAT,
+        "generation": generation + 1,
+        "random_state": random.getstate(),
+        "next_node_key": _next_value(genome_config, "node_indexer", int(node_keys.max(initial=0)) + 1),
+        "next_species_key": _next_value(species_set, "indexer", max(species_set.species, default=0) + 1),
+        "population": genomes,
+        "species": {
+            "key": np.array([s.key for s in species], dtype=np.int64),
+            "created": np.array([s.created for s in species], dtype=np.int64),
+            "last_improved": np.array([s.last_improved for s in species], dtype=np.int64),
+            "representative": np.array([s.representative.key for s in species], dtype=np.int64),
+            "fitness": _optional([s.fitness for s in species]),
+            "adjusted_fitness": _optional([s.adjusted_fitness for s in species]),
+            "member_offsets": member_offsets,
+            "member_keys": member_keys,
+            "history_offsets": history_offsets,
+            "history": history,
+        },
+        "extra": dict(extra or {}),
+    }
+
+    if stats is not None:
+        # generation_statistics is a list of {species id: {genome id: fitness}}
+        rows = [(i, sid, gid, f) for i, gen in enumerate(stats.generation_statistics)
+                for sid, members in gen.items() for gid, f in members.items()]
+        state["stats"] = {
+            "most_fit_genomes": encode_genomes(stats.most_fit_genomes, genome_config),
+            "generations": len(stats.generation_statistics),
+            "generation": np.array([r[0] for r in rows], dtype=np.int64),
+            "species": np.array([r[1] for r in rows], dtype=np.int64),
+            "genome": np.array([r[2] for r in rows], dtype=np.int64),
+            "fitness": _optional([r[3] for r in rows]),
+        }
+    return state
+
+
+def save_checkpoint(state, filename):
+    """Compress and atomically write a snapshot."""
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    payload = lzma.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL), preset=1)
+    temporary = filename + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(payload)
+    os.replace(temporary, filename)
+
+
+def restore_checkpoint(filename, config, stats=None):
+    """
+    Rebuild a neat.Population from a checkpoint written by AsyncCheckpointer.
+
+    If stats (a fresh StatisticsReporter) is given, its history is restored too.
+    Returns (population, extra), where extra is the dict passed to the
+    checkpointer (for example the course seed).
+    """
+    with open(filename, "rb") as f:
+        state = pickle.loads(lzma.decompress(f.read()))
+    if state.get("format") != CHECKPOINT_FORMAT:
+        raise ValueError("Unsupported checkpoint format in {0}".format(filename))
+
+    genome_config = config.genome_config
+    genomes = decode_genomes(state["population"], genome_config, config.genome_type)
+    population = {g.key: g for g in genomes}
+
+    # Species, with representatives and members pointing at the restored genomes
+    data = state["species"]
+    species_set = config.species_set_type(config.species_set_config, ReporterSet())
+    members = _unragged(data["member_offsets"], data["member_keys"])
+    histories = _unragged(data["history_offsets"], data["history"])
+    for i, sid in enumerate(data["key"].tolist()):
+        s = Species(sid, int(data["created"][i]))
+        s.last_improved = int(data["last_improved"][i])
+        s.update(population[int(data["representative"][i])], {gid: population[gid] for gid in members[i]})
+        s.fitness = None if np.isnan(data["fitness"][i]) else float(data["fitness"][i])
+        s.adjusted_fitness = None if np.isnan(data["adjusted_fitness"][i]) else float(data["adjusted_fitness"][i])
+        s.fitness_history = histories[i]
+        species_set.species[sid] = s
+        for gid in members[i]:
+            species_set.genome_to_species[gid] = sid
+    species_set.indexer = count(state["next_species_key"])
+
+    p = neat.Population(config, (population, species_set, state["generation"]))
+    species_set.reporters = p.reporters
+
+    # Continue the innovation counters so new genomes and nodes get fresh keys
+    p.reproduction.genome_indexer = count(max(population, default=0) + 1)
+    p.reproduction.ancestors = {gid: tuple() for gid in population}
+    genome_config.node_indexer = count(state["next_node_key"])
+    random.setstate(state["random_state"])
+
+    if stats is not None and "stats" in state:
+        data = state["stats"]
+        stats.most_fit_genomes = decode_genomes(data["most_fit_genomes"], genome_config, config.genome_type)
+        stats.generation_statistics = [{} for _ in range(data["generations"])]
+        for gen, sid, gid, fitness in zip(data["generation"].tolist(), data["species"].tolist(),
+                                          data["genome"].tolist(), data["fitness"].tolist()):
+            stats.generation_statistics[gen].setdefault(sid, {})[gid] = fitness
+
+    return p, state["extra"]
+
+
+def checkpoint_files(filename_prefix):
+    """
+    Paths of the checkpoints written with filename_prefix, by any run, oldest
+    first: by modification time, then generation.
+    """
+    files = []
+    for path in glob.glob(glob.escape(filename_prefix) + "*.ckpt"):
+        match = re.fullmatch(r"(\d+)\.ckpt", path[len(filename_prefix):])
+        if match:
+            try:
+                files.append((os.path.getmtime(path), int(match.group(1)), path))
+            except OSError:
+                pass  # Removed meanwhile
+    return [path for _, _, path in sorted(files)]
+
+
+def latest_checkpoint(filename_prefix):
+    """
+    Path of the most recently written checkpoint with filename_prefix, or None.
+    That is the newest run's, even when an older run got to later generations.
+    """
+    files = checkpoint_files(filename_prefix)
+    return files[-1] if files else None
+
+
+class AsyncCheckpointer(BaseReporter):
+    """
+    Saves a checkpoint every generation_interval generations on a background thread.
+
+    The snapshot is taken synchronously at the end of a generation (cheap: the
+    genomes are copied into arrays); compression and writing happen on the
+    writer thread. Only the newest keep_last checkpoint files under
+    filename_prefix are kept, counting files left by earlier or interrupted
+    runs as the oldest.
+    """
+
+    def __init__(self, generation_interval=5, keep_last=3, filename_prefix="checkpoints/neat-checkpoint-",
+                 stats=None, extra=None):
+        self.generation_interval = generation_interval
+        self.keep_last = keep_last
+        self.filename_prefix = filename_prefix
+        self.stats = stats
+        self.extra = extra or {}
+        self.current_generation = None
+        self.written = checkpoint_files(filename_prefix)
+        self._queue = queue.Queue(maxsize=2)
+        self._thread = threading.Thread(target=self._write_loop, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def start_generation(self, generation):
+        self.current_generation = generation
+
+    def end_generation(self, config, population, species_set):
+        if (self.current_generation + 1) % self.generation_interval:
+            return
+        start = time.perf_counter()
+        state = snapshot(config, population, species_set, self.current_generation, self.stats, self.extra)
+        filename = "{0}{1}.ckpt".format(self.filename_prefix, self.current_generation)
+        self._queue.put((filename, state))
+        print("Checkpoint of generation {0} queued for {1} ({2:.3f}s snapshot)".format(
+            self.current_generation, filename, time.perf_counter() - start))
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            filename, state = item
+            try:
+                save_checkpoint(state, filename)
+            except OSError as e:
+                print("Could not write checkpoint {0}: {1}".format(filename, e))
+                continue
+            # Rewriting a file an earlier run left makes it the newest
+            if filename in self.written:
+                self.written.remove(filename)
+            self.written.append(filename)
+            while len(self.written) > self.keep_last:
+                old = self.written.pop(0)
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+
+    def close(self):
+        """Wait for queued checkpoints to be written and stop the writer thread."""
+        self._queue.put(None)
+        self._thread.join()
@@ -0,0 +1,549 @@
+"""
+Compact Genomes
+===============
+
+An array-backed drop-in for neat.DefaultGenome for very large populations.
+
+DefaultGenome keeps every node and connection gene as its own Python object
+with its own attribute dict, in a dict per genome: a few hundred bytes per gene,
+and slow to pickle or copy. CompactGenome is a __slots__ object holding two
+NumPy structured arrays, one row per node gene and one per connection gene, in
+insertion order, with a typed column for the key and for every gene attribute
+(string attributes such as activation are one-byte codes into the config's
+options). A genome with a handful of genes takes a few hundred bytes in total
+and pickles as two flat buffers.
+
+Mutation and crossover work directly on the arrays, with the same
+probabilities as DefaultGenome; random numbers still come from the random
+module, so runs are reproducible under random.seed and resume exactly from a
+checkpoint. distance() is bit-identical to DefaultGenome.distance on the same
+genes.
+
+Load the config with neat_config.load_config(path, CompactGenome); it reads
+the same [DefaultGenome] config section. For code that expects gene objects,
+nodes and connections still return dicts of DefaultNodeGene/DefaultConnectionGene,
+built on demand; assign such dicts back to change a genome's genes.
+
+Pickles hold only the key, fitness and the two arrays: the gene layout is
+shared by every genome of a config and rebuilt from it. Methods that take the
+config attach it again; call bind(config.genome_config) on an unpickled genome
+before using nodes, connections or print().
+"""
+
+import random
+import sys
+
+import numpy as np
+from neat.attributes import BoolAttribute, FloatAttribute, StringAttribute
+from neat.genes import DefaultConnectionGene, DefaultNodeGene
+from neat.genome import DefaultGenome, DefaultGenomeConfig
+from neat.graphs import creates_cycle
+
+
+def _column_type(attribute):
+    if isinstance(attribute, FloatAttribute):
+        return np.float64
+    if isinstance(attribute, BoolAttribute):
+        return np.bool_
+    if isinstance(attribute, StringAttribute):
+        return np.uint8
+    raise TypeError("Cannot store gene attribute {0!r} in an array".format(attribute.name))
+
+
+def gene_keys(genes):
+    """
+    Keys of a node or connection gene array as int64, one per gene; an
+    (input, output) connection key becomes input * 2**32 + output.
+    """
+    if "key" in genes.dtype.names:
+        return genes["key"].astype(np.int64)
+    return genes["input"].astype(np.int64) * 2**32 + genes["output"]
+
+
+def _match(keys, other_keys):
+    """For each key, its index in other_keys and whether it is there at all."""
+    if not other_keys.size:
+        return np.zeros(keys.size, dtype=np.int64), np.zeros(keys.size, dtype=bool)
+    order = np.argsort(other_keys, kind="stable")
+    positions = np.minimum(np.searchsorted(other_keys[order], keys), other_keys.size - 1)
+    index = order[positions]
+    return index, other_keys[index] == keys
+
+
+class GeneLayout:
+    """
+    Array dtypes of a config's node and connection genes, and the options list
+    behind every string attribute's codes. Shared by all genomes of a config.
+    """
+
+    def __init__(self, genome_config):
+        self.node_gene_type = genome_config.node_gene_type
+        self.connection_gene_type = genome_config.connection_gene_type
+        self.node_attributes = list(self.node_gene_type._gene_attributes)
+        self.connection_attributes = list(self.connection_gene_type._gene_attributes)
+        self.node_dtype = np.dtype([("key", np.int32)]
+                                   + [(a.name, _column_type(a)) for a in self.node_attributes])
+        self.connection_dtype = np.dtype([("input", np.int32), ("output", np.int32)]
+                                         + [(a.name, _column_type(a)) for a in self.connection_attributes])
+
+        self.vocabulary = {}
+        for a in self.node_attributes + self.connection_attributes:
+            if isinstance(a, StringAttribute):
+                options = list(getattr(genome_config, a.options_name))
+                default = getattr(genome_config, a.default_name)
+                if default.lower() not in ("none", "random") and default not in options:
+                    options.append(default)
+                if len(options) > 255:
+                    raise ValueError("Too many {0} options to store as one-byte codes".format(a.name))
+                self.vocabulary[a.name] = options
+        self.codes = {name: {value: code for code, value in enumerate(options)}
+                      for name, options in self.vocabulary.items()}
+
+    def strings(self, name, codes):
+        """The string values of a column of codes."""
+        options = self.vocabulary[name]
+        return [options[code] for code in codes.tolist()]
+
+    def to_array(self, genes, connections=False):
+        """A gene array holding a dict of gene objects, in dict order."""
+        array = np.zeros(len(genes), dtype=self.connection_dtype if connections else self.node_dtype)
+        keys = list(genes)
+        if connections:
+            array["input"] = [k[0] for k in keys]
+            array["output"] = [k[1] for k in keys]
+        else:
+            array["key"] = keys
+        for a in (self.connection_attributes if connections else self.node_attributes):
+            values = [getattr(gene, a.name) for gene in genes.values()]
+            if a.name in self.codes:
+                codes = self.codes[a.name]
+                values = [codes.setdefault(v, len(codes)) for v in values]
+                self.vocabulary[a.name] = list(codes)
+            array[a.name] = values
+        return array
+
+    def to_genes(self, array, connections=False):
+        """The dict of gene objects an array holds."""
+        if connections:
+            keys = list(zip(array["input"].tolist(), array["output"].tolist()))
+            gene_type, attributes = self.connection_gene_type, self.connection_attributes
+        else:
+            keys = array["key"].tolist()
+            gene_type, attributes = self.node_gene_type, self.node_attributes
+        columns = [(a.name, self.strings(a.name, array[a.name]) if a.name in self.codes
+                    else array[a.name].tolist()) for a in attributes]
+        genes = {}
+        for i, key in enumerate(keys):
+            gene = gene_type(key)
+            for name, values in columns:
+                setattr(gene, name, values[i])
+            genes[key] = gene
+        return genes
+
+    def initial(self, dtype, attributes, count, config):
+        """count new genes with freshly initialized attributes (keys left zero)."""
+        genes = np.zeros(count, dtype=dtype)
+        for a in attributes:
+            if isinstance(a, FloatAttribute):
+                genes[a.name] = _initial_floats(a, config, count)
+            elif isinstance(a, BoolAttribute):
+                default = str(getattr(config, a.default_name)).lower()
+                if default in ("1", "on", "yes", "true"):
+                    genes[a.name] = True
+                elif default in ("0", "off", "no", "false"):
+                    genes[a.name] = False
+                elif default in ("random", "none"):
+                    genes[a.name] = _random(count) < 0.5
+                else:
+                    raise RuntimeError("Unknown default value {!r} for {!s}".format(default, a.name))
+            else:
+                default = getattr(config, a.default_name)
+                if default.lower() in ("none", "random"):
+                    genes[a.name] = self._random_codes(a, config, count)
+                else:
+                    genes[a.name] = self.codes[a.name][default]
+        return genes
+
+    def _random_codes(self, attribute, config, count):
+        codes = [self.codes[attribute.name][o] for o in getattr(config, attribute.options_name)]
+        return np.array([random.choice(codes) for _ in range(count)], dtype=np.uint8)
+
+    def mutate(self, genes, attributes, config):
+        """Mutate every attribute of every gene in place, like BaseGene.mutate."""
+        count = len(genes)
+        if not count:
+            return
+        for a in attributes:
+            values = genes[a.name]
+            if isinstance(a, FloatAttribute):
+                mutate_rate = getattr(config, a.mutate_rate_name)
+                replace_rate = getattr(config, a.replace_rate_name)
+                r = _random(count)
+                mutated = r < mutate_rate
+                replaced = ~mutated & (r < replace_rate + mutate_rate)
+                if mutated.any():
+                    power = getattr(config, a.mutate_power_name)
+                    values[mutated] = np.clip(values[mutated] + _gauss(0.0, power, mutated.sum()),
+                                              getattr(config, a.min_value_name), getattr(config, a.max_value_name))
+                if replaced.any():
+                    values[replaced] = _initial_floats(a, config, replaced.sum())
+            elif isinstance(a, BoolAttribute):
+                rate = getattr(config, a.mutate_rate_name) + np.where(
+                    values, getattr(config, a.rate_to_false_add_name), getattr(config, a.rate_to_true_add_name))
+                # As in BoolAttribute, a mutation picks a random value, which may be the same
+                changed = (rate > 0) & (_random(count) < rate)
+                values[changed] = _random(changed.sum()) < 0.5
+            else:
+                mutate_rate = getattr(config, a.mutate_rate_name)
+                if mutate_rate > 0:
+                    changed = _random(count) < mutate_rate
+                    values[changed] = self._random_codes(a, config, changed.sum())
+
+
+def _random(count):
+    """count draws of random.random()."""
+    return np.fromiter((random.random() for _ in range(count)), dtype=np.float64, count=count)
+
+
+def _gauss(mean, stdev, count):
+    return np.fromiter((random.gauss(mean, stdev) for _ in range(count)), dtype=np.float64, count=count)
+
+
+def _initial_floats(attribute, config, count):
+    """Vectorized FloatAttribute.init_value."""
+    mean = getattr(config, attribute.init_mean_name)
+    stdev = getattr(config, attribute.init_stdev_name)
+    init_type = getattr(config, attribute.init_type_name).lower()
+    min_value = getattr(config, attribute.min_value_name)
+    max_value = getattr(config, attribute.max_value_name)
+    if ("gauss" in init_type) or ("normal" in init_type):
+        return np.clip(_gauss(mean, stdev, count), min_value, max_value)
+    if "uniform" in init_type:
+        low, high = max(min_value, mean - 2 * stdev), min(max_value, mean + 2 * stdev)
+        return np.fromiter((random.uniform(low, high) for _ in range(count)), dtype=np.float64, count=count)
+    raise RuntimeError("Unknown init_type {!r} for {!s}".format(getattr(config, attribute.init_type_name),
+                                                                attribute.init_type_name))
+
+
+class CompactGenomeConfig(DefaultGenomeConfig):
+    """DefaultGenomeConfig plus the array layout of CompactGenome's genes."""
+
+    def __init__(self, params):
+        super().__init__(params)
+        self.layout = GeneLayout(self)
+
+
+class CompactGenome:
+    """A NEAT genome whose genes live in two NumPy structured arrays."""
+
+    __slots__ = ("key", "fitness", "layout", "node_genes", "connection_genes")
+    config_section = "DefaultGenome"  # See neat_config.load_config
+
+    @classmethod
+    def parse_config(cls, param_dict):
+        param_dict["node_gene_type"] = DefaultNodeGene
+        param_dict["connection_gene_type"] = DefaultConnectionGene
+        return CompactGenomeConfig(param_dict)
+
+    @classmethod
+    def write_config(cls, f, config):
+        config.save(f)
+
+    def __init__(self, key):
+        self.key = key
+        self.fitness = None
+        # Set by configure_new/configure_crossover (or from_arrays), which get the config
+        self.layout = None
+        self.node_genes = None
+        self.connection_genes = None
+
+    @classmethod
+    def from_arrays(cls, key, layout, node_genes, connection_genes, fitness=None):
+        genome = cls(key)
+        genome.layout = layout
+        genome.node_genes = node_genes
+        genome.connection_genes = connection_genes
+        genome.fitness = fitness
+        return genome
+
+    def bind(self, genome_config):
+        """Attach the gene layout of genome_config, which an unpickled genome lacks."""
+        self.layout = genome_config.layout
+
+    # The layout is shared, so it is neither pickled nor copied
+
+    def __getstate__(self):
+        return self.key, self.fitness, self.node_genes, self.connection_genes
+
+    def __setstate__(self, state):
+        self.key, self.fitness, self.node_genes, self.connection_genes = state
+        self.layout = None
+
+    def __copy__(self):
+        return self.from_arrays(self.key, self.layout, self.node_genes, self.connection_genes, self.fitness)
+
+    def __deepcopy__(self, memo):
+        return self.from_arrays(self.key, self.layout, self.node_genes.copy(), self.connection_genes.copy(),
+                                self.fitness)
+
+    # Gene-object views, for code written against DefaultGenome
+
+    def _layout(self):
+        if self.layout is None and self.node_genes is not None:
+            raise RuntimeError("Genome {0} has no gene layout; call bind(config.genome_config) "
+                               "after unpickling".format(self.key))
+        return self.layout
+
+    @property
+    def nodes(self):
+        return self._layout().to_genes(self.node_genes) if self._layout() else {}
+
+    @nodes.setter
+    def nodes(self, genes):
+        self.node_genes = self.layout.to_array(genes)
+
+    @property
+    def connections(self):
+        return self._layout().to_genes(self.connection_genes, connections=True) if self._layout() else {}
+
+    @connections.setter
+    def connections(self, genes):
+        self.connection_genes = self.layout.to_array(genes, connections=True)
+
+    def configure_new(self, config):
+        """Configure a new genome based on the given configuration."""
+        # Initial topologies are rare and varied; build them with DefaultGenome
+        genome = DefaultGenome(self.key)
+        genome.configure_new(config)
+        self.layout = config.layout
+        self.nodes = genome.nodes
+        self.connections = genome.connections
+
+    def configure_crossover(self, genome1, genome2, config):
+        """Configure a new genome by crossover from two parent genomes."""
+        assert isinstance(genome1.fitness, (int, float))
+        assert isinstance(genome2.fitness, (int, float))
+        if genome1.fitness > genome2.fitness:
+            parent1, parent2 = genome1, genome2
+        else:
+            parent1, parent2 = genome2, genome1
+
+        layout = self.layout = config.layout
+        self.connection_genes = _crossover(parent1.connection_genes, parent2.connection_genes,
+                                           layout.connection_attributes)
+        self.node_genes = _crossover(parent1.node_genes, parent2.node_genes, layout.node_attributes)
+
+    def mutate(self, config):
+        """Mutates this genome."""
+        self.layout = config.layout
+        if config.single_structural_mutation:
+            div = max(1, (config.node_add_prob + config.node_delete_prob +
+                          config.conn_add_prob + config.conn_delete_prob))
+            r = random.random()
+            if r < (config.node_add_prob / div):
+                self.mutate_add_node(config)
+            elif r < ((config.node_add_prob + config.node_delete_prob) / div):
+                self.mutate_delete_node(config)
+            elif r < ((config.node_add_prob + config.node_delete_prob +
+                       config.conn_add_prob) / div):
+                self.mutate_add_connection(config)
+            elif r < ((config.node_add_prob + config.node_delete_prob +
+                       config.conn_add_prob + config.conn_delete_prob) / div):
+                self.mutate_delete_connection()
+        else:
+            if random.random() < config.node_add_prob:
+                self.mutate_add_node(config)
+
+            if random.random() < config.node_delete_prob:
+                self.mutate_delete_node(config)
+
+            if random.random() < config.conn_add_prob:
+                self.mutate_add_connection(config)
+
+            if random.random() < config.conn_delete_prob:
+                self.mutate_delete_connection()
+
+        self.layout.mutate(self.connection_genes, self.layout.connection_attributes, config)
+        self.layout.mutate(self.node_genes, self.layout.node_attributes, config)
+
+    def _new_genes(self, config, count, connections=False):
+        layout = self.layout
+        if connections:
+            return layout.initial(layout.connection_dtype, layout.connection_attributes, count, config)
+        return layout.initial(layout.node_dtype, layout.node_attributes, count, config)
+
+    def mutate_add_node(self, config):
+        if not len(self.connection_genes):
+            if config.check_structural_mutation_surer():
+                self.mutate_add_connection(config)
+            return
+
+        # Choose a random connection to split
+        split = random.randrange(len(self.connection_genes))
+        new_node_id = config.get_new_node_key(dict.fromkeys(self.node_genes["key"].tolist()))
+        node = self._new_genes(config, 1)
+        node["key"] = new_node_id
+        self.node_genes = np.concatenate((self.node_genes, node))
+
+        # Disable this connection and join its nodes through the new node
+        genes = self.connection_genes
+        genes["enabled"][split] = False
+        i, o, weight = int(genes["input"][split]), int(genes["output"][split]), float(genes["weight"][split])
+        self.add_connection(config, i, new_node_id, 1.0, True)
+        self.add_connection(config, new_node_id, o, weight, True)
+
+    def add_connection(self, config, input_key, output_key, weight, enabled):
+        assert isinstance(input_key, int)
+        assert isinstance(output_key, int)
+        assert output_key >= 0
+        assert isinstance(enabled, bool)
+        connection = self._new_genes(config, 1, connections=True)
+        connection["input"], connection["output"] = input_key, output_key
+        connection["weight"], connection["enabled"] = weight, enabled
+        self._put_connection(connection)
+
+    def _put_connection(self, connection):
+        genes = self.connection_genes
+        existing = np.flatnonzero((genes["input"] == connection["input"][0])
+                                  & (genes["output"] == connection["output"][0]))
+        if existing.size:
+            # Replacing a dict entry keeps its position
+            genes[existing[0]] = connection[0]
+        else:
+            self.connection_genes = np.concatenate((genes, connection))
+
+    def mutate_add_connection(self, config):
+        """
+        Attempt to add a new connection, the only restriction being that the output
+        node cannot be one of the network input pins.
+        """
+        possible_outputs = self.node_genes["key"].tolist()
+        out_node = random.choice(possible_outputs)
+
+        possible_inputs = possible_outputs + config.input_keys
+        in_node = random.choice(possible_inputs)
+
+        # Don't duplicate connections.
+        genes = self.connection_genes
+        existing = np.flatnonzero((genes["input"] == in_node) & (genes["output"] == out_node))
+        if existing.size:
+            if config.check_structural_mutation_surer():
+                genes["enabled"][existing[0]] = True
+            return
+
+        # Don't allow connections between two output nodes
+        if in_node in config.output_keys and out_node in config.output_keys:
+            return
+
+        # For feed-forward networks, avoid creating cycles.
+        key = (in_node, out_node)
+        if config.feed_forward and creates_cycle(list(zip(genes["input"].tolist(), genes["output"].tolist())), key):
+            return
+
+        connection = self._new_genes(config, 1, connections=True)
+        connection["input"], connection["output"] = key
+        self.connection_genes = np.concatenate((genes, connection))
+
+    def mutate_delete_node(self, config):
+        # Do nothing if there are no non-output nodes.
+        available_nodes = [k for k in self.node_genes["key"].tolist() if k not in config.output_keys]
+        if not available_nodes:
+            return -1
+
+        del_key = random.choice(available_nodes)
+        genes = self.connection_genes
+        self.connection_genes = genes[(genes["input"] != del_key) & (genes["output"] != del_key)]
+        self.node_genes = self.node_genes[self.node_genes["key"] != del_key]
+        return del_key
+
+    def mutate_delete_connection(self):
+        if len(self.connection_genes):
+            self.connection_genes = np.delete(self.connection_genes, random.randrange(len(self.connection_genes)))
+
+    def distance(self, other, config):
+        """
+        Returns the genetic distance between this genome and the other, exactly
+        as DefaultGenome.distance computes it for the same genes.
+        """
+        node_distance = _distance_term(self.node_genes, other.node_genes, _node_gene_distance, config)
+        connection_distance = _distance_term(self.connection_genes, other.connection_genes,
+                                             _connection_gene_distance, config)
+        return node_distance + connection_distance
+
+    def size(self):
+        """Returns genome 'complexity': (number of nodes, number of enabled connections)."""
+        return len(self.node_genes), int(np.count_nonzero(self.connection_genes["enabled"]))
+
+    def __str__(self):
+        s = "Key: {0}\nFitness: {1}\nNodes:".format(self.key, self.fitness)
+        for k, ng in self.nodes.items():
+            s += "\n\t{0} {1!s}".format(k, ng)
+        s += "\nConnections:"
+        for c in sorted(self.connections.values()):
+            s += "\n\t" + str(c)
+        return s
+
+
+def _crossover(genes1, genes2, attributes):
+    """
+    Child genes of the fitter parent's genes1 and the other parent's genes2:
+    homologous genes take each attribute from either parent with equal odds,
+    the others are copied from genes1.
+    """
+    child = genes1.copy()
+    index, found = _match(gene_keys(genes1), gene_keys(genes2))
+    rows = np.flatnonzero(found)
+    if len(rows):
+        other = index[rows]
+        # BaseGene.crossover keeps the first parent's value when random() > 0.5
+        take_other = _random(len(rows) * len(attributes)).reshape(len(rows), len(attributes)) <= 0.5
+        for j, a in enumerate(attributes):
+            picked = take_other[:, j]
+            child[a.name][rows[picked]] = genes2[a.name][other[picked]]
+    return child
+
+
+def _node_gene_distance(genes1, genes2, config):
+    d = np.abs(genes1["bias"] - genes2["bias"]) + np.abs(genes1["response"] - genes2["response"])
+    d = d + (genes1["activation"] != genes2["activation"])
+    d = d + (genes1["aggregation"] != genes2["aggregation"])
+    return d * config.compatibility_weight_coefficient
+
+
+def _connection_gene_distance(genes1, genes2, config):
+    d = np.abs(genes1["weight"] - genes2["weight"])
+    d = d + (genes1["enabled"] != genes2["enabled"])
+    return d * config.compatibility_weight_coefficient
+
+
+def _distance_term(genes1, genes2, gene_distance, config):
+    """The node or connection part of DefaultGenome.distance."""
+    if not len(genes1) and not len(genes2):
+        return 0.0
+    index, found = _match(gene_keys(genes1), gene_keys(genes2))
+    d = gene_distance(genes1[found], genes2[index[found]], config)
+    # Summed one gene at a time in genes1's order, like the += loop
+    total = float(np.cumsum(d)[-1]) if d.size else 0.0
+    homologous = int(found.sum())
+    disjoint = (len(genes2) - homologous) + (len(genes1) - homologous)
+    return (total + (config.compatibility_disjoint_coefficient * disjoint)) / max(len(genes1), len(genes2))
+
+
+def genome_bytes(genome):
+    """
+    Approximate memory held by one genome and its genes, for CompactGenome and
+    DefaultGenome alike. Shared objects (small ints, strings, the gene layout)
+    are not counted.
+    """
+    if isinstance(genome, CompactGenome):
+        return sys.getsizeof(genome) + sys.getsizeof(genome.node_genes) + sys.getsizeof(genome.connection_genes)
+    size = sys.getsizeof(genome) + sys.getsizeof(vars(genome))
+    for genes in (genome.nodes, genome.connections):
+        size += sys.getsizeof(genes)
+        for key, gene in genes.items():
+            size += sys.getsizeof(gene) + sys.getsizeof(vars(gene))
+            size += sum(sys.getsizeof(v) for v in vars(gene).values() if isinstance(v, float))
+            if isinstance(key, tuple):
+                size += sys.getsizeof(key)
+    return size
+
@@ -0,0 +1,73 @@
+"""
+Deterministic Pipe Courses
+==========================
+
+A course is the sequence of pipe gap heights a bird meets during an episode.
+Instead of calling random.randrange every time a pipe is created, a Course
+generates the heights up front from a seed, in blocks of BLOCK_SIZE pipes, as a
+compact int16 array. The same seed always gives the same course, in any process
+and however far the episode runs, so fitness comparisons are reproducible and
+workers only need the seed to rebuild a course.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+# Same range as Pipe.set_height: random.randrange(50, 450)
+MIN_HEIGHT = 50
+MAX_HEIGHT = 450
+BLOCK_SIZE = 256
+
+
+class Course:
+    """
+    Pipe gap heights for one seed; course[i] is the height of the i-th pipe.
+    Heights are drawn from [low, high); the default range is flappy_bird.py's.
+    """
+
+    def __init__(self, seed, length=BLOCK_SIZE, low=MIN_HEIGHT, high=MAX_HEIGHT):
+        """Generate at least length heights; more are generated on demand."""
+        self.seed = seed
+        self.low = low
+        self.high = high
+        self.heights = np.empty(0, dtype=np.int16)
+        self.extend(length)
+
+    def extend(self, length):
+        """Make sure the first length heights are generated."""
+        blocks = [self.heights]
+        for block in range(self.heights.size // BLOCK_SIZE, -(-length // BLOCK_SIZE)):
+            # Each block has its own stream, so earlier heights never change
+            rng = np.random.default_rng([self.seed, block])
+            blocks.append(rng.integers(self.low, self.high, size=BLOCK_SIZE, dtype=np.int16))
+        self.heights = np.concatenate(blocks)
+
+    def __getitem__(self, i):
+        if i >= self.heights.size:
+            self.extend(i + 1)
+        return int(self.heights[i])
+
+    def __len__(self):
+        return self.heights.size
+
+    def __reduce__(self):
+        # Pickle as the seed, length and range; the heights are cheap to regenerate
+        return (Course, (self.seed, self.heights.size, self.low, self.high))
+
+
+@lru_cache(maxsize=128)
+def get_course(seed, low=MIN_HEIGHT, high=MAX_HEIGHT):
+    """Return the (cached) course for seed and height range."""
+    return Course(seed, low=low, high=high)
+
+
+def course_seeds(seed, generation, courses=1, fixed=False):
+    """
+    Seeds of the courses flown in a generation: courses consecutive seeds
+    starting at seed + generation * courses (at seed itself when fixed), so
+    no two generations share a course and one course per generation gives
+    seed + generation.
+    """
+    first = seed if fixed else seed + generation * courses
+    return [first + k for k in range(courses)]
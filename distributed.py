@@ -0,0 +1,371 @@
+"""
+Distributed Fitness Evaluation
+==============================
+
+Spreads each generation over evaluation workers on other machines (or other
+processes on this one) through a small TCP protocol.
+
+The coordinator listens on a port; every worker connects to it, receives the
+NEAT config once, and then evaluates batches of genomes until the coordinator
+shuts down. A batch travels as the flat arrays of genome_codec, and only the
+fitness array comes back. As with ParallelEvaluator, all batches of a
+generation fly the same seeded pipe courses, so a genome's fitness does not
+depend on which worker played it.
+
+A batch is sent back to the queue when its worker disconnects or does not
+answer within task_timeout seconds, and another worker picks it up; a straggler
+is disconnected (it reconnects and keeps serving). After each generation the
+coordinator prints the throughput of every worker.
+
+Every message is a frame of two lengths (JSON header, binary payload)
+followed by the header and the payload.
+
+Start the coordinator with flappy_bird.py --listen, then the workers. The
+coordinator listens on 127.0.0.1 unless another host is given; workers are not
+authenticated, so only expose the port on a trusted network:
+
+    python flappy_bird.py --headless --listen 0.0.0.0:5800 --seed 42
+    python distributed.py --connect coordinator-host:5800
+"""
+
+import argparse
+import json
+import os
+import queue
+import socket
+import struct
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from compact_genome import CompactGenome
+from course import course_seeds, get_course
+from genome_codec import decode_genomes, encode_genomes, pack, unpack
+from neat_config import load_config, save_config
+
+DEFAULT_PORT = 5800
+FRAME = struct.Struct("!II")  # Header and payload sizes
+
+
+def parse_address(address, default_host="127.0.0.1"):
+    """Split "host:port", "host" or ":port" into (host, port)."""
+    host, separator, port = address.rpartition(":")
+    if not separator:
+        host, port = address, ""
+    return host or default_host, int(port or DEFAULT_PORT)
+
+
+def _recv_exactly(sock, size, deadline=None):
+    chunks = []
+    while size:
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise socket.timeout("deadline passed")
+            sock.settimeout(remaining)
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def send_message(sock, header, payload=b""):
+    """Send a JSON-serializable header and an optional binary payload as one frame."""
+    data = json.dumps(header).encode()
+    sock.sendall(FRAME.pack(len(data), len(payload)) + data + payload)
+
+
+def recv_message(sock, deadline=None):
+    """
+    Receive one frame sent by send_message; returns (header, payload).
+
+    With deadline (a time.monotonic() value), socket.timeout is raised once
+    the whole frame has not arrived by then, however the data trickles in.
+    """
+    header_size, payload_size = FRAME.unpack(_recv_exactly(sock, FRAME.size, deadline))
+    header = json.loads(_recv_exactly(sock, header_size, deadline))
+    return header, _recv_exactly(sock, payload_size, deadline)
+
+
+class _Task:
+    """One batch of genomes of the current generation."""
+
+    def __init__(self, index, genomes, payload):
+        self.index = index
+        self.genomes = genomes
+        self.payload = payload
+        self.attempts = 0
+
+
+class _WorkerConnection:
+    """Coordinator side of one worker: feeds it batches on its own thread."""
+
+    def __init__(self, evaluator, sock, name):
+        self.evaluator = evaluator
+        self.sock = sock
+        self.name = name
+        self.alive = True
+        self.reset_stats()
+        self.thread = threading.Thread(target=self._serve, name="worker-" + name, daemon=True)
+        self.thread.start()
+
+    def reset_stats(self):
+        self.batches = 0
+        self.genomes = 0
+        self.bird_steps = 0
+        self.busy_time = 0.0
+        self.compute_time = 0.0
+
+    def _serve(self):
+        evaluator = self.evaluator
+        while True:
+            task = evaluator.tasks.get()
+            if task is None:
+                self._close({"type": "shutdown"})
+                return
+            start = time.perf_counter()
+            # The timeout bounds the whole round trip, not each send or recv
+            deadline = time.monotonic() + evaluator.task_timeout
+            try:
+                self.sock.settimeout(evaluator.task_timeout)
+                send_message(self.sock, {"type": "evaluate", "task": task.index, "seeds": evaluator.current_seeds,
+                                         "options": evaluator.options}, task.payload)
+                header, payload = recv_message(self.sock, deadline)
+                if header.get("task") != task.index:
+                    raise ConnectionError("unexpected reply {0!r}".format(header))
+            except (OSError, ConnectionError, ValueError) as e:
+                reason = "timed out" if isinstance(e, socket.timeout) else "failed: {0}".format(e)
+                print("Worker {0} {1}; re-dispatching batch {2}".format(self.name, reason, task.index))
+                evaluator.retry(task)
+                self._close()
+                return
+
+            fitness = np.frombuffer(payload, dtype=np.float64)
+            task.attempts = 0
+            self.batches += 1
+            self.genomes += len(task.genomes)
+            self.bird_steps += header["bird_steps"]
+            self.busy_time += time.perf_counter() - start
+            self.compute_time += header["elapsed"]
+            evaluator.results.put((task, fitness, header))
+
+    def _close(self, message=None):
+        self.alive = False
+        try:
+            if message is not None:
+                send_message(self.sock, message)
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class DistributedEvaluator:
+    """
+    Fitness function for neat.Population.run that evaluates batches on remote workers.
+
+    Generation n is played on the courses course.course_seeds(seed, n,
+    courses, fixed_course) returns. Each generation is split into
+    chunks_per_worker batches per connected worker; more batches even out
+    workers of different speeds, but every batch is a batched episode of its
+    own and pays the per-frame overhead again. options holds further
+    simulate_episode keyword arguments (episode caps and fitness aggregate).
+    A batch that fails max_attempts times in a row (its worker is lost or
+    misses the task_timeout deadline of the round trip) aborts the run.
+    """
+
+    def __init__(self, config, host="127.0.0.1", port=DEFAULT_PORT, seed=0, chunks_per_worker=1,
+                 task_timeout=60.0, max_attempts=3, options=None, courses=1, fixed_course=False):
+        """Listen for workers on (host, port); workers may connect at any time."""
+        self.seed = seed
+        self.courses = courses
+        self.fixed_course = fixed_course
+        self.chunks_per_worker = chunks_per_worker
+        self.task_timeout = task_timeout
+        self.max_attempts = max_attempts
+        self.options = options or {}
+        self.generation = 0
+        self.current_seeds = None
+        self.workers = []
+        self._workers_lock = threading.Lock()  # The accept thread adds workers while evaluate() drops them
+        self.tasks = queue.Queue()
+        self.results = queue.Queue()
+
+        # Every worker receives the config as INI text when it connects
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "config.txt")
+            save_config(config, path)
+            with open(path, "rb") as f:
+                self.config_text = f.read()
+
+        self.server = socket.create_server((host, port))
+        self.address = self.server.getsockname()[:2]
+        self._accept_thread = threading.Thread(target=self._accept_loop, name="coordinator", daemon=True)
+        self._accept_thread.start()
+        print("Coordinator listening on {0}:{1}".format(*self.address))
+
+    def course_seeds(self, generation):
+        """Seeds of the pipe courses played in the given generation."""
+        return course_seeds(self.seed, generation, self.courses, self.fixed_course)
+
+    def _accept_loop(self):
+        while True:
+            try:
+                sock, address = self.server.accept()
+            except OSError:
+                return  # Server socket closed
+            try:
+                sock.settimeout(self.task_timeout)
+                header, _ = recv_message(sock)
+                name = "{0}@{1}:{2}".format(header.get("name", "worker"), *address[:2])
+                send_message(sock, {"type": "config"}, self.config_text)
+            except (OSError, ConnectionError, ValueError):
+                sock.close()
+                continue
+            print("Worker {0} connected".format(name))
+            with self._workers_lock:
+                self.workers.append(_WorkerConnection(self, sock, name))
+
+    def live_workers(self):
+        with self._workers_lock:
+            self.workers = [w for w in self.workers if w.alive]
+            return self.workers
+
+    def retry(self, task):
+        """Queue a batch again after its worker failed, or give up on it."""
+        task.attempts += 1
+        if task.attempts >= self.max_attempts:
+            self.results.put((task, None, {}))
+        else:
+            self.tasks.put(task)
+
+    def evaluate(self, genomes, config):
+        """Assign fitness to every (genome_id, genome) pair in genomes."""
+        self.current_seeds = self.course_seeds(self.generation)
+        self.generation += 1
+        if not genomes:
+            return
+
+        workers = self.live_workers()
+        if not workers:
+            print("Waiting for evaluation workers to connect...")
+        while not workers:
+            time.sleep(0.5)
+            workers = self.live_workers()
+        for worker in workers:
+            worker.reset_stats()
+
+        ge = [g for _, g in genomes]
+        num_batches = max(1, min(len(ge), len(workers) * self.chunks_per_worker))
+        bounds = [len(ge) * i // num_batches for i in range(num_batches + 1)]
+        start_time = time.perf_counter()
+        for i in range(num_batches):
+            batch = ge[bounds[i]:bounds[i + 1]]
+            self.tasks.put(_Task(i, batch, pack(encode_genomes(batch, config.genome_config))))
+
+        bird_steps = 0
+        stop_reasons = set()
+        remaining = num_batches
+        while remaining:
+            try:
+                task, fitness, header = self.results.get(timeout=self.task_timeout)
+            except queue.Empty:
+                if not self.live_workers():
+                    print("No evaluation workers connected; waiting...")
+                continue
+            if fitness is None:
+                raise RuntimeError("Batch {0} failed on {1} workers".format(task.index, task.attempts))
+            for g, value in zip(task.genomes, fitness.tolist()):
+                g.fitness = value
+            bird_steps += header["bird_steps"]
+            if header["stop_reason"]:
+                stop_reasons.add(header["stop_reason"])
+            remaining -= 1
+        elapsed = time.perf_counter() - start_time
+
+        # Throughput per worker, over the batches it finished this generation
+        for worker in self.workers:
+            if worker.batches:
+                print("  {0}: {1} batches, {2} genomes, {3:.0f} bird-steps/s ({4:.0%} of round trip computing)".format(
+                    worker.name, worker.batches, worker.genomes, worker.bird_steps / worker.busy_time,
+                    worker.compute_time / worker.busy_time))
+        if elapsed > 0:
+            print(f"Evaluated {len(ge)} genomes on course {', '.join(map(str, self.current_seeds))} with {len(self.workers)} workers "
+                  f"in {elapsed:.2f}s: {bird_steps / elapsed:.0f} bird-steps/s")
+        if stop_reasons:
+            print(f"Episodes stopped at the {' / '.join(sorted(stop_reasons))}")
+
+    def close(self):
+        """Tell connected workers to exit and stop listening."""
+        try:
+            self.server.shutdown(socket.SHUT_RDWR)  # Wakes up the blocked accept()
+        except OSError:
+            pass
+        self.server.close()
+        self._accept_thread.join()  # A worker still connecting must get the shutdown too
+        workers = self.live_workers()
+        for _ in workers:
+            self.tasks.put(None)
+        for worker in workers:
+            worker.thread.join(timeout=5.0)
+
+
+def run_worker(host, port, name=None, retry_delay=2.0):
+    """
+    Evaluate batches sent by the coordinator at (host, port) until it shuts down.
+
+    If the connection cannot be made or is lost, the worker reconnects after
+    retry_delay seconds; with retry_delay None connection errors are raised.
+    """
+    # Imported here so flappy_bird can import this module
+    from flappy_bird import simulate_episode
+
+    name = name or "{0}-{1}".format(socket.gethostname(), os.getpid())
+    while True:
+        try:
+            with socket.create_connection((host, port)) as sock:
+                send_message(sock, {"type": "hello", "name": name})
+                _, config_text = recv_message(sock)
+                with tempfile.TemporaryDirectory() as directory:
+                    path = os.path.join(directory, "config.txt")
+                    with open(path, "wb") as f:
+                        f.write(config_text)
+                    # Batches are decoded straight into gene arrays, without gene objects
+                    config = load_config(path, CompactGenome)
+                print("Connected to {0}:{1} as {2}".format(host, port, name))
+
+                while True:
+                    header, payload = recv_message(sock)
+                    if header["type"] == "shutdown":
+                        print("Coordinator finished; exiting")
+                        return
+                    start = time.perf_counter()
+                    genomes = decode_genomes(unpack(payload), config.genome_config, config.genome_type)
+                    courses = [get_course(s) for s in header["seeds"]]
+                    sim = simulate_episode(genomes, config, courses, **header["options"])
+                    send_message(sock, {"type": "result", "task": header["task"], "bird_steps": sim.bird_steps,
+                                        "stop_reason": sim.stop_reason, "elapsed": time.perf_counter() - start},
+                                 sim.genome_fitness.astype(np.float64).tobytes())
+        except (OSError, ConnectionError) as e:
+            if retry_delay is None:
+                raise
+            print("Connection to {0}:{1} lost ({2}); retrying in {3:g}s".format(host, port, e, retry_delay))
+            time.sleep(retry_delay)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate Flappy Bird genomes for a distributed training run")
+    parser.add_argument("--connect", metavar="HOST:PORT", default="127.0.0.1:{0}".format(DEFAULT_PORT),
+                        help="address of the coordinator (default: %(default)s)")
+    parser.add_argument("--name", help="worker name shown in the coordinator's reports")
+    parser.add_argument("--retry-delay", type=float, default=2.0,
+                        help="seconds between reconnection attempts (default: 2)")
+    args = parser.parse_args()
+
+    # Workers never open a window
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))  # Assets are loaded relative to the project folder
+    run_worker(*parse_address(args.connect), name=args.name, retry_delay=args.retry_delay)
@@ -0,0 +1,111 @@
+"""
+Fitness Cache
+=============
+
+Memoizes fitness values across generations so unchanged genomes are not
+simulated again.
+
+Elitism carries the best genomes of every species into the next generation
+unchanged, and crossover of near-identical parents often produces exact
+clones. On a seeded course a bird's episode is deterministic, so the fitness
+of such a genome is already known. Entries are keyed by a canonical hash of
+everything that shapes the genome's network (node genes and enabled
+connection genes, in key order) together with the course seeds, so a genome
+flying different courses is simulated again. The cache is bounded and drops
+the least recently used entries.
+"""
+
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+from neat.reporting import BaseReporter
+
+from compact_genome import CompactGenome
+from profiling import PROFILER
+
+
+def genome_fingerprint(genome):
+    """
+    Canonical hash of a genome's network: the same bytes for any genome with
+    the same node and enabled connection genes, regardless of gene order,
+    genome key or fitness.
+    """
+    if isinstance(genome, CompactGenome):
+        nodes = np.sort(genome.node_genes, order="key")
+        connections = genome.connection_genes[genome.connection_genes["enabled"]]
+        connections = np.sort(connections, order=["input", "output"])
+        return hashlib.blake2b(nodes.tobytes() + connections.tobytes(), digest_size=16).digest()
+    nodes = [(key,) + tuple(getattr(gene, a.name) for a in gene._gene_attributes)
+             for key, gene in sorted(genome.nodes.items())]
+    # Disabled connections do not change the network, so they do not change the key
+    connections = [(key,) + tuple(getattr(gene, a.name) for a in gene._gene_attributes)
+                   for key, gene in sorted(genome.connections.items()) if gene.enabled]
+    return hashlib.blake2b(repr((nodes, connections)).encode(), digest_size=16).digest()
+
+
+class FitnessCache(BaseReporter):
+    """
+    Wraps a fitness function for neat.Population.run with an LRU cache of at
+    most max_size fitness values.
+
+    evaluate is the wrapped fitness function and course_seeds(generation)
+    returns the seeds of the courses generation n flies. Only genomes that miss
+    the cache are passed to evaluate, one per distinct network. Added as a
+    reporter, it tracks the generation number and prints the hit rate after
+    every evaluation.
+    """
+
+    def __init__(self, evaluate, course_seeds, max_size=4096):
+        self.wrapped = evaluate
+        self.course_seeds = course_seeds
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.generation = 0
+        self.lookups = 0
+        self.hits = 0
+        self.duplicates = 0
+
+    def start_generation(self, generation):
+        self.generation = generation
+
+    def evaluate(self, genomes, config):
+        """Assign fitness to every (genome_id, genome) pair, simulating only cache misses."""
+        seeds = tuple(self.course_seeds(self.generation))
+        self.lookups = len(genomes)
+        self.hits = self.duplicates = 0
+
+        misses = {}  # key -> genomes sharing one network
+        for _, genome in genomes:
+            key = (genome_fingerprint(genome), seeds)
+            fitness = self.entries.get(key)
+            if fitness is not None:
+                self.entries.move_to_end(key)
+                genome.fitness = fitness
+                self.hits += 1
+            elif key in misses:
+                misses[key].append(genome)
+                self.duplicates += 1
+            else:
+                misses[key] = [genome]
+
+        # Evaluate one genome per distinct network; even with nothing to
+        # evaluate the call is made, so the wrapped function keeps count of generations
+        self.wrapped([(clones[0].key, clones[0]) for clones in misses.values()], config)
+        for key, clones in misses.items():
+            fitness = clones[0].fitness
+            for genome in clones[1:]:
+                genome.fitness = fitness
+            if fitness is not None:
+                self.entries[key] = fitness
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+        if PROFILER.enabled:
+            PROFILER.count("cache_hits", self.hits + self.duplicates)
+
+    def post_evaluate(self, config, population, species, best_genome):
+        saved = self.hits + self.duplicates
+        print("Fitness cache: {0} hits and {1} clones of {2} genomes ({3:.0%} not simulated), {4} entries".format(
+            self.hits, self.duplicates, self.lookups, saved / self.lookups if self.lookups else 0.0,
+            len(self.entries)))
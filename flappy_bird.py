@@ -13,39 +13,171 @@ Key Features:
 - Robust error handling and resource management
 """
 
-import pygame
 import random
 import os
 import neat
 import time
+import argparse
+import pickle
+import sys
+from functools import cached_property
 
-# Initialize pygame
-pygame.init()
-pygame.font.init()
+import numpy as np
+
+from batched_network import BatchedNetwork
+from checkpointer import AsyncCheckpointer, latest_checkpoint, restore_checkpoint
+from compact_genome import CompactGenome, genome_bytes
+from course import course_seeds as seeds_for_generation, get_course
+from distributed import DistributedEvaluator, parse_address
+from fitness_cache import FitnessCache
+from neat_config import load_config
+from parallel_evaluator import ParallelEvaluator
+from policy import JUMP_THRESHOLD, compile_genome
+from profiling import PROFILER, PhaseReporter
+from replay import EpisodeRecorder
+from simulation import PopulationSimulator, SpriteCollider
+from speciation import VectorizedSpeciesSet
+from streaming_stats import StreamingStatsReporter
 
 # Game constants
 WINDOW_WIDTH = 600
 WINDOW_HEIGHT = 800
+ASSET_FILES = ["bird1.png", "bird2.png", "bird3.png", "pipe.png", "base.png", "bg.png"]
+
+
+def load_image(name):
+    """Load an image from the imgs folder at twice its size."""
+    import pygame
+
+    path = os.path.join("imgs", name)
+    try:
+        return pygame.transform.scale2x(pygame.image.load(path))
+    except (pygame.error, FileNotFoundError) as e:
+        raise FileNotFoundError(
+            f"Error loading game asset {path}: {e}\n"
+            f"Make sure the 'imgs' folder contains: {', '.join(ASSET_FILES)}") from e
+
+
+class Assets:
+    """
+    Game images, collision masks and fonts, each loaded on first use.
+
+    Importing this module loads nothing, not even pygame: headless training and
+    worker processes only load the images and masks the simulation needs, and
+    pygame's font and display subsystems are only started when something is
+    drawn. Functions that use pygame import it themselves.
+    """
+
+    @cached_property
+    def bird_imgs(self):
+        return [load_image(name) for name in ("bird1.png", "bird2.png", "bird3.png")]
+
+    @cached_property
+    def pipe_img(self):
+        return load_image("pipe.png")
+
+    @cached_property
+    def pipe_top_img(self):
+        import pygame
+
+        return pygame.transform.flip(self.pipe_img, False, True)
+
+    @cached_property
+    def base_img(self):
+        return load_image("base.png")
+
+    @cached_property
+    def bg_img(self):
+        return load_image("bg.png")
+
+    # Collision masks are built once so that collision checks only look them up
+    @cached_property
+    def bird_masks(self):
+        import pygame
+
+        return [pygame.mask.from_surface(img) for img in self.bird_imgs]
+
+    @cached_property
+    def pipe_top_mask(self):
+        import pygame
+
+        return pygame.mask.from_surface(self.pipe_top_img)
+
+    @cached_property
+    def pipe_bottom_mask(self):
+        import pygame
+
+        return pygame.mask.from_surface(self.pipe_img)
+
+    @cached_property
+    def sprite_collider(self):
+        """Row-extent tables answering pipe_collisions for the whole population at once."""
+        return SpriteCollider(
+            [opaque_pixels(mask) for mask in self.bird_masks],
+            opaque_pixels(self.pipe_top_mask),
+            opaque_pixels(self.pipe_bottom_mask),
+            PopulationSimulator.BIRD_X,
+            Pipe.GAP,
+        )
+
+    @cached_property
+    def bird_atlas(self):
+        """Every animation frame rotated by every tilt Bird.move can produce."""
+        from sprites import RotationAtlas, flappy_tilts
+
+        return RotationAtlas(self.bird_imgs, flappy_tilts(Bird.MAX_ROTATION, Bird.ROTATION_VELOCITY))
+
+    @cached_property
+    def stat_font(self):
+        import pygame
+
+        pygame.font.init()
+        return pygame.font.SysFont("comicsans", 50)
+
+    @cached_property
+    def debug_font(self):
+        import pygame
+
+        pygame.font.init()
+        return pygame.font.Font(None, 24)
+
+    def convert(self):
+        """
+        Convert the drawn surfaces to the display pixel format once a window exists.
+        The background is fully opaque, but as loaded it carries per-pixel alpha
+        and blitting it would take most of the frame time.
+        """
+        import pygame
+
+        if self.bg_img.get_flags() & pygame.SRCALPHA:  # Not converted yet
+            self.bg_img = self.bg_img.convert()
+            self.pipe_top_img = self.pipe_top_img.convert_alpha()
+            self.pipe_img = self.pipe_img.convert_alpha()
+            self.bird_atlas.convert()
+
+
+ASSETS = Assets()
 
-# Load game assets with error handling
-try:
-    BIRD_IMGS = [
-        pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "bird1.png"))),
-        pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "bird2.png"))),
-        pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "bird3.png")))
-    ]
-    PIPE_IMG = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "pipe.png")))
-    BASE_IMG = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "base.png")))
-    BG_IMG = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "bg.png")))
-    STAT_FONT = pygame.font.SysFont("comicsans", 50)
-except pygame.error as e:
-    print(f"Error loading game assets: {e}")
-    print("Make sure the 'imgs' folder contains: bird1.png, bird2.png, bird3.png, pipe.png, base.png, bg.png")
-    exit(1)
-
-# Global settings - Visual training mode only
+# Global settings
 current_generation = 0
 SHOW_DEBUG_LINES = True  # Set to False to hide neural network input visualization
+HEADLESS = False  # Set by run(); skips the window, frame throttling and drawing
+COURSE_SEED = None  # Set by run(); generation n flies the course seeded COURSE_SEED + n
+FIXED_COURSE = False  # Set by run(); every generation flies the course seeded COURSE_SEED
+COURSES = 1  # Set by run(); courses every genome flies per generation
+AGGREGATE = "mean"  # Set by run(); how a genome's per-course fitnesses are combined
+CHECKPOINT_PREFIX = os.path.join("checkpoints", "neat-checkpoint-")
+WINNER_PREFIX = "winner"  # The winning genome is saved as winner.pkl and its compiled policy as winner.npz
+STATS_LOG = "stats.csv"  # Per-generation training statistics are appended here
+RECORD_DIR = None  # Set by run(); episodes are recorded here for replay.py
+RECORD_EVERY = 1  # Set by run(); record every Nth generation's episode
+MAX_DRAWN_BIRDS = 50  # Fittest birds drawn with sprites; the rest are drawn as markers
+RENDER_EVERY = 1  # Draw only every Nth simulation step
+MAX_FRAMES = None  # Set by run(); episodes end after this many frames
+MAX_PIPES = None  # Set by run(); episodes end once this many pipes are passed
+EARLY_STOP = False  # Set by run(); end the episode once the fitness threshold is reached
+MARKER_COLOR = (255, 220, 0)
+MARKER_SIZE = 6
 
 
 class Bird:
@@ -53,7 +185,6 @@ class Bird:
     Bird class representing the player/AI agent.
     Handles physics, animation, and collision detection.
     """
-    IMGS = BIRD_IMGS
     MAX_ROTATION = 25 
     ROTATION_VELOCITY = 20 
     ANIMATION_TIME = 5 
@@ -67,7 +198,7 @@ class Bird:
         self.velocity = 0
         self.height = y
         self.img_count = 0 
-        self.img = self.IMGS[0] 
+        self.img = ASSETS.bird_imgs[0] 
 
     def jump(self):
         """Make the bird jump (negative velocity = upward movement)."""
@@ -99,35 +230,46 @@ class Bird:
             if self.tilt > -90:
                 self.tilt -= self.ROTATION_VELOCITY
 
-    def draw(self, win):
-        """Draw the bird with animation and rotation."""
+    def animate(self):
+        """Advance the wing-flap animation and select the current frame."""
         self.img_count += 1
         
         # Cycle through bird animation frames
         if self.img_count < self.ANIMATION_TIME:
-            self.img = self.IMGS[0]
+            self.img = ASSETS.bird_imgs[0]
         elif self.img_count < self.ANIMATION_TIME * 2:
-            self.img = self.IMGS[1]
+            self.img = ASSETS.bird_imgs[1]
         elif self.img_count < self.ANIMATION_TIME * 3:
-            self.img = self.IMGS[2]
+            self.img = ASSETS.bird_imgs[2]
         elif self.img_count < self.ANIMATION_TIME * 4:
-            self.img = self.IMGS[1]
+            self.img = ASSETS.bird_imgs[1]
         elif self.img_count == self.ANIMATION_TIME * 4 + 1:
-            self.img = self.IMGS[0]
+            self.img = ASSETS.bird_imgs[0]
             self.img_count = 0
         
         # Special case for steep dive
         if self.tilt <= -80:
-            self.img = self.IMGS[1]
+            self.img = ASSETS.bird_imgs[1]
             self.img_count = self.ANIMATION_TIME * 2
 
-        # Rotate and draw the bird
-        rotated_image = pygame.transform.rotate(self.img, self.tilt)
+    def draw(self, win):
+        """Draw the bird with animation and rotation."""
+        self.animate()
+        self.blit(win)
+
+    def blit(self, win):
+        """Draw the current animation frame rotated by the bird's tilt."""
+        rotated_image = ASSETS.bird_atlas.rotated(self.img, self.tilt)
         new_rect = rotated_image.get_rect(center=self.img.get_rect(topleft=(self.x, self.y)).center)
         win.blit(rotated_image, new_rect.topleft)
 
     def get_mask(self):
         """Get collision mask for pixel-perfect collision detection."""
+        import pygame
+
+        for img, mask in zip(ASSETS.bird_imgs, ASSETS.bird_masks):
+            if img is self.img:
+                return mask
         return pygame.mask.from_surface(self.img)
 
 
@@ -139,21 +281,19 @@ class Pipe:
     GAP = 200  # Gap size between top and bottom pipes
     VEL = 5    # Horizontal movement speed
 
-    def __init__(self, x):
-        """Initialize pipe at given x position with random gap height."""
+    def __init__(self, x, height=None):
+        """Initialize pipe at given x position with the given or a random gap height."""
         self.x = x
         self.height = 0
         self.top = 0
         self.bottom = 0
-        self.PIPE_TOP = pygame.transform.flip(PIPE_IMG, False, True)
-        self.PIPE_BOTTOM = PIPE_IMG
         self.passed = False
-        self.set_height()
+        self.set_height(height)
 
-    def set_height(self):
-        """Set random height for the pipe gap."""
-        self.height = random.randrange(50, 450)
-        self.top = self.height - self.PIPE_TOP.get_height()
+    def set_height(self, height=None):
+        """Set the height for the pipe gap, choosing a random one if not given."""
+        self.height = random.randrange(50, 450) if height is None else height
+        self.top = self.height - ASSETS.pipe_top_img.get_height()
         self.bottom = self.height + self.GAP 
     
     def move(self):
@@ -162,14 +302,14 @@ class Pipe:
 
     def draw(self, win):
         """Draw both top and bottom pipe segments."""
-        win.blit(self.PIPE_TOP, (self.x, self.top))
-        win.blit(self.PIPE_BOTTOM, (self.x, self.bottom))
+        win.blit(ASSETS.pipe_top_img, (self.x, self.top))
+        win.blit(ASSETS.pipe_img, (self.x, self.bottom))
 
     def collide(self, bird):
         """Check if bird collides with this pipe using pixel-perfect detection."""
         bird_mask = bird.get_mask()
-        top_mask = pygame.mask.from_surface(self.PIPE_TOP)
-        bottom_mask = pygame.mask.from_surface(self.PIPE_BOTTOM)
+        top_mask = ASSETS.pipe_top_mask
+        bottom_mask = ASSETS.pipe_bottom_mask
         
         # Calculate offset positions for collision detection
         top_offset = (self.x - bird.x, self.top - round(bird.y))
@@ -188,14 +328,13 @@ class Base:
     Creates illusion of continuous movement.
     """
     VEL = 5
-    WIDTH = BASE_IMG.get_width()
-    IMG = BASE_IMG
 
     def __init__(self, y):
         """Initialize base at given y position."""
         self.y = y
+        self.width = ASSETS.base_img.get_width()
         self.x1 = 0
-        self.x2 = self.WIDTH
+        self.x2 = self.width
     
     def move(self):
         """Move base segments to create scrolling effect."""
@@ -203,22 +342,24 @@ class Base:
         self.x2 -= self.VEL
         
         # Reset positions when segments move off screen
-        if self.x1 + self.WIDTH < 0:
-            self.x1 = self.x2 + self.WIDTH
-        if self.x2 + self.WIDTH < 0:
-            self.x2 = self.x1 + self.WIDTH
+        if self.x1 + self.width < 0:
+            self.x1 = self.x2 + self.width
+        if self.x2 + self.width < 0:
+            self.x2 = self.x1 + self.width
     
     def draw(self, win):
         """Draw both base segments."""
-        win.blit(self.IMG, (self.x1, self.y))
-        win.blit(self.IMG, (self.x2, self.y))
+        win.blit(ASSETS.base_img, (self.x1, self.y))
+        win.blit(ASSETS.base_img, (self.x2, self.y))
 
 
-def draw_debug_lines(win, bird, pipes, pipe_ind):
+def draw_debug_lines(win, bird, pipe):
     """
     Draw red debug lines showing neural network inputs for a bird.
     """
-    if not SHOW_DEBUG_LINES or not pipes or pipe_ind >= len(pipes):
+    import pygame
+
+    if not SHOW_DEBUG_LINES:
         return
         
     # Colors for different input lines
@@ -227,7 +368,7 @@ def draw_debug_lines(win, bird, pipes, pipe_ind):
     YELLOW = (255, 255, 0)
     GREEN = (0, 255, 0)
     
-    current_pipe = pipes[pipe_ind]
+    current_pipe = pipe
     
     # Input 1: Bird Y position - horizontal line across screen
     pygame.draw.line(win, RED, (0, bird.y), (WINDOW_WIDTH, bird.y), 2)
@@ -248,227 +389,636 @@ def draw_debug_lines(win, bird, pipes, pipe_ind):
     
     # Draw pipe gap boundaries for reference
     pygame.draw.line(win, (100, 100, 255), (current_pipe.x, current_pipe.height), 
-                     (current_pipe.x + current_pipe.PIPE_TOP.get_width(), current_pipe.height), 2)
+                     (current_pipe.x + ASSETS.pipe_img.get_width(), current_pipe.height), 2)
     pygame.draw.line(win, (100, 100, 255), (current_pipe.x, current_pipe.height + current_pipe.GAP), 
-                     (current_pipe.x + current_pipe.PIPE_TOP.get_width(), current_pipe.height + current_pipe.GAP), 2)
+                     (current_pipe.x + ASSETS.pipe_img.get_width(), current_pipe.height + current_pipe.GAP), 2)
+
+
+def simulated_bird(sim, i):
+    """Build a Bird object mirroring bird i of a PopulationSimulator, for drawing."""
+    bird = Bird(sim.BIRD_X, float(sim.y[i]))
+    bird.velocity = float(sim.velocity[i])
+    bird.tilt = int(sim.tilt[i])
+    bird.img = ASSETS.bird_imgs[sim.frame[i]]
+    return bird
+
+
+def pipe_collisions(pipe_x, pipe_height, ys, frames):
+    """
+    Pixel-perfect pipe collisions for the living birds of a PopulationSimulator.
+
+    Returns a boolean array with one entry per bird height in ys. Uses the same
+    cached masks and offsets as Pipe.collide, one bird at a time; training uses
+    the equivalent, vectorized ASSETS.sprite_collider.
+    """
+    hits = np.zeros(len(ys), dtype=bool)
+    bird_width, bird_height = ASSETS.bird_imgs[0].get_size()
+    dx = pipe_x - PopulationSimulator.BIRD_X
+
+    # Only birds whose bounding box touches a pipe segment need the pixel test
+    if not -ASSETS.pipe_img.get_width() < dx < bird_width:
+        return hits
+    top = pipe_height - ASSETS.pipe_top_img.get_height()
+    bottom = pipe_height + Pipe.GAP
+    rounded_y = np.rint(ys)
+    candidates = np.flatnonzero((rounded_y < pipe_height) | (rounded_y + bird_height > bottom))
+    for i in candidates:
+        bird_mask = ASSETS.bird_masks[frames[i]]
+        y = round(ys[i])
+        hits[i] = (bird_mask.overlap(ASSETS.pipe_top_mask, (dx, top - y)) is not None
+                   or bird_mask.overlap(ASSETS.pipe_bottom_mask, (dx, bottom - y)) is not None)
+    return hits
+
+
+def opaque_pixels(mask):
+    """Boolean (rows, columns) array of the pixels set in a pygame mask."""
+    import pygame
+
+    surface = mask.to_surface(setcolor=(255, 255, 255, 255), unsetcolor=(0, 0, 0, 0))
+    return pygame.surfarray.array_alpha(surface).T > 0
+
+
+class TextCache:
+    """
+    Rendered text lines that are only re-rendered when their text changes.
+    Each line is identified by a slot name, e.g. "score".
+    """
+
+    def __init__(self):
+        self.lines = {}
+
+    def render(self, slot, font, text, color=(255, 255, 255)):
+        """Return the surface for text in slot, rendering it only if it changed."""
+        cached = self.lines.get(slot)
+        if cached is None or cached[0] != text:
+            cached = (text, font.render(text, 1, color))
+            self.lines[slot] = cached
+        return cached[1]
+
+
+TEXT_CACHE = TextCache()
+
+
+def select_drawn_birds(sim, limit):
+    """
+    Split the living birds into the fittest limit birds, drawn fully (fittest
+    first), and the rest, drawn as markers. With several courses only the
+    birds on the first course are shown.
+    """
+    alive = sim.alive_indices()
+    if sim.lanes is not None:
+        alive = alive[sim.lanes[alive] == 0]
+    fitness = sim.fitness[alive]
+    if len(alive) > limit:
+        order = np.argpartition(-fitness, limit - 1) if limit > 0 else np.arange(len(alive))
+        rest = alive[order[limit:]]
+        alive, fitness = alive[order[:limit]], fitness[order[:limit]]
+    else:
+        rest = alive[:0]
+    return alive[np.argsort(-fitness, kind="stable")], rest
+
+
+def draw_markers(win, sim, indices):
+    """Draw birds as small squares; birds on the same screen row share one square."""
+    if len(indices) == 0:
+        return
+    bird_width, bird_height = ASSETS.bird_imgs[0].get_size()
+    x = sim.BIRD_X + (bird_width - MARKER_SIZE) // 2
+    offset = (bird_height - MARKER_SIZE) // 2
+    for y in np.unique(np.rint(sim.y[indices]).astype(np.int64)).tolist():
+        win.fill(MARKER_COLOR, (x, y + offset, MARKER_SIZE, MARKER_SIZE))
 
 
-def draw_window(win, birds, pipes, base, score, generation=0, pipe_ind=0):
+def draw_window(win, sim, base, generation=0):
     """
     Render the complete game window with all elements and debug visualization.
+
+    Only the MAX_DRAWN_BIRDS fittest living birds are drawn with rotated
+    sprites; the others are drawn as cheap markers, so the frame time stays
+    low with thousands of birds.
     """
+    import pygame
+
     # Draw background
-    win.blit(BG_IMG, (0, 0))
+    win.blit(ASSETS.bg_img, (0, 0))
 
     # Draw pipes
+    pipes = [Pipe(x, height) for x, height, _ in sim.lane_pipes(0)]
     for pipe in pipes:
         pipe.draw(win)
 
-    # Draw debug lines for each bird (only show for first few birds to avoid clutter)
+    drawn, rest = select_drawn_birds(sim, MAX_DRAWN_BIRDS)
+    birds = [simulated_bird(sim, i) for i in drawn]
+
+    # Draw debug lines for the fittest few birds only, to avoid clutter
     if SHOW_DEBUG_LINES and pipes:
-        for i, bird in enumerate(birds[:5]):  # Show debug lines for first 5 birds only
-            draw_debug_lines(win, bird, pipes, pipe_ind)
+        for bird in birds[:5]:
+            draw_debug_lines(win, bird, pipes[sim.pipe_ind])
 
     # Draw score
-    text = STAT_FONT.render("Score: " + str(score), 1, (255, 255, 255))
+    text = TEXT_CACHE.render("score", ASSETS.stat_font, "Score: " + str(sim.score))
     win.blit(text, (WINDOW_WIDTH - text.get_width() - 10, 10))
     
     # Draw generation and bird count
-    gen_text = STAT_FONT.render("Gen: " + str(generation), 1, (255, 255, 255))
-    win.blit(gen_text, (10, 10))
-    
-    bird_text = STAT_FONT.render("Birds: " + str(len(birds)), 1, (255, 255, 255))
-    win.blit(bird_text, (10, 60))
+    win.blit(TEXT_CACHE.render("generation", ASSETS.stat_font, "Gen: " + str(generation)), (10, 10))
+    win.blit(TEXT_CACHE.render("birds", ASSETS.stat_font, "Birds: " + str(len(drawn) + len(rest))), (10, 60))
     
     # Debug info
     if SHOW_DEBUG_LINES:
-        debug_text = pygame.font.Font(None, 24).render("Debug Lines: Red=Y pos, Orange=Gap dist, Yellow=Velocity, Green=Pipe dist", 1, (255, 255, 255))
+        debug_text = TEXT_CACHE.render(
+            "debug", ASSETS.debug_font, "Debug Lines: Red=Y pos, Orange=Gap dist, Yellow=Velocity, Green=Pipe dist")
         win.blit(debug_text, (10, 110))
 
-    # Draw base and birds
+    # Draw base, then markers under the fully drawn birds
     base.draw(win)
-    for bird in birds:
-        bird.draw(win)
+    draw_markers(win, sim, rest)
+    for bird in reversed(birds):
+        bird.blit(win)
         
     pygame.display.update()
 
 
+def aggregate_fitness(fitness, how="mean"):
+    """
+    Combine per-course fitnesses, shape (courses, genomes), into one fitness
+    per genome: "mean", "min", or a quantile given as a number in [0, 1].
+    """
+    if how == "mean":
+        return fitness.mean(axis=0)
+    if how == "min":
+        return fitness.min(axis=0)
+    return np.quantile(fitness, float(how), axis=0)
+
+
+def simulate_episode(genomes, config, course=None, on_frame=None, max_frames=None, max_pipes=None,
+                     stop_fitness=None, aggregate="mean", recorder=None):
+    """
+    Play one episode with a bird for each genome in the list genomes.
+
+    Pipe heights come from course (random if None). course may also be a list
+    of courses: every genome then flies each of them, all in one batched
+    simulation, and its fitness is the aggregate (see aggregate_fitness) of its
+    per-course fitnesses. on_frame(sim) is called after every frame
+    and can return False to stop early. The episode also ends after max_frames frames, once
+    max_pipes pipes have been passed, or once a genome's fitness reaches stop_fitness; birds
+    still flying then keep the fitness earned so far. Returns the finished
+    PopulationSimulator: its fitness array holds one fitness per bird,
+    genome_fitness one per genome, stop_reason says why a truncated
+    episode ended (None if every bird died), and network_sizes holds the
+    total (nodes, links) of the networks before and after pruning.
+    With recorder (a replay.EpisodeRecorder), every frame's jump decisions are recorded.
+    """
+    # Phase timing costs one test per phase unless profiling is enabled
+    profiler = PROFILER if PROFILER.enabled else None
+    if profiler:
+        start = time.perf_counter()
+
+    # Compile the neural networks of all genomes into one batched network
+    nets = BatchedNetwork.create(genomes, config)
+    collide = ASSETS.sprite_collider
+    if profiler:
+        profiler.lap("compile", start)
+        profiler.count("padded_links", sum(weights.size for *_, weights in nets.layers))
+        (genome_nodes, genome_links), (nodes, links) = nets.sizes
+        profiler.count("pruned_nodes", genome_nodes - nodes)
+        profiler.count("pruned_links", genome_links - links)
+        collide = profiler.timed_collider(collide)
+
+    # With several courses, bird k * len(genomes) + i flies course k with genome i
+    lanes = None
+    rows = np.arange(len(genomes))
+    if isinstance(course, (list, tuple)):
+        if len(course) == 1:
+            course = course[0]
+        else:
+            lanes = np.repeat(np.arange(len(course)), len(genomes))
+            rows = np.tile(rows, len(course))
+
+    # All birds are simulated together as arrays
+    sim = PopulationSimulator(
+        rows.size, collide, course=course,
+        bird_height=ASSETS.bird_imgs[0].get_height(),
+        pipe_width=ASSETS.pipe_img.get_width(),
+        pipe_height=ASSETS.pipe_img.get_height(),
+        lanes=lanes,
+    )
+    inputs = sim.reset()
+    sim.stop_reason = None
+    sim.network_sizes = nets.sizes
+    jumps = np.zeros(rows.size, dtype=bool)
+
+    def genome_fitness():
+        if lanes is None:
+            return sim.fitness
+        return aggregate_fitness(sim.fitness.reshape(-1, len(genomes)), aggregate)
+
+    run = True
+    while run and not sim.done:
+        # Get AI decisions for all living birds; jump if output exceeds threshold
+        alive = sim.alive_indices()
+        if profiler:
+            profiler.frame(alive.size)
+            profiler.count("activations", alive.size)
+            start = time.perf_counter()
+        jumps[:] = False
+        jumps[alive] = nets.activate(inputs[alive], rows[alive])[:, 0] > JUMP_THRESHOLD
+        if profiler:
+            start = profiler.lap("activate", start)
+        if recorder is not None:
+            recorder.record(jumps[alive])
+            if profiler:
+                start = profiler.lap("record", start)
+
+        # Advance physics, collisions, scoring and rewards for the whole population
+        inputs, _, _ = sim.step(jumps)
+        if profiler:
+            profiler.lap("physics", start)
+
+        if on_frame is not None:
+            run = on_frame(sim) is not False
+
+        # Bounded episodes: survivors all flew the same frames, so their scores stay comparable
+        if sim.done:
+            break
+        if max_frames is not None and sim.frames >= max_frames:
+            sim.stop_reason = f"frame cap of {max_frames}"
+        elif max_pipes is not None and sim.score >= max_pipes:
+            sim.stop_reason = f"pipe cap of {max_pipes}"
+        elif stop_fitness is not None and genome_fitness().max() >= stop_fitness:
+            sim.stop_reason = f"fitness threshold of {stop_fitness:g}"
+        if sim.stop_reason:
+            if profiler:
+                profiler.count("capped_birds", sim.alive_indices().size)
+            break
+
+    sim.genome_fitness = genome_fitness()
+    return sim
+
+
+def episode_options(config):
+    """Keyword arguments of simulate_episode bounding an episode and aggregating fitness, as set by run()."""
+    stop_fitness = None
+    # Stopping early cannot change the outcome only when the run ends on the best fitness
+    if EARLY_STOP and config.fitness_criterion == "max" and not config.no_fitness_termination:
+        stop_fitness = config.fitness_threshold
+    return {"max_frames": MAX_FRAMES, "max_pipes": MAX_PIPES, "stop_fitness": stop_fitness,
+            "aggregate": AGGREGATE}
+
+
+def course_seeds(generation):
+    """Seeds of the pipe courses flown in the given generation (None for random pipes)."""
+    if COURSE_SEED is None:
+        return None
+    return seeds_for_generation(COURSE_SEED, generation, COURSES, FIXED_COURSE)
+
+
 def main(genomes, config):
     """
     Main training function called by NEAT for each generation.
     Handles the complete game simulation and fitness evaluation.
     """
+    import pygame
+
     global current_generation
     current_generation += 1
+    if not genomes:
+        return
+
+    course = None
+    if COURSE_SEED is not None:
+        course = [get_course(seed) for seed in course_seeds(current_generation - 1)]
     
-    # Initialize neural networks and birds for each genome
-    nets = []
     ge = []
-    birds = []
-
     for _, g in genomes:
-        net = neat.nn.FeedForwardNetwork.create(g, config)
-        nets.append(net)
-        birds.append(Bird(230, 300))  # Start birds higher up
         g.fitness = 0
         ge.append(g)
-        
-    # Initialize game objects
-    base = Base(730)
-    pipes = [Pipe(600)]
-    
-    # Initialize display
-    win = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-    pygame.display.set_caption("NEAT Flappy Bird AI!")
-    clock = pygame.time.Clock()
-    score = 0
 
-    # Main game loop
-    run = True
-    while run and len(birds) > 0:
-        clock.tick(30)  # 30 FPS for smooth visual learning
-        
-        # Handle pygame events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                run = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_d:  # Press 'D' to toggle debug lines
-                    global SHOW_DEBUG_LINES
-                    SHOW_DEBUG_LINES = not SHOW_DEBUG_LINES
-                    print(f"Debug lines: {'ON' if SHOW_DEBUG_LINES else 'OFF'}")
-
-        # Determine which pipe to focus on for AI input
-        pipe_ind = 0
-        if len(pipes) > 1 and birds[0].x > pipes[0].x + pipes[0].PIPE_TOP.get_width():
-            pipe_ind = 1
-            
-        # Update each bird and get AI decision
-        for x, bird in enumerate(birds):
-            bird.move()
-            
-            # Fitness rewards for survival and good positioning
-            ge[x].fitness += 0.1  # Base survival reward
-            
-            # Bonus for staying near middle (avoid ground/ceiling)
-            middle_y = WINDOW_HEIGHT / 2
-            distance_from_middle = abs(bird.y - middle_y)
-            if distance_from_middle < 100:
-                ge[x].fitness += 0.05
-            
-            # Small bonus for forward progress
-            ge[x].fitness += 0.02
-
-            # Prepare normalized inputs for neural network
-            bird_y_norm = bird.y / WINDOW_HEIGHT
-            pipe_center = pipes[pipe_ind].height + pipes[pipe_ind].GAP / 2
-            distance_to_center = (bird.y - pipe_center) / (WINDOW_HEIGHT / 2)
-            velocity_norm = bird.velocity / 20.0
-            horizontal_distance = (pipes[pipe_ind].x - bird.x) / WINDOW_WIDTH
-            
-            # Get AI decision
-            output = nets[x].activate((bird_y_norm, distance_to_center, velocity_norm, horizontal_distance))
-            
-            # Jump if output exceeds threshold
-            if output[0] > 0.3:
-                bird.jump()
-
-        # Handle pipe collision and passing
-        add_pipe = False
-        removed = []
-        birds_to_remove = []
-
-        for pipe in pipes:
-            pipe_passed_by_any_bird = False
-            
-            for x, bird in enumerate(birds):
-                # Check collision
-                if pipe.collide(bird):
-                    ge[x].fitness -= 5  # Collision penalty
-                    birds_to_remove.append(x)
-
-                # Check if bird passed pipe
-                if not pipe.passed and pipe.x < bird.x:
-                    pipe_passed_by_any_bird = True
-            
-            # Mark pipe as passed and trigger new pipe generation
-            if pipe_passed_by_any_bird and not pipe.passed:
-                    pipe.passed = True
-                    add_pipe = True
-                
-            # Mark pipes for removal when off screen
-            if pipe.x + pipe.PIPE_TOP.get_width() < 0:
-                removed.append(pipe)
-
-        # Remove collided birds
-        for x in reversed(birds_to_remove):
-            birds.pop(x)
-            nets.pop(x)
-            ge.pop(x)
-
-        # Move all pipes
-        for pipe in pipes:
-            pipe.move()
-        
-        # Add new pipe and reward all surviving birds
-        if add_pipe:
-            score += 1
-            for g in ge:
-                g.fitness += 15  # Big reward for passing pipe
-            pipes.append(Pipe(600))
-
-        # Remove off-screen pipes
-        for r in removed:
-            pipes.remove(r) 
-
-        # Check for boundary collisions (ground/ceiling)
-        boundary_removals = []
-        for x, bird in enumerate(birds):
-            if bird.y + bird.img.get_height() >= 730 or bird.y < 0:
-                ge[x].fitness -= 10  # Boundary collision penalty
-                boundary_removals.append(x)
-
-        # Remove birds that hit boundaries
-        for x in reversed(boundary_removals):
-                birds.pop(x)
-                nets.pop(x)
-                ge.pop(x)
-        
-        # Update base and render
-        base.move()
-        draw_window(win, birds, pipes, base, score, current_generation, pipe_ind)
+    options = episode_options(config)
+    recorder = None
+    if RECORD_DIR and (current_generation - 1) % RECORD_EVERY == 0:
+        recorder = EpisodeRecorder([gid for gid, _ in genomes], course_seeds(current_generation - 1))
+        options["recorder"] = recorder
+    start_time = time.perf_counter()
+    if HEADLESS:
+        # Headless training never opens a window
+        sim = simulate_episode(ge, config, course, **options)
+    else:
+        # Initialize pygame, display and game objects
+        pygame.init()
+        win = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        pygame.display.set_caption("NEAT Flappy Bird AI!")
+        ASSETS.convert()
+        clock = pygame.time.Clock()
+        base = Base(730)
+
+        def render_frame(sim):
+            """Handle window events and draw every RENDER_EVERY-th frame at 30 FPS."""
+            base.move()
+            if sim.frames % RENDER_EVERY and not sim.done:
+                return True
+
+            run = True
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    run = False
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_d:  # Press 'D' to toggle debug lines
+                        global SHOW_DEBUG_LINES
+                        SHOW_DEBUG_LINES = not SHOW_DEBUG_LINES
+                        print(f"Debug lines: {'ON' if SHOW_DEBUG_LINES else 'OFF'}")
+                    elif event.key == pygame.K_p:  # Press 'P' to pause or resume phase profiling
+                        PROFILER.enabled = not PROFILER.enabled
+                        print(f"Profiling: {'ON' if PROFILER.enabled else 'OFF'}")
 
+            if PROFILER.enabled:
+                start = time.perf_counter()
+                draw_window(win, sim, base, current_generation)
+                PROFILER.lap("render", start)
+            else:
+                draw_window(win, sim, base, current_generation)
+            clock.tick(30)  # 30 FPS for smooth visual learning
+            return run
 
-def run(config_path):
+        sim = simulate_episode(ge, config, course, on_frame=render_frame, **options)
+
+    for g, fitness in zip(ge, sim.genome_fitness):
+        g.fitness = float(fitness)
+    if recorder is not None:
+        path = os.path.join(RECORD_DIR, f"generation-{current_generation - 1:05d}.npz")
+        recorder.save(path, sim, current_generation - 1)
+        print(f"Recorded the episode to {path} ({os.path.getsize(path)} bytes)")
+
+    if sim.stop_reason:
+        print(f"Episode stopped at the {sim.stop_reason} with {sim.alive_indices().size} birds alive")
+    (genome_nodes, genome_links), (nodes, links) = sim.network_sizes
+    print(f"Networks: {genome_nodes} nodes and {genome_links} connections, "
+          f"{nodes} nodes and {links} links evaluated after pruning")
+
+    # Report simulation throughput for this generation
+    elapsed = time.perf_counter() - start_time
+    if elapsed > 0:
+        print(f"Simulated {sim.frames} frames ({sim.bird_steps} bird-steps) in {elapsed:.2f}s: "
+              f"{sim.frames / elapsed:.0f} steps/s, {sim.bird_steps / elapsed:.0f} bird-steps/s")
+
+
+def save_winner_files(winner, config, prefix):
+    """Pickle the winning genome to prefix.pkl and save its compiled policy to prefix.npz."""
+    with open(prefix + ".pkl", "wb") as f:
+        pickle.dump(winner, f, protocol=pickle.HIGHEST_PROTOCOL)
+    policy = compile_genome(winner, config)
+    policy.save(prefix + ".npz")
+    print(f"Saved the winner to {prefix}.pkl and its policy ({policy.num_nodes} nodes, "
+          f"{policy.num_connections} connections) to {prefix}.npz")
+
+
+def run(config_path, headless=False, generations=50, workers=None, seed=None,
+        checkpoint_every=5, keep_checkpoints=3, resume=None, max_drawn_birds=50, render_every=1,
+        profile=None, max_frames=5000, max_pipes=None, early_stop=False, listen=None, task_timeout=60.0,
+        fixed_course=False, fitness_cache=4096, courses=1, aggregate="mean", compact_genomes=False,
+        save_winner=WINNER_PREFIX, stats_log=STATS_LOG, record=None, record_every=1):
     """
     Initialize and run the NEAT evolution process.
+
+    With headless=True the birds are simulated without a window, frame
+    throttling or event handling, as fast as the CPU allows. With seed set,
+    every generation flies the pipe course seeded with seed + generation number.
+    With fixed_course, every generation flies the course seeded with seed.
+    With courses > 1, every genome flies that many seeded courses per
+    generation in one batched simulation (a random base seed is picked if none
+    is given) and its fitness is the aggregate of the per-course fitnesses:
+    "mean", "min", or a quantile such as "0.25".
+    With workers set, genomes are evaluated headlessly in that many processes
+    on seeded courses (a random base seed is picked if none is given).
+    With listen set to "host:port", genomes are instead evaluated in batches by
+    distributed.py workers connecting to that address; a batch is re-sent to
+    another worker when its worker is lost or takes longer than task_timeout.
+    Without a host, only workers on this machine can connect (127.0.0.1).
+    Workers are not authenticated, so only name another host, such as 0.0.0.0
+    for all interfaces, on a trusted network.
+
+    On seeded courses, up to fitness_cache fitness values are remembered
+    (0 disables the cache): genomes seen before on the same course, such as
+    elites carried over unchanged, are not simulated again.
+
+    With compact_genomes, genomes are CompactGenomes, which keep their genes in
+    NumPy arrays: far less memory per genome and cheap to send to workers.
+
+    Every checkpoint_every generations the evolution state is saved in the
+    background under CHECKPOINT_PREFIX, keeping the last keep_checkpoints files.
+    resume is a checkpoint path (or "latest") to continue a previous run from.
+
+    In visual mode only the max_drawn_birds fittest birds are drawn as sprites
+    and only every render_every-th simulation step is drawn.
+
+    With profile set to a file name (.jsonl or .csv), per-phase timings and
+    counters of every generation are written to that file. Phases are timed
+    where episodes are played, so profiling needs in-process evaluation.
+
+    Every episode ends after max_frames frames or max_pipes passed pipes (None
+    for no limit), so a generation's wall time is bounded even once birds
+    stop dying. With early_stop, an episode also ends as soon as a bird
+    reaches the config's fitness_threshold, which ends the run.
+
+    When training completes, the winning genome is pickled to save_winner +
+    ".pkl" and compiled into a standalone policy (see policy.py) saved to
+    save_winner + ".npz"; None skips saving.
+
+    A summary of every generation (fitness quantiles, species sizes, genome
+    complexity and timing) is written to the CSV file stats_log, which can be
+    read while training runs (see streaming_stats.py). A resumed run appends to
+    it, a new one starts it afresh. Only a bounded window is kept in memory.
+    With stats_log None, neat's StatisticsReporter keeps the full history in
+    memory instead and checkpoints carry it along.
+
+    With record set to a directory, every record_every-th generation's episode
+    is recorded there as generation-NNNNN.npz (course seeds, genome IDs and
+    packed jump decisions), to be watched or checked later with replay.py.
+    Recording needs seeded courses (a random base seed is picked if none is
+    given) and in-process evaluation, since workers do not send decisions back.
+    Genomes whose fitness came from the fitness cache are not flown, so they
+    are not in the recording.
     """
+    global HEADLESS, COURSE_SEED, MAX_DRAWN_BIRDS, RENDER_EVERY, current_generation
+    global MAX_FRAMES, MAX_PIPES, EARLY_STOP, FIXED_COURSE, COURSES, AGGREGATE, RECORD_DIR, RECORD_EVERY
+    if aggregate not in ("mean", "min") and not 0 <= float(aggregate) <= 1:
+        raise ValueError(f"aggregate must be 'mean', 'min' or a quantile in [0, 1], not {aggregate!r}")
+    HEADLESS = headless
+    MAX_FRAMES = max_frames or None
+    MAX_PIPES = max_pipes or None
+    EARLY_STOP = early_stop
+    FIXED_COURSE = fixed_course
+    COURSES = max(1, courses)
+    AGGREGATE = aggregate
+    MAX_DRAWN_BIRDS = max_drawn_birds
+    RENDER_EVERY = max(1, render_every)
+    if record and (workers or listen):
+        raise ValueError("Episodes can only be recorded when genomes are evaluated in this process")
+    if profile and (workers or listen):
+        raise ValueError("Phases can only be profiled when genomes are evaluated in this process")
+    RECORD_DIR = record
+    RECORD_EVERY = max(1, record_every)
+
     # Load NEAT configuration
-    config = neat.config.Config(
-        neat.DefaultGenome, 
-        neat.DefaultReproduction,
-        neat.DefaultSpeciesSet, 
-        neat.DefaultStagnation, 
-        config_path
-    )
+    config = load_config(config_path, CompactGenome if compact_genomes else neat.DefaultGenome,
+                         VectorizedSpeciesSet)
     
-    # Create population and add reporters
-    p = neat.Population(config)
+    # Create (or restore) the population and add reporters
+    stats = None if stats_log else neat.StatisticsReporter()
+    if resume:
+        checkpoint = latest_checkpoint(CHECKPOINT_PREFIX) if resume == "latest" else resume
+        if checkpoint is None:
+            raise FileNotFoundError(f"No checkpoint found under {CHECKPOINT_PREFIX}")
+        p, extra = restore_checkpoint(checkpoint, config, stats)
+        if seed is None:
+            seed = extra.get("course_seed")
+        print(f"Resuming from {checkpoint} at generation {p.generation}")
+    else:
+        p = neat.Population(config)
+    current_generation = p.generation
+    genomes = list(p.population.values())
+    print(f"Genome memory: {sum(genome_bytes(g) for g in genomes) / len(genomes):.0f} bytes per genome"
+          f"{' (compact)' if compact_genomes else ''}")
     p.add_reporter(neat.StdOutReporter(True))
-    stats = neat.StatisticsReporter()
-    p.add_reporter(stats)
+    stats_reporter = None
+    if stats_log:
+        stats_reporter = StreamingStatsReporter(stats_log, append=bool(resume))
+        p.add_reporter(stats_reporter)
+        print(f"{'Appending' if resume else 'Writing'} generation statistics to {stats_log}")
+    else:
+        p.add_reporter(stats)
+    caps = [f"{MAX_FRAMES} frames" if MAX_FRAMES else "", f"{MAX_PIPES} pipes" if MAX_PIPES else ""]
+    print(f"Episode cap: {' or '.join(c for c in caps if c) or 'none'}"
+          f"{', stopping at the fitness threshold' if EARLY_STOP else ''}")
+
+    evaluator = None
+    eval_function = main
+    if listen or workers or COURSES > 1 or record:
+        if seed is None:
+            seed = random.randrange(2**31)
+    if listen:
+        host, port = parse_address(listen)
+        print(f"Evaluating on distributed workers, course seed {seed}")
+        evaluator = DistributedEvaluator(config, host, port, seed, task_timeout=task_timeout,
+                                         options=episode_options(config), courses=COURSES,
+                                         fixed_course=fixed_course)
+        evaluator.generation = p.generation
+        eval_function = evaluator.evaluate
+    elif workers:
+        print(f"Evaluating with {workers} worker processes, course seed {seed}")
+        evaluator = ParallelEvaluator(config, workers, seed, options=episode_options(config), courses=COURSES,
+                                      fixed_course=fixed_course)
+        evaluator.generation = p.generation
+        eval_function = evaluator.evaluate
+    COURSE_SEED = seed
+    if record:
+        os.makedirs(record, exist_ok=True)
+        print(f"Recording every {RECORD_EVERY} generation(s) to {record}, course seed {seed}")
+    if COURSES > 1:
+        print(f"Every genome flies {COURSES} courses per generation, fitness aggregate: {AGGREGATE}")
+
+    if fitness_cache and seed is not None:
+        # Fitness only repeats on a seeded course; random pipes are never cached
+        cache = FitnessCache(eval_function, evaluator.course_seeds if evaluator else course_seeds, fitness_cache)
+        p.add_reporter(cache)
+        eval_function = cache.evaluate
+
+    checkpointer = None
+    if checkpoint_every:
+        checkpointer = AsyncCheckpointer(checkpoint_every, keep_checkpoints, CHECKPOINT_PREFIX,
+                                         stats=stats, extra={"course_seed": seed})
+        p.add_reporter(checkpointer)
+
+    profiler = None
+    if profile:
+        profiler = PhaseReporter(profile, extra={"max_frames": MAX_FRAMES, "max_pipes": MAX_PIPES})
+        p.add_reporter(profiler)
 
     try:
-        # Run evolution for 50 generations
-        winner = p.run(main, 50)
+        # Run evolution for the requested number of generations
+        winner = p.run(eval_function, generations)
         print(f"\nTraining completed! Best genome: {winner}")
+        if save_winner:
+            save_winner_files(winner, config, save_winner)
     finally:
-        # Clean up pygame resources
-        if pygame.get_init():
+        if checkpointer is not None:
+            checkpointer.close()
+        if profiler is not None:
+            profiler.close()
+        if stats_reporter is not None:
+            stats_reporter.close()
+        if evaluator is not None:
+            evaluator.close()
+        # Clean up pygame resources, if anything started them
+        pygame = sys.modules.get("pygame")
+        if pygame is not None and pygame.get_init():
             pygame.quit()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train Flappy Bird agents with NEAT")
+    parser.add_argument("--headless", action="store_true",
+                        help="train without a window or frame limit, as fast as possible")
+    parser.add_argument("--generations", type=int, default=50,
+                        help="maximum number of generations to evolve (default: 50)")
+    parser.add_argument("--workers", type=int, nargs="?", const=os.cpu_count(),
+                        help="evaluate genomes headlessly in a process pool (default size: one per core)")
+    parser.add_argument("--seed", type=int,
+                        help="base seed of the per-generation pipe courses (default: random pipes)")
+    parser.add_argument("--checkpoint-every", type=int, default=5,
+                        help="save a checkpoint every N generations, 0 to disable (default: 5)")
+    parser.add_argument("--keep-checkpoints", type=int, default=3,
+                        help="number of most recent checkpoints to keep (default: 3)")
+    parser.add_argument("--resume", metavar="CHECKPOINT",
+                        help="continue training from a checkpoint file, or 'latest'")
+    parser.add_argument("--max-drawn-birds", type=int, default=50,
+                        help="fittest birds drawn with sprites, the rest as markers (default: 50)")
+    parser.add_argument("--render-every", type=int, default=1,
+                        help="draw only every Nth simulation step (default: 1)")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="write per-generation phase timings to FILE (.jsonl or .csv; needs in-process evaluation)")
+    parser.add_argument("--max-frames", type=int, default=5000,
+                        help="end each episode after N frames, 0 for no limit (default: 5000)")
+    parser.add_argument("--max-pipes", type=int, default=0,
+                        help="end each episode once N pipes are passed, 0 for no limit (default: 0)")
+    parser.add_argument("--early-stop", action="store_true",
+                        help="end an episode as soon as a bird reaches the fitness threshold")
+    parser.add_argument("--listen", metavar="HOST:PORT",
+                        help="evaluate genomes on distributed.py workers connecting to this address; the "
+                             "host defaults to 127.0.0.1, give one such as 0.0.0.0 to accept other machines "
+                             "(workers are not authenticated: trusted networks only)")
+    parser.add_argument("--task-timeout", type=float, default=60.0,
+                        help="seconds before a distributed batch is re-sent to another worker (default: 60)")
+    parser.add_argument("--fixed-course", action="store_true",
+                        help="fly the course for --seed in every generation instead of a new one each time")
+    parser.add_argument("--fitness-cache", type=int, default=4096,
+                        help="fitness values remembered on seeded courses, 0 to disable (default: 4096)")
+    parser.add_argument("--courses", type=int, default=1,
+                        help="seeded courses every genome flies per generation (default: 1)")
+    parser.add_argument("--aggregate", default="mean",
+                        help="fitness over several courses: mean, min, or a quantile like 0.25 (default: mean)")
+    parser.add_argument("--compact-genomes", action="store_true",
+                        help="store genomes as NumPy arrays, for very large populations")
+    parser.add_argument("--save-winner", metavar="PREFIX", default=WINNER_PREFIX,
+                        help="save the winner to PREFIX.pkl and its compiled policy to PREFIX.npz, "
+                             "'' to skip (default: %(default)s)")
+    parser.add_argument("--stats-log", metavar="FILE", default=STATS_LOG,
+                        help="write per-generation statistics to FILE (appended to with --resume), '' to "
+                             "keep the full history in memory instead (default: %(default)s)")
+    parser.add_argument("--record", metavar="DIR",
+                        help="record episodes to DIR for replay.py (needs in-process evaluation)")
+    parser.add_argument("--record-every", type=int, default=1,
+                        help="record every Nth generation's episode (default: 1)")
+    args = parser.parse_args()
+
     local_dir = os.path.dirname(__file__)
     config_path = os.path.join(local_dir, "config-feedforward.txt")
-    run(config_path)
\ No newline at end of file
+    run(config_path, headless=args.headless, generations=args.generations,
+        workers=args.workers, seed=args.seed, checkpoint_every=args.checkpoint_every,
+        keep_checkpoints=args.keep_checkpoints, resume=args.resume,
+        max_drawn_birds=args.max_drawn_birds, render_every=args.render_every,
+        profile=args.profile, max_frames=args.max_frames, max_pipes=args.max_pipes,
+        early_stop=args.early_stop, listen=args.listen, task_timeout=args.task_timeout,
+        fixed_course=args.fixed_course, fitness_cache=args.fitness_cache, courses=args.courses,
+        aggregate=args.aggregate, compact_genomes=args.compact_genomes,
+        save_winner=args.save_winner, stats_log=args.stats_log, record=args.record,
+        record_every=args.record_every)
@@ -8,6 +8,9 @@ A complete Flappy Bird implementation designed for human players with:
 - Score tracking and high score system
 - Smooth gameplay with proper physics
 - Game states: Menu → Playing → Game Over → Restart
+- Autopilot: a trained agent (see policy.py) plays instead of the keyboard,
+  with its per-frame decision latency on an overlay, or plays thousands of
+  games headlessly to measure its scores (play_headless)
 """
 
 import pygame
@@ -16,11 +19,15 @@ import os
 import json
 import math
 import time
+import argparse
+from collections import deque
+from functools import cached_property
 
-# Initialize pygame
-pygame.init()
-pygame.font.init()
-pygame.mixer.init()
+import numpy as np
+
+from policy import load_policy
+from simulation import ArcadeSimulator
+from sprites import PipeCache, RotationAtlas, arcade_rotations
 
 # Game constants
 WINDOW_WIDTH = 600
@@ -43,55 +50,114 @@ PLAYING = 1
 GAME_OVER = 2
 PAUSED = 3
 
-# Load game assets
-try:
-    BIRD_IMGS = [
-        pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "bird1.png"))),
-        pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "bird2.png"))),
-        pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "bird3.png")))
-    ]
-    PIPE_IMG = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "pipe.png")))
-    BASE_IMG = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "base.png")))
-    BG_IMG = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "bg.png")))
-except pygame.error:
-    print("Warning: Could not load image assets. Using colored rectangles instead.")
-    # Create placeholder colored rectangles
-    BIRD_IMGS = [pygame.Surface((50, 35)) for _ in range(3)]
-    for i, surf in enumerate(BIRD_IMGS):
-        surf.fill((255, 255 - i*50, 0))  # Orange to red gradient
-    
-    PIPE_IMG = pygame.Surface((80, 500))
-    PIPE_IMG.fill(GREEN)
-    
-    BASE_IMG = pygame.Surface((WINDOW_WIDTH, 100))
-    BASE_IMG.fill((139, 69, 19))  # Brown
-    
-    BG_IMG = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-    BG_IMG.fill((135, 206, 235))  # Sky blue
+# Autopilot
+LATENCY_WINDOW = 120  # Frames averaged in the latency overlay
+RESTART_DELAY = 120  # Frames the game over screen shows before the autopilot plays again
+
+
+class Assets:
+    """
+    Images, fonts and pre-transformed sprites, each loaded on first use, so
+    importing this module (e.g. for its simulation) needs no display, fonts
+    or audio.
+    """
+
+    @cached_property
+    def images(self):
+        """The game images by name, or colored placeholders if they cannot be loaded."""
+        try:
+            return {
+                "bird": [
+                    pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "bird1.png"))),
+                    pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "bird2.png"))),
+                    pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "bird3.png")))
+                ],
+                "pipe": pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "pipe.png"))),
+                "base": pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "base.png"))),
+                "bg": pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "bg.png"))),
+            }
+        except (pygame.error, FileNotFoundError):
+            print("Warning: Could not load image assets. Using colored rectangles instead.")
+            # Create placeholder colored rectangles
+            bird_imgs = [pygame.Surface((50, 35)) for _ in range(3)]
+            for i, surf in enumerate(bird_imgs):
+                surf.fill((255, 255 - i*50, 0))  # Orange to red gradient
+            
+            pipe_img = pygame.Surface((80, 500))
+            pipe_img.fill(GREEN)
+            
+            base_img = pygame.Surface((WINDOW_WIDTH, 100))
+            base_img.fill((139, 69, 19))  # Brown
+            
+            bg_img = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+            bg_img.fill((135, 206, 235))  # Sky blue
+            return {"bird": bird_imgs, "pipe": pipe_img, "base": base_img, "bg": bg_img}
+
+    @cached_property
+    def bird_atlas(self):
+        """Every animation frame rotated by every rotation Bird.update can produce."""
+        return RotationAtlas(self.images["bird"], arcade_rotations(Bird.GRAVITY, Bird.JUMP_STRENGTH, Bird.MAX_VELOCITY))
+
+    @cached_property
+    def pipe_cache(self):
+        """Pipe segments scaled to the heights in play, built on first use."""
+        return PipeCache(self.images["pipe"], Pipe.WIDTH)
+
+    # Fonts
+    @cached_property
+    def title_font(self):
+        pygame.font.init()
+        return pygame.font.Font(None, 72)
+
+    @cached_property
+    def large_font(self):
+        pygame.font.init()
+        return pygame.font.Font(None, 48)
 
-# Fonts
-TITLE_FONT = pygame.font.Font(None, 72)
-LARGE_FONT = pygame.font.Font(None, 48)
-MEDIUM_FONT = pygame.font.Font(None, 36)
-SMALL_FONT = pygame.font.Font(None, 24)
+    @cached_property
+    def medium_font(self):
+        pygame.font.init()
+        return pygame.font.Font(None, 36)
+
+    @cached_property
+    def small_font(self):
+        pygame.font.init()
+        return pygame.font.Font(None, 24)
+
+    def convert(self):
+        """
+        Convert the drawn surfaces to the display pixel format once the window exists.
+        The background is opaque; blitting it with its per-pixel alpha is slow.
+        """
+        self.images["bg"] = self.images["bg"].convert()
+        self.bird_atlas.convert()
+
+
+ASSETS = Assets()
 
 # High score file
 HIGH_SCORE_FILE = "high_score.json"
 
 
 class Bird:
-    """Enhanced Bird class for human gameplay with smooth animations."""
+    """
+    Enhanced Bird class for human gameplay with smooth animations.
+    During play the bird is moved by ArcadeSimulator, which mirrors update().
+    """
+    GRAVITY = 0.8
+    JUMP_STRENGTH = -12
+    MAX_VELOCITY = 10
     
     def __init__(self, x, y):
         self.x = x
         self.y = y
         self.velocity = 0
-        self.gravity = 0.8
-        self.jump_strength = -12
-        self.max_velocity = 10
+        self.gravity = self.GRAVITY
+        self.jump_strength = self.JUMP_STRENGTH
+        self.max_velocity = self.MAX_VELOCITY
         self.rotation = 0
         self.img_count = 0
-        self.img = BIRD_IMGS[0]
+        self.img = ASSETS.images["bird"][0]
         
     def jump(self):
         """Make the bird jump with smooth physics."""
@@ -119,11 +185,11 @@ class Bird:
             self.img_count = 0
             
         frame = (self.img_count // 5) % 3
-        self.img = BIRD_IMGS[frame]
+        self.img = ASSETS.images["bird"][frame]
         
     def draw(self, screen):
         """Draw the bird with rotation."""
-        rotated_img = pygame.transform.rotate(self.img, self.rotation)
+        rotated_img = ASSETS.bird_atlas.rotated(self.img, self.rotation)
         rect = rotated_img.get_rect(center=(self.x, self.y))
         screen.blit(rotated_img, rect)
         
@@ -133,16 +199,20 @@ class Bird:
 
 
 class Pipe:
-    """Enhanced Pipe class with better collision detection."""
+    """
+    Enhanced Pipe class with better collision detection.
+    During play the pipes are moved by ArcadeSimulator, which mirrors update().
+    """
+    WIDTH = 80
     
-    def __init__(self, x):
+    def __init__(self, x, gap_y=None):
         self.x = x
         self.gap_size = 200
-        self.width = 80
+        self.width = self.WIDTH
         self.speed = 4
         
-        # Random gap position
-        self.gap_y = random.randint(150, WINDOW_HEIGHT - 250)
+        # Given or random gap position
+        self.gap_y = random.randint(150, WINDOW_HEIGHT - 250) if gap_y is None else gap_y
         self.top_height = self.gap_y
         self.bottom_y = self.gap_y + self.gap_size
         self.bottom_height = WINDOW_HEIGHT - self.bottom_y
@@ -157,12 +227,11 @@ class Pipe:
         """Draw both pipe segments."""
         # Top pipe
         top_rect = pygame.Rect(self.x, 0, self.width, self.top_height)
-        screen.blit(pygame.transform.scale(PIPE_IMG, (self.width, self.top_height)), top_rect)
+        screen.blit(ASSETS.pipe_cache.segment(self.top_height), top_rect)
         
         # Bottom pipe
         bottom_rect = pygame.Rect(self.x, self.bottom_y, self.width, self.bottom_height)
-        flipped_pipe = pygame.transform.flip(PIPE_IMG, False, True)
-        screen.blit(pygame.transform.scale(flipped_pipe, (self.width, self.bottom_height)), bottom_rect)
+        screen.blit(ASSETS.pipe_cache.segment(self.bottom_height, flipped=True), bottom_rect)
         
     def collides_with(self, bird):
         """Check collision with bird."""
@@ -177,15 +246,40 @@ class Pipe:
         return self.x + self.width < 0
 
 
+class Autopilot:
+    """
+    Plays with a compiled policy: every frame the bird's observation (the four
+    training inputs, computed by ArcadeSimulator from the bird and the next
+    pipe) goes through the policy, which decides whether the bird jumps. The
+    latencies of the last LATENCY_WINDOW decisions are kept for the overlay.
+    """
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def decide(self, observation):
+        start = time.perf_counter()
+        jump = self.policy.decide(observation)
+        self.latencies.append(time.perf_counter() - start)
+        return jump
+
+
 class Game:
     """Main game class handling all game logic and UI."""
     
-    def __init__(self):
+    def __init__(self, autopilot=None):
+        pygame.init()
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-        pygame.display.set_caption("Flappy Bird - Human Player")
+        pygame.display.set_caption("Flappy Bird - Autopilot" if autopilot else "Flappy Bird - Human Player")
+        ASSETS.convert()
         self.clock = pygame.time.Clock()
         
         self.state = MENU
+        self.sim = ArcadeSimulator(1)  # Shared game core, stepping a single bird
+        self.autopilot = autopilot  # Plays instead of the keyboard when set
+        self.game_over_frames = 0
+        self.jump_requested = False
         self.bird = Bird(150, WINDOW_HEIGHT // 2)
         self.pipes = []
         self.base_x = 0
@@ -196,10 +290,6 @@ class Game:
         self.menu_bounce = 0
         self.flash_timer = 0
         
-        # Game timing
-        self.pipe_timer = 0
-        self.pipe_frequency = 90  # frames between pipes
-        
     def load_high_score(self):
         """Load high score from file."""
         try:
@@ -219,10 +309,11 @@ class Game:
             
     def reset_game(self):
         """Reset game to initial state."""
+        self.sim.reset()
+        self.jump_requested = False
         self.bird = Bird(150, WINDOW_HEIGHT // 2)
         self.pipes = []
         self.score = 0
-        self.pipe_timer = 0
         self.state = PLAYING
         
     def handle_events(self):
@@ -237,8 +328,8 @@ class Game:
                         self.reset_game()
                         
                 elif self.state == PLAYING:
-                    if event.key in [pygame.K_SPACE, pygame.K_UP]:
-                        self.bird.jump()
+                    if event.key in [pygame.K_SPACE, pygame.K_UP] and not self.autopilot:
+                        self.jump_requested = True
                     elif event.key == pygame.K_p:
                         self.state = PAUSED
                         
@@ -259,37 +350,15 @@ class Game:
     def update_game(self):
         """Update game logic."""
         if self.state == PLAYING:
-            # Update bird
-            self.bird.update()
-            
-            # Check ground/ceiling collision
-            if self.bird.y <= 0 or self.bird.y >= WINDOW_HEIGHT - 100:
+            if self.autopilot:
+                self.jump_requested = self.autopilot.decide(self.sim.observations[0])
+            # Advance bird, pipes, collisions and scoring by one frame
+            self.sim.step([self.jump_requested])
+            self.jump_requested = False
+            self.sync_with_simulation()
+            if self.sim.done:
                 self.game_over()
                 return
-                
-            # Update pipes
-            self.pipe_timer += 1
-            if self.pipe_timer >= self.pipe_frequency:
-                self.pipes.append(Pipe(WINDOW_WIDTH))
-                self.pipe_timer = 0
-                
-            # Update existing pipes
-            for pipe in self.pipes[:]:
-                pipe.update()
-                
-                # Check collision
-                if pipe.collides_with(self.bird):
-                    self.game_over()
-                    return
-                    
-                # Check scoring
-                if not pipe.passed and pipe.x + pipe.width < self.bird.x:
-                    pipe.passed = True
-                    self.score += 1
-                    
-                # Remove off-screen pipes
-                if pipe.is_off_screen():
-                    self.pipes.remove(pipe)
                     
             # Update base animation
             self.base_x -= 4
@@ -299,22 +368,46 @@ class Game:
         elif self.state == MENU:
             # Menu animations
             self.menu_bounce += 0.1
+            if self.autopilot:
+                self.reset_game()
+
+        elif self.state == GAME_OVER and self.autopilot:
+            self.game_over_frames += 1
+            if self.game_over_frames >= RESTART_DELAY:
+                self.reset_game()
+            
+    def sync_with_simulation(self):
+        """Copy the simulated bird, pipes and score into the objects that are drawn."""
+        sim = self.sim
+        self.bird.y = float(sim.y[0])
+        self.bird.velocity = float(sim.velocity[0])
+        self.bird.rotation = float(sim.rotation[0])
+        self.bird.img_count = int(sim.img_count[0])
+        self.bird.img = ASSETS.images["bird"][sim.frame[0]]
+        self.pipes = []
+        for x, gap_y, passed in sim.pipes:
+            pipe = Pipe(x, gap_y)
+            pipe.passed = passed
+            self.pipes.append(pipe)
+        self.score = sim.score
             
     def game_over(self):
         """Handle game over logic."""
         self.state = GAME_OVER
-        if self.score > self.high_score:
+        self.game_over_frames = 0
+        # The high score is for human players
+        if self.score > self.high_score and not self.autopilot:
             self.high_score = self.score
             self.save_high_score()
             
     def draw_background(self):
         """Draw scrolling background."""
-        self.screen.blit(BG_IMG, (0, 0))
+        self.screen.blit(ASSETS.images["bg"], (0, 0))
         
     def draw_base(self):
         """Draw scrolling base."""
-        self.screen.blit(BASE_IMG, (self.base_x, WINDOW_HEIGHT - 100))
-        self.screen.blit(BASE_IMG, (self.base_x + WINDOW_WIDTH, WINDOW_HEIGHT - 100))
+        self.screen.blit(ASSETS.images["base"], (self.base_x, WINDOW_HEIGHT - 100))
+        self.screen.blit(ASSETS.images["base"], (self.base_x + WINDOW_WIDTH, WINDOW_HEIGHT - 100))
         
     def draw_text_centered(self, text, font, color, y):
         """Draw centered text."""
@@ -337,17 +430,17 @@ class Game:
         # Animated title
         bounce_offset = math.sin(self.menu_bounce) * 10
         title_y = 200 + bounce_offset
-        self.draw_text_with_shadow("FLAPPY BIRD", TITLE_FONT, YELLOW, DARK_GRAY, 
-                                 (WINDOW_WIDTH - TITLE_FONT.size("FLAPPY BIRD")[0]) // 2, title_y)
+        self.draw_text_with_shadow("FLAPPY BIRD", ASSETS.title_font, YELLOW, DARK_GRAY, 
+                                 (WINDOW_WIDTH - ASSETS.title_font.size("FLAPPY BIRD")[0]) // 2, title_y)
         
         # Instructions
-        self.draw_text_centered("Press SPACE or ↑ to Start", MEDIUM_FONT, WHITE, 350)
-        self.draw_text_centered("Use SPACE or UP to Fly", SMALL_FONT, GRAY, 400)
-        self.draw_text_centered("Press P to Pause", SMALL_FONT, GRAY, 430)
+        self.draw_text_centered("Press SPACE or ↑ to Start", ASSETS.medium_font, WHITE, 350)
+        self.draw_text_centered("Use SPACE or UP to Fly", ASSETS.small_font, GRAY, 400)
+        self.draw_text_centered("Press P to Pause", ASSETS.small_font, GRAY, 430)
         
         # High score
         if self.high_score > 0:
-            self.draw_text_centered(f"High Score: {self.high_score}", MEDIUM_FONT, GREEN, 500)
+            self.draw_text_centered(f"High Score: {self.high_score}", ASSETS.medium_font, GREEN, 500)
             
         # Animated bird
         demo_bird = Bird(300, 300 + bounce_offset)
@@ -366,8 +459,23 @@ class Game:
         self.bird.draw(self.screen)
         
         # Draw score
-        self.draw_text_with_shadow(str(self.score), LARGE_FONT, WHITE, BLACK, 
+        self.draw_text_with_shadow(str(self.score), ASSETS.large_font, WHITE, BLACK, 
                                  WINDOW_WIDTH // 2 - 20, 50)
+        if self.autopilot:
+            self.draw_autopilot_overlay()
+
+    def draw_autopilot_overlay(self):
+        """Show the autopilot's decision latency against the frame budget."""
+        latencies = self.autopilot.latencies
+        lines = ["AUTOPILOT"]
+        if latencies:
+            last, mean, worst = latencies[-1], sum(latencies) / len(latencies), max(latencies)
+            lines.append(f"Decision: {last * 1e6:.1f} us (mean {mean * 1e6:.1f}, max {worst * 1e6:.1f})")
+            lines.append(f"{mean * FPS:.3%} of the {1000 / FPS:.1f} ms frame budget")
+        # Bottom left, above the base and clear of the score
+        top = WINDOW_HEIGHT - 110 - 22 * len(lines)
+        for i, line in enumerate(lines):
+            self.draw_text_with_shadow(line, ASSETS.small_font, YELLOW if i == 0 else WHITE, BLACK, 10, top + 22 * i, 1)
         
     def draw_paused(self):
         """Draw paused state."""
@@ -380,9 +488,9 @@ class Game:
         self.screen.blit(overlay, (0, 0))
         
         # Pause text
-        self.draw_text_centered("PAUSED", LARGE_FONT, WHITE, 300)
-        self.draw_text_centered("Press P to Resume", MEDIUM_FONT, GRAY, 350)
-        self.draw_text_centered("Press ESC for Menu", MEDIUM_FONT, GRAY, 380)
+        self.draw_text_centered("PAUSED", ASSETS.large_font, WHITE, 300)
+        self.draw_text_centered("Press P to Resume", ASSETS.medium_font, GRAY, 350)
+        self.draw_text_centered("Press ESC for Menu", ASSETS.medium_font, GRAY, 380)
         
     def draw_game_over(self):
         """Draw game over state."""
@@ -400,20 +508,20 @@ class Game:
         pygame.draw.rect(self.screen, BLACK, panel_rect, 3)
         
         # Game over text
-        self.draw_text_centered("GAME OVER", LARGE_FONT, RED, 280)
+        self.draw_text_centered("GAME OVER", ASSETS.large_font, RED, 280)
         
         # Score display
-        self.draw_text_centered(f"Score: {self.score}", MEDIUM_FONT, BLACK, 330)
+        self.draw_text_centered(f"Score: {self.score}", ASSETS.medium_font, BLACK, 330)
         
         # High score
         if self.score == self.high_score and self.score > 0:
-            self.draw_text_centered("NEW HIGH SCORE!", MEDIUM_FONT, GREEN, 360)
+            self.draw_text_centered("NEW HIGH SCORE!", ASSETS.medium_font, GREEN, 360)
         else:
-            self.draw_text_centered(f"Best: {self.high_score}", MEDIUM_FONT, GRAY, 360)
+            self.draw_text_centered(f"Best: {self.high_score}", ASSETS.medium_font, GRAY, 360)
             
         # Instructions
-        self.draw_text_centered("Press SPACE to Play Again", SMALL_FONT, BLUE, 450)
-        self.draw_text_centered("Press ESC for Menu", SMALL_FONT, GRAY, 480)
+        self.draw_text_centered("Press SPACE to Play Again", ASSETS.small_font, BLUE, 450)
+        self.draw_text_centered("Press ESC for Menu", ASSETS.small_font, GRAY, 480)
         
     def draw(self):
         """Main drawing function."""
@@ -441,13 +549,67 @@ class Game:
         pygame.quit()
 
 
+def play_headless(policy, games, seed=None, max_frames=10000, batch=1000):
+    """
+    Play games games with policy, without a window and as fast as possible, in
+    batches of up to batch games flown side by side by one ArcadeSimulator.
+    Game i flies the course seeded seed + i (random pipes if seed is None) and
+    ends when the bird dies or after max_frames frames.
+
+    Returns (scores, frames): the pipes passed and frames flown in every game.
+    """
+    scores = np.zeros(games, dtype=np.int64)
+    frames = np.zeros(games, dtype=np.int64)
+    for first in range(0, games, batch):
+        n = min(batch, games - first)
+        sim = ArcadeSimulator(n, lanes=np.arange(n))
+        observations = sim.reset(None if seed is None else [seed + first + i for i in range(n)])
+        played = np.zeros(n, dtype=np.int64)
+        jumps = np.zeros(n, dtype=bool)
+        while not sim.done and sim.frames < max_frames:
+            alive = sim.alive_indices()
+            played[alive] += 1
+            jumps[alive] = policy.decide_batch(observations[alive])
+            observations, _, _ = sim.step(jumps)
+        scores[first:first + n] = sim.scores
+        frames[first:first + n] = played
+    return scores, frames
+
+
 if __name__ == "__main__":
-    print("Starting Human-Playable Flappy Bird!")
-    print("Controls:")
-    print("  SPACE or UP Arrow: Jump/Fly")
-    print("  P: Pause/Resume")
-    print("  ESC: Return to menu")
-    print("\nGood luck!")
-    
-    game = Game()
-    game.run()
+    parser = argparse.ArgumentParser(description="Play Flappy Bird, or watch a trained agent play it")
+    parser.add_argument("--autopilot", metavar="FILE",
+                        help="let a trained agent play: a policy file (winner.npz) or pickled genome (winner.pkl)")
+    parser.add_argument("--headless", action="store_true",
+                        help="with --autopilot, play games without a window as fast as possible and report scores")
+    parser.add_argument("--games", type=int, default=1000,
+                        help="games played with --headless (default: 1000)")
+    parser.add_argument("--seed", type=int,
+                        help="with --headless, game i flies the course seeded SEED + i (default: random pipes)")
+    parser.add_argument("--max-frames", type=int, default=10000,
+                        help="end a --headless game after N frames (default: 10000)")
+    args = parser.parse_args()
+
+    if args.autopilot and args.headless:
+        policy = load_policy(args.autopilot)
+        start = time.perf_counter()
+        scores, frames = play_headless(policy, args.games, args.seed, args.max_frames)
+        elapsed = time.perf_counter() - start
+        print(f"Played {args.games} games in {elapsed:.2f}s: {args.games / elapsed:.0f} games/s, "
+              f"{frames.sum() / elapsed:.0f} bird-frames/s")
+        print(f"Score: mean {scores.mean():.2f}, median {np.median(scores):g}, min {scores.min()}, "
+              f"max {scores.max()}; {np.count_nonzero(frames >= args.max_frames)} games reached the "
+              f"{args.max_frames}-frame cap")
+    elif args.autopilot:
+        game = Game(Autopilot(load_policy(args.autopilot)))
+        game.run()
+    else:
+        print("Starting Human-Playable Flappy Bird!")
+        print("Controls:")
+        print("  SPACE or UP Arrow: Jump/Fly")
+        print("  P: Pause/Resume")
+        print("  ESC: Return to menu")
+        print("\nGood luck!")
+
+        game = Game()
+        game.run()
@@ -0,0 +1,166 @@
+"""
+Compact Genome Encoding
+=======================
+
+Packs a list of NEAT genomes into a handful of flat NumPy arrays and back.
+
+Pickling neat.DefaultGenome objects stores every gene as its own object with its
+own attribute dict, which is slow and large for big populations. Here all node
+genes of all genomes share one array per attribute (and likewise for connection
+genes), with offset arrays marking where each genome's genes start. Gene order
+is preserved, so decoded genomes evaluate and speciate exactly like the
+originals. String attributes (activation, aggregation) are stored as small
+integer codes into a vocabulary. CompactGenome populations already hold their
+genes in such arrays, so they are encoded and decoded without gene objects.
+"""
+
+import io
+
+import numpy as np
+from neat.attributes import BoolAttribute, FloatAttribute, StringAttribute
+
+from compact_genome import CompactGenome
+
+
+def _gene_arrays(prefix, genes_per_genome, gene_type, data):
+    """Store the keys and attributes of one gene kind in data under prefix."""
+    counts = [len(genes) for genes in genes_per_genome]
+    data[prefix + "offsets"] = np.concatenate(([0], np.cumsum(counts, dtype=np.int64)))
+    genes = [gene for genes in genes_per_genome for gene in genes.values()]
+
+    # Node keys are ints, connection keys are (input, output) pairs
+    keys = np.array([gene.key for gene in genes], dtype=np.int64)
+    data[prefix + "key"] = keys.reshape(-1, 2) if prefix == "conn_" else keys
+
+    for attribute in gene_type._gene_attributes:
+        values = [getattr(gene, attribute.name) for gene in genes]
+        name = prefix + attribute.name
+        if isinstance(attribute, FloatAttribute):
+            data[name] = np.array(values, dtype=np.float64)
+        elif isinstance(attribute, BoolAttribute):
+            data[name] = np.array(values, dtype=bool)
+        elif isinstance(attribute, StringAttribute):
+            vocabulary = sorted(set(values))
+            codes = {value: i for i, value in enumerate(vocabulary)}
+            data[name] = np.array([codes[v] for v in values], dtype=np.uint8)
+            data[name + "_vocabulary"] = np.array(vocabulary, dtype=str)
+        else:
+            raise TypeError("Cannot encode gene attribute {0!r}".format(attribute.name))
+
+
+def _compact_gene_arrays(prefix, arrays, layout, attributes, data):
+    """Like _gene_arrays, for the gene arrays of CompactGenomes."""
+    counts = [len(genes) for genes in arrays]
+    data[prefix + "offsets"] = np.concatenate(([0], np.cumsum(counts, dtype=np.int64)))
+    genes = np.concatenate(arrays)
+    if prefix == "conn_":
+        data[prefix + "key"] = np.stack((genes["input"], genes["output"]), axis=1).astype(np.int64)
+    else:
+        data[prefix + "key"] = genes["key"].astype(np.int64)
+    for attribute in attributes:
+        name = prefix + attribute.name
+        data[name] = genes[attribute.name]
+        if attribute.name in layout.vocabulary:
+            data[name + "_vocabulary"] = np.array(layout.vocabulary[attribute.name], dtype=str)
+
+
+def encode_genomes(genomes, genome_config):
+    """Encode a list of genomes as a dict of NumPy arrays."""
+    data = {
+        "genome_key": np.array([g.key for g in genomes], dtype=np.int64),
+        "fitness": np.array([np.nan if g.fitness is None else g.fitness for g in genomes], dtype=np.float64),
+    }
+    if genomes and all(isinstance(g, CompactGenome) for g in genomes):
+        layout = genome_config.layout
+        _compact_gene_arrays("node_", [g.node_genes for g in genomes], layout, layout.node_attributes, data)
+        _compact_gene_arrays("conn_", [g.connection_genes for g in genomes], layout,
+                             layout.connection_attributes, data)
+        return data
+    _gene_arrays("node_", [g.nodes for g in genomes], genome_config.node_gene_type, data)
+    _gene_arrays("conn_", [g.connections for g in genomes], genome_config.connection_gene_type, data)
+    return data
+
+
+def _decode_genes(prefix, data, gene_type, count):
+    """Rebuild per-genome gene dicts for one gene kind."""
+    keys = data[prefix + "key"]
+    keys = [tuple(k) for k in keys.tolist()] if keys.ndim == 2 else keys.tolist()
+    columns = []
+    for attribute in gene_type._gene_attributes:
+        values = data[prefix + attribute.name]
+        if isinstance(attribute, StringAttribute):
+            vocabulary = data[prefix + attribute.name + "_vocabulary"].tolist()
+            values = [vocabulary[code] for code in values.tolist()]
+        else:
+            values = values.tolist()
+        columns.append((attribute.name, values))
+
+    genes = []
+    for i, key in enumerate(keys):
+        gene = gene_type(key)
+        for name, values in columns:
+            setattr(gene, name, values[i])
+        genes.append(gene)
+
+    offsets = data[prefix + "offsets"].tolist()
+    return [{gene.key: gene for gene in genes[offsets[i]:offsets[i + 1]]} for i in range(count)]
+
+
+def _decode_compact_genes(prefix, data, dtype, attributes, layout):
+    """Rebuild per-genome gene arrays of CompactGenomes for one gene kind."""
+    keys = data[prefix + "key"]
+    genes = np.zeros(len(keys), dtype=dtype)
+    if prefix == "conn_":
+        genes["input"], genes["output"] = keys[:, 0], keys[:, 1]
+    else:
+        genes["key"] = keys
+    for attribute in attributes:
+        values = data[prefix + attribute.name]
+        if attribute.name in layout.vocabulary:
+            # Map the stored codes onto the layout's codes
+            codes = layout.codes[attribute.name]
+            vocabulary = data[prefix + attribute.name + "_vocabulary"].tolist()
+            values = np.array([codes.setdefault(v, len(codes)) for v in vocabulary], dtype=np.uint8)[values]
+            layout.vocabulary[attribute.name] = list(codes)
+        genes[attribute.name] = values
+    offsets = data[prefix + "offsets"].tolist()
+    # Copies, so a genome does not keep the whole population's buffer alive
+    return [genes[offsets[i]:offsets[i + 1]].copy() for i in range(len(offsets) - 1)]
+
+
+def decode_genomes(data, genome_config, genome_type):
+    """Rebuild the list of genomes encoded by encode_genomes."""
+    keys = data["genome_key"].tolist()
+    fitness = data["fitness"].tolist()
+    if issubclass(genome_type, CompactGenome):
+        layout = genome_config.layout
+        nodes = _decode_compact_genes("node_", data, layout.node_dtype, layout.node_attributes, layout)
+        connections = _decode_compact_genes("conn_", data, layout.connection_dtype,
+                                            layout.connection_attributes, layout)
+        return [genome_type.from_arrays(key, layout, nodes[i], connections[i],
+                                        None if np.isnan(fitness[i]) else fitness[i])
+                for i, key in enumerate(keys)]
+    nodes = _decode_genes("node_", data, genome_config.node_gene_type, len(keys))
+    connections = _decode_genes("conn_", data, genome_config.connection_gene_type, len(keys))
+
+    genomes = []
+    for i, key in enumerate(keys):
+        genome = genome_type(key)
+        genome.nodes = nodes[i]
+        genome.connections = connections[i]
+        genome.fitness = None if np.isnan(fitness[i]) else fitness[i]
+        genomes.append(genome)
+    return genomes
+
+
+def pack(data):
+    """Serialize a dict of arrays to bytes (uncompressed .npz)."""
+    buffer = io.BytesIO()
+    np.savez(buffer, **data)
+    return buffer.getvalue()
+
+
+def unpack(payload):
+    """Inverse of pack."""
+    with np.load(io.BytesIO(payload), allow_pickle=False) as archive:
+        return {name: archive[name] for name in archive.files}
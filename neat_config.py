@@ -0,0 +1,54 @@
+"""
+NEAT Configuration Loading
+==========================
+
+neat.Config reads each type's parameters from the config file section named
+after its class. The drop-in replacements in this project (CompactGenome,
+VectorizedSpeciesSet) take the same parameters as the neat types they replace
+and name that section in a config_section attribute, so config files keep
+their [DefaultGenome] and [DefaultSpeciesSet] sections:
+
+    config = load_config("config-feedforward.txt", CompactGenome, VectorizedSpeciesSet)
+
+neat.Config.save names the sections after the classes; save_config writes
+them under those same section names instead, so load_config can read the file.
+"""
+
+from configparser import ConfigParser
+
+import neat
+
+
+def _section(type_):
+    return getattr(type_, "config_section", type_.__name__)
+
+
+def load_config(filename, genome_type=neat.DefaultGenome, species_set_type=neat.DefaultSpeciesSet):
+    """
+    A neat.Config for the config file filename, with genome_type and
+    species_set_type parsing their parameters from their config_section.
+    """
+    config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet,
+                                neat.DefaultStagnation, filename)
+    parameters = ConfigParser()
+    with open(filename) as f:
+        parameters.read_file(f)
+    if genome_type is not neat.DefaultGenome:
+        config.genome_type = genome_type
+        config.genome_config = genome_type.parse_config(dict(parameters.items(_section(genome_type))))
+    if species_set_type is not neat.DefaultSpeciesSet:
+        config.species_set_type = species_set_type
+        config.species_set_config = species_set_type.parse_config(
+            dict(parameters.items(_section(species_set_type))))
+    return config
+
+
+def save_config(config, filename):
+    """Write config to filename like neat.Config.save, in the sections load_config reads."""
+    config.save(filename)
+    with open(filename) as f:
+        text = f.read()
+    for type_ in (config.genome_type, config.species_set_type):
+        text = text.replace("\n[{0}]\n".format(type_.__name__), "\n[{0}]\n".format(_section(type_)))
+    with open(filename, "w") as f:
+        f.write(text)
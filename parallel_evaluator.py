@@ -0,0 +1,126 @@
+"""
+Parallel Fitness Evaluation
+===========================
+
+Evaluates a generation across all CPU cores with a multiprocessing pool.
+
+The population is split into one chunk per worker and every chunk is simulated
+headlessly as one batched episode in a worker process: every extra chunk pays
+the per-frame simulator and network overhead again. Chunks are sent as
+genome_codec arrays rather than pickled genome objects. All chunks of a generation fly the same seeded pipe courses,
+so a genome's fitness does not depend on which other birds share its game:
+pipes in flappy_bird.py move and spawn independently of the birds, and each
+bird's episode only depends on the pipe heights it meets.
+"""
+
+import multiprocessing
+import os
+import time
+
+from course import course_seeds, get_course
+from genome_codec import decode_genomes, encode_genomes
+
+# Set in each worker process by _init_worker
+_worker_config = None
+
+
+def _init_worker(config):
+    """Store the NEAT config once per worker instead of sending it with every chunk."""
+    global _worker_config
+    _worker_config = config
+
+
+def _evaluate_chunk(job):
+    """Simulate one chunk of genomes on the courses for seeds; runs in a worker."""
+    data, seeds, options = job
+    # Imported here so this module can be imported by flappy_bird itself
+    from flappy_bird import simulate_episode
+
+    genomes = decode_genomes(data, _worker_config.genome_config, _worker_config.genome_type)
+    sim = simulate_episode(genomes, _worker_config, [get_course(s) for s in seeds], **options)
+    return sim.genome_fitness.tolist(), sim.bird_steps, sim.stop_reason
+
+
+class ParallelEvaluator:
+    """
+    Fitness function for neat.Population.run that spreads genomes over a process pool.
+
+    Generation n is played on the courses course.course_seeds(seed, n,
+    courses, fixed_course) returns, so courses are reproducible across runs
+    and identical in every worker.
+
+    options holds further simulate_episode keyword arguments (the episode
+    caps max_frames, max_pipes and stop_fitness, and the aggregate of the
+    per-course fitnesses). Frame and pipe caps give the same fitnesses as a
+    single process; stop_fitness ends only the chunk whose bird reached it.
+
+    Call close(), or use the evaluator as a context manager, to shut the
+    pool down.
+    """
+
+    def __init__(self, config, num_workers=None, seed=0, chunks_per_worker=1, options=None, courses=1,
+                 fixed_course=False):
+        """Start num_workers worker processes (default: one per CPU core)."""
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.seed = seed
+        self.courses = courses
+        self.fixed_course = fixed_course
+        self.options = options or {}
+        self.chunks_per_worker = chunks_per_worker
+        self.generation = 0
+        self.pool = multiprocessing.Pool(self.num_workers, initializer=_init_worker, initargs=(config,))
+
+    def course_seeds(self, generation):
+        """Seeds of the pipe courses played in the given generation."""
+        return course_seeds(self.seed, generation, self.courses, self.fixed_course)
+
+    def evaluate(self, genomes, config):
+        """Assign fitness to every (genome_id, genome) pair in genomes."""
+        seeds = self.course_seeds(self.generation)
+        self.generation += 1
+
+        ge = [g for _, g in genomes]
+        if not ge:
+            return
+        num_chunks = max(1, min(len(ge), self.num_workers * self.chunks_per_worker))
+        bounds = [len(ge) * i // num_chunks for i in range(num_chunks + 1)]
+        jobs = [(encode_genomes(ge[bounds[i]:bounds[i + 1]], config.genome_config), seeds, self.options)
+                for i in range(num_chunks)]
+
+        start_time = time.perf_counter()
+        results = self.pool.map(_evaluate_chunk, jobs)
+        elapsed = time.perf_counter() - start_time
+
+        bird_steps = 0
+        stop_reasons = set()
+        for i, (fitnesses, steps, stop_reason) in enumerate(results):
+            for g, fitness in zip(ge[bounds[i]:bounds[i + 1]], fitnesses):
+                g.fitness = fitness
+            bird_steps += steps
+            if stop_reason:
+                stop_reasons.add(stop_reason)
+
+        if elapsed > 0:
+            print(f"Evaluated {len(ge)} genomes on course {', '.join(map(str, seeds))} with {self.num_workers} workers "
+                  f"in {elapsed:.2f}s: {bird_steps / elapsed:.0f} bird-steps/s")
+        if stop_reasons:
+            print(f"Episodes stopped at the {' / '.join(sorted(stop_reasons))}")
+
+    def close(self):
+        """Shut down the worker processes; later calls do nothing."""
+        pool, self.pool = getattr(self, "pool", None), None
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __del__(self):
+        # The pool is missing if __init__ failed and None after close()
+        pool = getattr(self, "pool", None)
+        if pool is not None:
+            pool.terminate()
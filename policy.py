@@ -0,0 +1,189 @@
+"""
+Compiled Policy
+===============
+
+A trained genome compiled into a standalone inference artifact: its network as
+topologically ordered weight arrays in a .npz file, and a small evaluator that
+needs only NumPy. A bot can load and run the policy without neat or pygame.
+
+compile_genome prunes the network (see pruning.py, here also folding every
+link from a constant node into the bias) and numbers the remaining nodes
+inputs first and then layer by layer, with each node's response and tanh's
+2.5 scale folded into its weights. A batch of observations is evaluated with one matrix product
+and one tanh per layer. A single observation is too small for NumPy's per-call
+overhead to pay off, so it walks a flat list of (bias, links) per node with
+math.tanh instead, several times faster than FeedForwardNetwork.activate.
+Outputs match FeedForwardNetwork.activate to within rounding (well under
+1e-12).
+
+Usage:
+    policy = Policy.load("winner.npz")
+    jump = policy.decide(observation)          # one bird, 4 inputs
+    outputs = policy.activate_batch(batch)     # shape (n, 4) -> (n, outputs)
+
+    policy = load_policy("winner.pkl")         # compiled from a pickled genome (needs neat)
+
+    python policy.py winner.pkl --output winner.npz   # compile a pickled genome
+"""
+
+import argparse
+import math
+import os
+import pickle
+
+import numpy as np
+
+FORMAT_VERSION = 1
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config-feedforward.txt")
+JUMP_THRESHOLD = 0.3  # A bird jumps when its first output exceeds this
+
+
+class Policy:
+    """
+    A compiled feed-forward network.
+
+    Value slots are the inputs, then the nodes in topological order, then one
+    slot that always reads 0.0 for outputs no connection reaches. Nodes
+    layer_bounds[l] to layer_bounds[l + 1] form layer l and only read earlier
+    slots; weights has one row per node and one column per slot.
+    """
+
+    def __init__(self, num_inputs, output_slots, layer_bounds, weights, bias, response,
+                 threshold=JUMP_THRESHOLD):
+        self.num_inputs = int(num_inputs)
+        self.output_slots = np.asarray(output_slots, dtype=np.int64)
+        self.layer_bounds = np.asarray(layer_bounds, dtype=np.int64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = np.asarray(bias, dtype=np.float64)
+        self.response = np.asarray(response, dtype=np.float64)
+        self.threshold = float(threshold)
+        self.num_slots = self.num_inputs + len(self.bias) + 1
+
+        # (first slot, end slot, scaled weights of the earlier slots, scaled bias) per layer, for batches
+        self._layers = []
+        # (scaled bias, [(slot, scaled weight), ...]) per node in slot order, for single observations
+        self._program = []
+        for first, end in zip(self.layer_bounds[:-1].tolist(), self.layer_bounds[1:].tolist()):
+            rows = slice(first - self.num_inputs, end - self.num_inputs)
+            w = 2.5 * self.response[rows, None] * self.weights[rows, :first]
+            c = 2.5 * self.bias[rows]
+            self._layers.append((first, end, np.ascontiguousarray(w.T), c))
+            for row, bias in zip(w, c.tolist()):
+                links = np.flatnonzero(row)
+                self._program.append((bias, list(zip(links.tolist(), row[links].tolist()))))
+        self._outputs = self.output_slots.tolist()
+
+    @property
+    def num_nodes(self):
+        return len(self.bias)
+
+    @property
+    def num_connections(self):
+        return int(np.count_nonzero(self.weights))
+
+    def activate(self, observation):
+        """Outputs for one observation of num_inputs values, as a list like FeedForwardNetwork's."""
+        if len(observation) != self.num_inputs:
+            raise ValueError("Expected {0} inputs, got {1}".format(self.num_inputs, len(observation)))
+        values = observation.tolist() if isinstance(observation, np.ndarray) else list(observation)
+        tanh = math.tanh
+        for s, links in self._program:
+            for slot, weight in links:
+                s += weight * values[slot]
+            values.append(tanh(s))
+        values.append(0.0)  # The zero slot
+        return [values[slot] for slot in self._outputs]
+
+    def activate_batch(self, observations):
+        """Outputs for observations of shape (n, num_inputs); returns shape (n, num_outputs)."""
+        observations = np.asarray(observations, dtype=np.float64)
+        if observations.ndim != 2 or observations.shape[1] != self.num_inputs:
+            raise ValueError("Expected observations of shape (n, {0}), got {1}".format(
+                self.num_inputs, observations.shape))
+        values = np.zeros((len(observations), self.num_slots))
+        values[:, :self.num_inputs] = observations
+        for first, end, w, c in self._layers:
+            values[:, first:end] = np.tanh(values[:, :first] @ w + c)
+        return values[:, self.output_slots]
+
+    def decide(self, observation):
+        """Whether the bird with this observation jumps."""
+        return bool(self.activate(observation)[0] > self.threshold)
+
+    def decide_batch(self, observations):
+        return self.activate_batch(observations)[:, 0] > self.threshold
+
+    def save(self, path):
+        """Write the policy to path as an uncompressed .npz archive."""
+        with open(path, "wb") as f:
+            np.savez(f, format_version=FORMAT_VERSION, num_inputs=self.num_inputs,
+                     output_slots=self.output_slots, layer_bounds=self.layer_bounds, weights=self.weights,
+                     bias=self.bias, response=self.response, threshold=self.threshold)
+
+    @staticmethod
+    def load(path):
+        with np.load(path, allow_pickle=False) as archive:
+            version = int(archive["format_version"])
+            if version != FORMAT_VERSION:
+                raise ValueError("Unsupported policy format version {0} in {1}".format(version, path))
+            return Policy(int(archive["num_inputs"]), archive["output_slots"], archive["layer_bounds"],
+                          archive["weights"], archive["bias"], archive["response"], float(archive["threshold"]))
+
+
+def compile_genome(genome, config, threshold=JUMP_THRESHOLD):
+    """Compile a genome's feed-forward network into a Policy."""
+    # Imported here so loading and running a policy needs only NumPy
+    from batched_network import _network_genes
+    from pruning import prune_network
+
+    genome_config = config.genome_config
+    input_keys = genome_config.input_keys
+    output_keys = genome_config.output_keys
+    connections, weights, genes = _network_genes(genome, genome_config)
+
+    slots = {key: i for i, key in enumerate(input_keys)}
+    layer_bounds = [len(input_keys)]
+    nodes = []
+    for layer in prune_network(input_keys, output_keys, connections, weights, genes, exact=False):
+        for node, bias, response, offset, links in layer:
+            slots[node] = len(slots)
+            nodes.append((bias + response * offset, response, links))
+        layer_bounds.append(len(slots))
+
+    num_slots = len(slots) + 1
+    matrix = np.zeros((len(nodes), num_slots))
+    for row, (_, _, links) in enumerate(nodes):
+        for inode, weight in links:
+            matrix[row, slots[inode]] = weight
+    zero_slot = num_slots - 1
+    output_slots = [slots.get(key, zero_slot) for key in output_keys]
+    return Policy(len(input_keys), output_slots, layer_bounds, matrix,
+                  [bias for bias, _, _ in nodes], [response for _, response, _ in nodes], threshold)
+
+
+def load_policy(path, config_path=CONFIG_PATH):
+    """
+    A policy from a policy file, or compiled from a pickled genome (.pkl, such
+    as flappy_bird.py's winner.pkl) trained with the NEAT config at config_path.
+    """
+    if not path.endswith(".pkl"):
+        return Policy.load(path)
+    from neat_config import load_config
+
+    with open(path, "rb") as f:
+        genome = pickle.load(f)
+    return compile_genome(genome, load_config(config_path, type(genome)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile a pickled genome into a standalone policy file")
+    parser.add_argument("genome", help="pickled genome, such as the winner.pkl saved by flappy_bird.py")
+    parser.add_argument("--output", help="policy file to write (default: the genome path with .npz)")
+    parser.add_argument("--config", default=CONFIG_PATH,
+                        help="NEAT config the genome was trained with (default: config-feedforward.txt)")
+    args = parser.parse_args()
+
+    policy = load_policy(args.genome, args.config)
+    output = args.output or os.path.splitext(args.genome)[0] + ".npz"
+    policy.save(output)
+    print("Wrote {0}: {1} nodes, {2} connections".format(output, policy.num_nodes, policy.num_connections))
@@ -0,0 +1,158 @@
+"""
+Training Loop Profiling
+=======================
+
+Low-overhead phase timers and counters for the training hot path, and a NEAT
+reporter that writes a per-generation breakdown to a JSON-lines or CSV file.
+
+Instrumented code fetches the profiler once per episode and only times phases
+when it is enabled:
+
+    profiler = PROFILER if PROFILER.enabled else None
+    ...
+    if profiler:
+        start = time.perf_counter()
+    nets.activate(...)
+    if profiler:
+        start = profiler.lap("activate", start)
+
+so a disabled profiler costs one truth test per phase. PROFILER.enabled can be
+switched at any time; the reporter records whatever was measured during each
+generation.
+"""
+
+import csv
+import json
+import time
+
+from neat.reporting import BaseReporter
+
+from compact_genome import genome_bytes
+
+# Phases timed in the training loop, in the order they are reported
+PHASES = ["compile", "activate", "record", "physics", "collision", "render"]
+COUNTERS = ["frames", "bird_steps", "activations", "collision_checks", "padded_links", "pruned_nodes",
+            "pruned_links", "capped_birds", "cache_hits"]
+
+
+class PhaseProfiler:
+    """Accumulates wall time per phase and event counters until reset()."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self):
+        self.times = dict.fromkeys(PHASES, 0.0)
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.max_alive = 0
+
+    def lap(self, phase, start):
+        """Add the time since start to phase and return the current time."""
+        now = time.perf_counter()
+        self.times[phase] += now - start
+        return now
+
+    def count(self, counter, n=1):
+        self.counts[counter] += n
+
+    def frame(self, alive):
+        """Record one simulated frame with alive birds flying."""
+        self.counts["frames"] += 1
+        self.counts["bird_steps"] += alive
+        if alive > self.max_alive:
+            self.max_alive = alive
+
+    def timed_collider(self, collide):
+        """
+        Wrap a PopulationSimulator collide function so its calls are timed as
+        the collision phase and the birds it tests are counted.
+        """
+        def timed(pipe_x, pipe_height, ys, frames):
+            start = time.perf_counter()
+            hits = collide(pipe_x, pipe_height, ys, frames)
+            self.lap("collision", start)
+            self.counts["collision_checks"] += len(ys)
+            return hits
+        return timed
+
+
+# The profiler used by flappy_bird.py; disabled unless profiling is requested
+PROFILER = PhaseProfiler()
+
+
+class PhaseReporter(BaseReporter):
+    """
+    Writes the profiler's per-generation breakdown as one record per generation.
+
+    The physics time includes the collision time, which is also reported on
+    its own. Besides the profiled phases, each record holds the wall time of
+    the whole evaluation, of reproduction and speciation ("evolve"), the population and
+    the mean network size. extra holds constant columns added to every record,
+    such as the episode caps. Files ending in .csv get CSV rows, anything else
+    JSON lines. The profiler is enabled while the reporter is active.
+    """
+
+    def __init__(self, filename, profiler=PROFILER, extra=None):
+        self.filename = filename
+        self.profiler = profiler
+        self.extra = extra or {}
+        self.profiler.enabled = True
+        self.csv = filename.endswith(".csv")
+        self.file = open(filename, "w", newline="" if self.csv else None)
+        self.writer = None
+        self.record = None
+        self.generation = None
+        self.generation_start = None
+        self.evaluated = None
+
+    def start_generation(self, generation):
+        self.generation = generation
+        self.profiler.reset()
+        self.generation_start = time.perf_counter()
+
+    def post_evaluate(self, config, population, species, best_genome):
+        self.evaluated = time.perf_counter()
+        genomes = list(population.values())
+        profiler = self.profiler
+        steps = profiler.counts["bird_steps"]
+        self.record = {
+            "generation": self.generation,
+            "population": len(genomes),
+            "evaluate_time": self.evaluated - self.generation_start,
+        }
+        self.record.update(self.extra)
+        self.record.update(("{0}_time".format(phase), t) for phase, t in profiler.times.items())
+        self.record.update(profiler.counts)
+        self.record["mean_alive"] = steps / profiler.counts["frames"] if profiler.counts["frames"] else 0.0
+        self.record["max_alive"] = profiler.max_alive
+        sizes = [g.size() for g in genomes]
+        self.record["mean_nodes"] = sum(nodes for nodes, _ in sizes) / len(genomes)
+        self.record["mean_connections"] = sum(connections for _, connections in sizes) / len(genomes)
+        self.record["mean_genome_bytes"] = sum(genome_bytes(g) for g in genomes) / len(genomes)
+
+    def end_generation(self, config, population, species_set):
+        if self.record is not None:
+            self._write(time.perf_counter() - self.evaluated)
+
+    def found_solution(self, config, generation, best):
+        # The run stops before reproduction, so there is no evolve phase
+        if self.record is not None:
+            self._write(0.0)
+
+    def _write(self, evolve_time):
+        self.record["evolve_time"] = evolve_time
+        if self.csv:
+            if self.writer is None:
+                self.writer = csv.DictWriter(self.file, fieldnames=list(self.record))
+                self.writer.writeheader()
+            self.writer.writerow(self.record)
+        else:
+            self.file.write(json.dumps(self.record) + "\n")
+        self.file.flush()
+        self.record = None
+
+    def close(self):
+        """Stop profiling and close the output file."""
+        self.profiler.enabled = False
+        self.file.close()
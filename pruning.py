@@ -0,0 +1,84 @@
+"""
+Network Pruning
+===============
+
+Simplifies a genome's feed-forward network before it is compiled, without
+changing a single bit of its outputs:
+
+- Only the nodes FeedForwardNetwork would evaluate are kept (enabled
+  connections, nodes the outputs depend on, as in neat's feed_forward_layers).
+- Links with weight 0.0 are dropped: they add nothing to a node's sum.
+- Nodes whose remaining links all come from constant nodes are constant. The
+  constant links at the start of a node's link list are folded into an offset
+  its sum starts from, computed with the same operations in the same order as
+  at run time. Later links keep their place, since moving them would change
+  the rounding of the sum.
+- Nodes no output depends on anymore are removed, and the rest are regrouped
+  into the fewest layers their links allow.
+
+Connection genes are keyed by (input, output), so a genome has no duplicate
+edges to merge.
+"""
+
+import numpy as np
+from neat.graphs import feed_forward_layers
+
+
+def node_value(bias, response, s):
+    """A node's output for link sum s, as computed by BatchedNetwork.activate."""
+    return float(np.tanh(np.clip(2.5 * np.array([bias + response * s]), -60.0, 60.0))[0])
+
+
+def prune_network(input_keys, output_keys, connections, weights, genes, exact=True):
+    """
+    The layers of a network after pruning, as lists of (node, bias, response,
+    offset, links): a node's sum starts from offset and adds its links, pairs of
+    (input node, weight), in FeedForwardNetwork's order.
+
+    connections, weights and genes are as returned by
+    batched_network._network_genes. With exact=False every link from a constant
+    node is folded into the offset, which can change outputs by rounding.
+    """
+    order = [node for layer in feed_forward_layers(input_keys, output_keys, connections) for node in layer]
+    links = {node: [] for node in order}
+    for inode, onode in connections:
+        if onode in links and weights[inode, onode] != 0.0:
+            links[onode].append((inode, weights[inode, onode]))
+
+    offsets = {}
+    constants = {}
+    for node in order:
+        bias, response, activation, aggregation = genes[node]
+        if activation != "tanh" or aggregation != "sum":
+            raise ValueError("Only tanh activation with sum aggregation is supported, "
+                             "got {0}/{1} on node {2}".format(activation, aggregation, node))
+        offset = 0.0
+        remaining = links[node]
+        if constants:
+            remaining = []
+            for inode, weight in links[node]:
+                if inode in constants and (not exact or not remaining):
+                    offset = offset + constants[inode] * weight
+                else:
+                    remaining.append((inode, weight))
+            links[node] = remaining
+        offsets[node] = offset
+        if not remaining:
+            constants[node] = node_value(bias, response, offset)
+
+    # Keep what the outputs still read, then group nodes by their longest path from the inputs
+    live = {key for key in output_keys if key in links}
+    for node in reversed(order):
+        if node in live:
+            live.update(inode for inode, _ in links[node] if inode in links)
+    depth = {}
+    layers = []
+    for node in order:
+        if node not in live:
+            continue
+        depth[node] = 1 + max((depth.get(inode, 0) for inode, _ in links[node]), default=0)
+        if depth[node] > len(layers):
+            layers.append([])
+        bias, response, _, _ = genes[node]
+        layers[depth[node] - 1].append((node, bias, response, offsets[node], links[node]))
+    return layers
@@ -0,0 +1,170 @@
+"""
+Episode Recording and Replay
+============================
+
+Training can record the episodes it simulates instead of drawing them, and
+replay.py plays them back later at any speed. Because pipe courses are seeded
+(see course.py) and the simulation is deterministic, an episode is fully
+described by:
+
+- the course seeds it flew and the IDs of its genomes, one bird per genome
+  and course;
+- the jump decisions of the living birds, one bit per bird per frame.
+
+EpisodeRecorder packs each frame's decisions into bytes while training runs,
+in the order of the living birds. Dead birds take no bits: the replay rebuilds
+which birds are alive at every frame, so it knows whose decision each bit is.
+The bitstream is stored deflate-compressed, which shrinks the long runs of
+non-jumping frames, in a .npz file.
+
+replay() feeds the recorded decisions back through a PopulationSimulator,
+which rebuilds every Bird and Pipe position of the original episode, and
+matches() checks that the final fitness of every bird and the score are
+the recorded ones, bit for bit.
+
+    python replay.py recordings/generation-00012.npz            # watch it
+    python replay.py recordings/generation-00012.npz --verify   # check it, no window
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+from simulation import PopulationSimulator
+
+FORMAT_VERSION = 1
+
+
+class EpisodeRecorder:
+    """
+    Collects the jump decisions of one episode flown by the genomes with IDs
+    genome_ids on the courses with the given seeds. Bird k * len(genome_ids) + i
+    flies course k with genome i, as in flappy_bird.simulate_episode.
+    """
+
+    def __init__(self, genome_ids, seeds):
+        self.genome_ids = np.asarray(genome_ids, dtype=np.int64)
+        self.seeds = np.asarray(seeds, dtype=np.int64)
+        self.steps = []  # Packed decisions of the living birds, one bytes array per simulation step
+
+    def record(self, jumps):
+        """Add one step of jump decisions of the living birds, in their index order."""
+        self.steps.append(np.packbits(jumps))
+
+    def save(self, path, sim, generation=0):
+        """Write the recording of the finished episode sim to path."""
+        jumps = np.concatenate(self.steps) if self.steps else np.zeros(0, dtype=np.uint8)
+        with open(path, "wb") as f:
+            np.savez_compressed(f, format_version=FORMAT_VERSION, generation=generation, seeds=self.seeds,
+                                genome_ids=self.genome_ids, steps=len(self.steps), jumps=jumps,
+                                fitness=sim.fitness, score=sim.score)
+
+
+class Recording:
+    """A recorded episode, as written by EpisodeRecorder.save."""
+
+    def __init__(self, generation, seeds, genome_ids, steps, jumps, fitness, score):
+        self.generation = generation
+        self.seeds = seeds
+        self.genome_ids = genome_ids
+        self.steps = steps
+        self.jumps = jumps  # Packed decisions; each step starts on a byte boundary
+        self.fitness = fitness
+        self.score = score
+
+    @property
+    def birds(self):
+        return len(self.fitness)
+
+    @staticmethod
+    def load(path):
+        with np.load(path, allow_pickle=False) as archive:
+            version = int(archive["format_version"])
+            if version != FORMAT_VERSION:
+                raise ValueError("Unsupported recording format version {0} in {1}".format(version, path))
+            return Recording(int(archive["generation"]), archive["seeds"].tolist(), archive["genome_ids"],
+                             int(archive["steps"]), archive["jumps"], archive["fitness"], int(archive["score"]))
+
+
+def replay(recording, collide, on_frame=None, **sizes):
+    """
+    Play a recording back through a PopulationSimulator and return it when the
+    episode is over. collide and sizes (bird_height, pipe_width, pipe_height)
+    must be what the episode was recorded with; on_frame(sim) is called after
+    every frame and can return False to stop early.
+    """
+    lanes = None
+    seeds = recording.seeds
+    if len(seeds) > 1:
+        lanes = np.repeat(np.arange(len(seeds)), recording.birds // len(seeds))
+    else:
+        seeds = seeds[0]
+    sim = PopulationSimulator(recording.birds, collide, lanes=lanes, **sizes)
+    sim.reset(seeds)
+    jumps = np.zeros(recording.birds, dtype=bool)
+    start = 0
+    for _ in range(recording.steps):
+        alive = sim.alive_indices()
+        end = start + -(-alive.size // 8)
+        jumps[:] = False
+        jumps[alive] = np.unpackbits(recording.jumps[start:end], count=alive.size).astype(bool)
+        start = end
+        sim.step(jumps)
+        if on_frame is not None and on_frame(sim) is False:
+            break
+    return sim
+
+
+def matches(recording, sim):
+    """True if a fully replayed episode ended exactly as the recorded one."""
+    return sim.score == recording.score and np.array_equal(sim.fitness, recording.fitness)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay an episode recorded during training")
+    parser.add_argument("recording", help="recording file written by flappy_bird.py --record")
+    parser.add_argument("--verify", action="store_true",
+                        help="replay without a window and check the episode matches the recording")
+    parser.add_argument("--fps", type=int, default=30, help="frames per second to play at, 0 for no limit "
+                                                            "(default: %(default)s)")
+    args = parser.parse_args()
+
+    if args.verify:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    # Imported here so flappy_bird can import the recorder without a cycle
+    import pygame
+    import flappy_bird
+
+    recording = Recording.load(args.recording)
+    print(f"Generation {recording.generation}: {len(recording.genome_ids)} genomes on course seeds "
+          f"{', '.join(map(str, recording.seeds))}, {recording.steps} steps")
+    assets = flappy_bird.ASSETS
+    sizes = {"bird_height": assets.bird_imgs[0].get_height(), "pipe_width": assets.pipe_img.get_width(),
+             "pipe_height": assets.pipe_img.get_height()}
+
+    on_frame = None
+    closed = False
+    if not args.verify:
+        pygame.init()
+        win = pygame.display.set_mode((flappy_bird.WINDOW_WIDTH, flappy_bird.WINDOW_HEIGHT))
+        pygame.display.set_caption("NEAT Flappy Bird Replay")
+        assets.convert()
+        clock = pygame.time.Clock()
+        base = flappy_bird.Base(730)
+
+        def on_frame(sim):
+            global closed
+            base.move()
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    closed = True
+                    return False
+            flappy_bird.draw_window(win, sim, base, recording.generation)
+            clock.tick(args.fps)
+
+    sim = replay(recording, assets.sprite_collider, on_frame, **sizes)
+    if not closed:
+        print(f"Replay {'matches' if matches(recording, sim) else 'DOES NOT match'} the recording: "
+              f"score {sim.score}, best fitness {sim.fitness.max():.2f}")
+    pygame.quit()
@@ -0,0 +1,597 @@
+"""
+Vectorized Population Simulator
+===============================
+
+Display-independent, batched game core shared by flappy_bird.py and game.py.
+
+Two physics modes are available (see create_simulator):
+
+- "classic": PopulationSimulator, the NEAT training game of flappy_bird.py
+  (tick-count displacement, pixel-perfect pipe collision).
+- "arcade": ArcadeSimulator, the human-playable game of game.py (gravity and
+  velocity, rectangle collision).
+
+Both expose reset(seed) and a batched step(actions) returning observations,
+rewards and done flags for many birds at once.
+
+Instead of one Python Bird object per genome, the whole population is kept in
+NumPy arrays (y, velocity, tick_count, tilt, animation frame, alive mask and
+fitness) and every per-bird part of a frame is a single whole-array operation.
+The arithmetic mirrors the Bird and Pipe classes of each game step for step,
+so a simulated bird moves, scores and dies exactly like the object version.
+
+This module does not import pygame. Pixel-perfect pipe collision needs the
+sprite masks, so it is supplied by the caller: either as a function, or as a
+SpriteCollider built from the sprites' opaque pixels, which answers collisions
+for all living birds with NumPy interval tests.
+"""
+
+import random
+
+import numpy as np
+
+from course import get_course
+
+# Game constants (same as flappy_bird.py)
+WINDOW_WIDTH = 600
+WINDOW_HEIGHT = 800
+FLOOR_Y = 730
+
+
+def row_extents(opaque):
+    """
+    Leftmost and rightmost opaque pixel of every row of a sprite.
+
+    opaque is a boolean (rows, columns) array. Empty rows get an empty interval
+    (left = width, right = -1). Raises ValueError if a row has a transparent gap
+    between opaque pixels, since one interval could not represent it exactly.
+    """
+    opaque = np.asarray(opaque, dtype=bool)
+    width = opaque.shape[1]
+    filled = opaque.any(axis=1)
+    left = np.where(filled, opaque.argmax(axis=1), width)
+    right = np.where(filled, width - 1 - opaque[:, ::-1].argmax(axis=1), -1)
+    if np.any(filled & (opaque.sum(axis=1) != right - left + 1)):
+        raise ValueError("sprite rows must be contiguous to be described by row extents")
+    return left, right
+
+
+class SpriteCollider:
+    """
+    Vectorized pixel-perfect collision between birds and pipes.
+
+    Each sprite row is reduced to the interval between its leftmost and
+    rightmost opaque pixel. A bird overlaps a pipe segment exactly when, on some
+    screen row, the bird's interval and the pipe's interval intersect, which
+    for sprites with contiguous rows is the same answer pygame's mask overlap
+    gives.
+
+    A pipe sprite is only a few runs of identical rows (body, rim, cap), so for
+    the pipe's current x offset the collider tabulates, per bird frame and pipe
+    run, how many bird rows overlap that run. Each bird then needs one table
+    lookup per run instead of a test per row.
+
+    Instances have the collide(pipe_x, pipe_height, ys, frames) signature
+    expected by PopulationSimulator; pipe_height may also be an array with one
+    gap height per bird.
+    """
+
+    def __init__(self, bird_frames, pipe_top, pipe_bottom, bird_x, gap):
+        """
+        bird_frames is a list of opaque-pixel arrays, one per animation frame;
+        pipe_top and pipe_bottom are the opaque pixels of the two pipe sprites.
+        """
+        extents = [row_extents(frame) for frame in bird_frames]
+        self.bird_left = np.array([left for left, _ in extents])
+        self.bird_right = np.array([right for _, right in extents])
+        self.bird_width = np.asarray(bird_frames[0]).shape[1]
+        self.bird_height = self.bird_left.shape[1]
+        self.top_runs = self._runs(*row_extents(pipe_top))
+        self.bottom_runs = self._runs(*row_extents(pipe_bottom))
+        self.pipe_width = np.asarray(pipe_top).shape[1]
+        self.pipe_height = np.asarray(pipe_top).shape[0]
+        self.bird_x = bird_x
+        self.gap = gap
+
+    @staticmethod
+    def _runs(left, right):
+        """Group consecutive rows with the same extent: (start, end, left, right) arrays."""
+        changes = np.flatnonzero((np.diff(left) != 0) | (np.diff(right) != 0)) + 1
+        start = np.concatenate(([0], changes))
+        end = np.concatenate((changes, [left.size]))
+        return start, end, left[start], right[start]
+
+    def __call__(self, pipe_x, pipe_height, ys, frames):
+        """Return which birds at heights ys with animation frames frames hit the pipe."""
+        hits = np.zeros(len(ys), dtype=bool)
+        dx = pipe_x - self.bird_x
+        if not -self.pipe_width < dx < self.bird_width:
+            return hits
+
+        top = pipe_height - self.pipe_height
+        bottom = pipe_height + self.gap
+        y = np.rint(ys).astype(np.int64)
+        frames = np.asarray(frames)
+
+        # Only birds whose bounding box reaches into a segment can touch it
+        per_bird = np.ndim(pipe_height) > 0
+        for segment_y, runs, candidates in (
+                (top, self.top_runs, np.flatnonzero(y < pipe_height)),
+                (bottom, self.bottom_runs, np.flatnonzero(y + self.bird_height > bottom))):
+            if candidates.size:
+                offset = y[candidates] - (segment_y[candidates] if per_bird else segment_y)
+                hits[candidates] |= self._overlaps(offset, frames[candidates], dx, runs)
+        return hits
+
+    def _overlaps(self, offset, frames, dx, runs):
+        """
+        Test birds whose row 0 lies on pipe row offset against one pipe segment.
+        """
+        start, end, run_left, run_right = runs
+
+        # overlapping[f, j, r]: bird row r of frame f intersects pipe run j at this dx
+        left = np.maximum(self.bird_left[:, None, :], run_left[None, :, None] + dx)
+        right = np.minimum(self.bird_right[:, None, :], run_right[None, :, None] + dx)
+        overlapping = left <= right
+        counts = np.zeros(overlapping.shape[:2] + (self.bird_height + 1,), dtype=np.int64)
+        np.cumsum(overlapping, axis=2, out=counts[:, :, 1:])
+
+        # Bird rows [lo, hi) lie on pipe run j; any overlapping row among them is a hit
+        lo = np.clip(start - offset[:, None], 0, self.bird_height)
+        hi = np.clip(end - offset[:, None], 0, self.bird_height)
+        frames = frames[:, None]
+        run = np.arange(start.size)
+        return (counts[frames, run, hi] > counts[frames, run, lo]).any(axis=1)
+
+
+class PopulationSimulator:
+    """
+    Simulates a whole population of birds flying through one shared pipe course.
+
+    The frame loop of flappy_bird.main is rotated into a reset()/step() pair:
+    reset() and the end of every step() move the living birds and return their
+    network inputs, and step(jumps) applies the jump decisions and resolves
+    collisions, pipe scoring and boundary deaths.
+
+    collide(pipe_x, pipe_height, ys, frames) must return a boolean array telling
+    which of the birds at heights ys (with animation frames frames) overlap the
+    pipe, exactly as Pipe.collide would; SpriteCollider is the fast choice.
+
+    course gives the gap height of the i-th pipe as course[i] (see course.py);
+    without one, heights come from random.randrange like Pipe.set_height.
+    reset(seed) switches to the course generated from seed.
+
+    With lanes, birds fly several courses at once: course is a sequence of
+    courses and bird i flies course[lanes[i]]. Pipes move and spawn the same
+    way on every course (all birds share one x), so only the gap heights
+    differ; each pipe then holds an array of heights, one per course.
+    """
+    BIRD_X = 230
+    START_Y = 300
+    JUMP_VELOCITY = -10.5
+    MAX_ROTATION = 25
+    ROTATION_VELOCITY = 20
+    ANIMATION_TIME = 5
+    PIPE_GAP = 200
+    PIPE_VEL = 5
+    PIPE_SPAWN_X = 600
+
+    def __init__(self, size, collide, course=None, bird_height=48, pipe_width=104, pipe_height=640,
+                 lanes=None):
+        """Create a simulator for size birds; call reset() before stepping."""
+        self.size = size
+        self.collide = collide
+        self.course = course
+        self.lanes = None if lanes is None else np.asarray(lanes, dtype=np.int64)
+        self.bird_height = bird_height
+        self.pipe_width = pipe_width
+        self.pipe_height = pipe_height
+
+    def reset(self, seed=None):
+        """
+        Start a new episode and return the first network inputs, shape (size, 4).
+        With seed (a list of seeds with lanes), the episode flies the course for that seed.
+        """
+        if seed is not None:
+            self.course = get_course(seed) if self.lanes is None else [get_course(s) for s in seed]
+        n = self.size
+        self.y = np.full(n, float(self.START_Y))
+        self.velocity = np.zeros(n)
+        self.height = self.y.copy()
+        self.tick_count = np.zeros(n, dtype=np.int64)
+        self.tilt = np.zeros(n, dtype=np.int64)
+        self.img_count = np.zeros(n, dtype=np.int64)
+        self.frame = np.zeros(n, dtype=np.int64)  # index into the bird animation images
+        self.alive = np.ones(n, dtype=bool)
+        self.fitness = np.zeros(n)
+        self.observations = np.zeros((n, 4))
+
+        # Each pipe is [x, gap height, passed]
+        self.pipes_created = 0
+        self.pipes = [self._new_pipe()]
+        self.pipe_ind = 0
+        self.score = 0
+        self.frames = 0
+        self.bird_steps = 0
+
+        self._alive_idx = np.arange(n)
+        self._advance()
+        return self.observations
+
+    @property
+    def done(self):
+        """True once every bird has died."""
+        return self._alive_idx.size == 0
+
+    def alive_indices(self):
+        """Indices of the birds that are still flying."""
+        return self._alive_idx
+
+    def step(self, jumps):
+        """
+        Apply one frame of jump decisions (boolean array of length size).
+
+        Returns (observations, rewards, dones): the next network inputs, the
+        fitness gained this frame and the per-bird death flags.
+        """
+        before = self.fitness.copy()
+        idx = self._alive_idx
+
+        # Jump: negative velocity = upward movement
+        jumpers = idx[np.asarray(jumps, dtype=bool)[idx]]
+        self.velocity[jumpers] = self.JUMP_VELOCITY
+        self.tick_count[jumpers] = 0
+        self.height[jumpers] = self.y[jumpers]
+
+        # Handle pipe collision and passing
+        add_pipe = False
+        removed = []
+        collided = np.zeros(idx.size, dtype=bool)
+        for pipe in self.pipes:
+            hits = self.collide(pipe[0], self._heights(pipe[1], idx), self.y[idx], self.frame[idx])
+            self.fitness[idx[hits]] -= 5  # Collision penalty
+            collided |= hits
+
+            # Every bird shares the same x, so any living bird passing means all did
+            if not pipe[2] and pipe[0] < self.BIRD_X:
+                pipe[2] = True
+                add_pipe = True
+
+            if pipe[0] + self.pipe_width < 0:
+                removed.append(pipe)
+
+        self.alive[idx[collided]] = False
+        idx = idx[~collided]
+
+        for pipe in self.pipes:
+            pipe[0] -= self.PIPE_VEL
+
+        # Add new pipe and reward all surviving birds
+        if add_pipe:
+            self.score += 1
+            self.fitness[idx] += 15  # Big reward for passing pipe
+            self.pipes.append(self._new_pipe())
+
+        for r in removed:
+            self.pipes.remove(r)
+
+        # Check for boundary collisions (ground/ceiling)
+        y = self.y[idx]
+        out = (y + self.bird_height >= FLOOR_Y) | (y < 0)
+        self.fitness[idx[out]] -= 10  # Boundary collision penalty
+        self.alive[idx[out]] = False
+        idx = idx[~out]
+
+        self._alive_idx = idx
+        self._animate(idx)
+        if idx.size:
+            self._advance()
+
+        return self.observations, self.fitness - before, ~self.alive
+
+    def _new_pipe(self):
+        """Create a pipe at the right edge with the next gap height of the course."""
+        if self.lanes is not None:
+            courses = self.course or [None] * (int(self.lanes.max(initial=0)) + 1)
+            height = np.array([random.randrange(50, 450) if c is None else c[self.pipes_created] for c in courses])
+        elif self.course is None:
+            height = random.randrange(50, 450)
+        else:
+            height = self.course[self.pipes_created]
+        self.pipes_created += 1
+        return [self.PIPE_SPAWN_X, height, False]
+
+    def _heights(self, height, idx):
+        """Gap height of a pipe for each of the birds idx."""
+        return height if self.lanes is None else height[self.lanes[idx]]
+
+    def lane_pipes(self, lane=0):
+        """The pipes as (x, gap height, passed) on one course."""
+        if self.lanes is None:
+            return [tuple(pipe) for pipe in self.pipes]
+        return [(x, int(height[lane]), passed) for x, height, passed in self.pipes]
+
+    def _advance(self):
+        """Move the living birds, add survival rewards and compute network inputs."""
+        idx = self._alive_idx
+        self.frames += 1
+        self.bird_steps += idx.size
+
+        # Determine which pipe to focus on for AI input
+        self.pipe_ind = 0
+        if len(self.pipes) > 1 and self.BIRD_X > self.pipes[0][0] + self.pipe_width:
+            self.pipe_ind = 1
+
+        # Physics calculation: velocity + gravity acceleration (Bird.move)
+        tick_count = self.tick_count[idx] + 1
+        displacement = self.velocity[idx] * tick_count + 1.5 * tick_count**2
+        displacement = np.where(displacement >= 16, 16.0, displacement)
+        displacement = np.where(displacement < 0, displacement - 2, displacement)
+        y = self.y[idx] + displacement
+
+        tilt = self.tilt[idx]
+        rising = (displacement < 0) | (y < self.height[idx] + 50)
+        tilt = np.where(rising, np.maximum(tilt, self.MAX_ROTATION),
+                        np.where(tilt > -90, tilt - self.ROTATION_VELOCITY, tilt))
+
+        self.tick_count[idx] = tick_count
+        self.y[idx] = y
+        self.tilt[idx] = tilt
+
+        # Fitness rewards, applied in the same order as the per-bird loop
+        fitness = self.fitness[idx] + 0.1  # Base survival reward
+        near_middle = np.abs(y - WINDOW_HEIGHT / 2) < 100
+        fitness = np.where(near_middle, fitness + 0.05, fitness)
+        fitness = fitness + 0.02  # Small bonus for forward progress
+        self.fitness[idx] = fitness
+
+        # Normalized inputs for the neural networks
+        pipe_x, pipe_height = self.pipes[self.pipe_ind][:2]
+        pipe_center = self._heights(pipe_height, idx) + self.PIPE_GAP / 2
+        obs = self.observations
+        obs[idx, 0] = y / WINDOW_HEIGHT
+        obs[idx, 1] = (y - pipe_center) / (WINDOW_HEIGHT / 2)
+        obs[idx, 2] = self.velocity[idx] / 20.0
+        obs[idx, 3] = (pipe_x - self.BIRD_X) / WINDOW_WIDTH
+
+    def _animate(self, idx):
+        """Advance the wing-flap animation of the living birds (Bird.animate)."""
+        t = self.ANIMATION_TIME
+        img_count = self.img_count[idx] + 1
+        frame = self.frame[idx]
+        frame = np.select(
+            [img_count < t, img_count < t * 2, img_count < t * 3, img_count < t * 4, img_count == t * 4 + 1],
+            [0, 1, 2, 1, 0],
+            frame,
+        )
+        img_count = np.where(img_count == t * 4 + 1, 0, img_count)
+
+        # Special case for steep dive
+        dive = self.tilt[idx] <= -80
+        frame = np.where(dive, 1, frame)
+        img_count = np.where(dive, t * 2, img_count)
+
+        self.img_count[idx] = img_count
+        self.frame[idx] = frame
+
+
+class ArcadeSimulator:
+    """
+    Simulates many birds with the physics of the human-playable game.py.
+
+    Each bird falls by a constant gravity up to a maximum velocity and a jump
+    sets its velocity to JUMP_STRENGTH (game.Bird.update). A new pipe appears
+    every PIPE_FREQUENCY frames and collisions are tested between the bird's
+    and the pipes' rectangles (game.Pipe.collides_with), so no sprites are
+    needed. step(jumps) runs one frame of game.Game.update_game for every
+    living bird.
+
+    There is no fitness in game.py; rewards follow the training game: +0.1 per
+    frame survived, +15 per pipe passed, -5 for hitting a pipe and -10 for
+    leaving the screen. Observations are the four normalized inputs of
+    PopulationSimulator, measured as the training game measures them (see
+    _observe), so that policies trained there can play this game.
+
+    course gives the gap position of the i-th pipe as course[i]; without one,
+    positions come from random.randint like game.Pipe. With lanes, bird i flies
+    course[lanes[i]] as in PopulationSimulator, so independent games can be
+    played side by side. scores holds the pipes each bird has passed.
+    """
+    BIRD_X = 150
+    START_Y = WINDOW_HEIGHT // 2
+    GRAVITY = 0.8
+    JUMP_STRENGTH = -12
+    MAX_VELOCITY = 10
+    BIRD_WIDTH = 50
+    BIRD_HEIGHT = 35
+    ANIMATION_FRAMES = 15
+    GROUND_Y = WINDOW_HEIGHT - 100
+    PIPE_GAP = 200
+    PIPE_WIDTH = 80
+    PIPE_SPEED = 4
+    PIPE_FREQUENCY = 90
+    PIPE_SPAWN_X = WINDOW_WIDTH
+    MIN_GAP_Y = 150
+    MAX_GAP_Y = WINDOW_HEIGHT - 250
+    # Observations in the training game's terms
+    SPRITE_HEIGHT = 48  # The bird sprite both games draw; training measures y at its top
+    MAX_PIPE_DISTANCE = PopulationSimulator.PIPE_SPAWN_X - PopulationSimulator.BIRD_X
+
+    def __init__(self, size, course=None, lanes=None):
+        """Create a simulator for size birds; call reset() before stepping."""
+        self.size = size
+        self.course = course
+        self.lanes = None if lanes is None else np.asarray(lanes, dtype=np.int64)
+
+    def reset(self, seed=None):
+        """
+        Start a new episode and return the first observations, shape (size, 4).
+        With seed (a list of seeds with lanes), the episode flies the course for that seed.
+        """
+        if seed is not None:
+            if self.lanes is None:
+                self.course = get_course(seed, self.MIN_GAP_Y, self.MAX_GAP_Y + 1)
+            else:
+                self.course = [get_course(s, self.MIN_GAP_Y, self.MAX_GAP_Y + 1) for s in seed]
+        n = self.size
+        self.y = np.full(n, float(self.START_Y))
+        self.velocity = np.zeros(n)
+        self.rotation = np.zeros(n)
+        self.img_count = np.zeros(n, dtype=np.int64)
+        self.frame = np.zeros(n, dtype=np.int64)  # index into the bird animation images
+        self.alive = np.ones(n, dtype=bool)
+        self.fitness = np.zeros(n)
+        self.scores = np.zeros(n, dtype=np.int64)
+        self.observations = np.zeros((n, 4))
+
+        # Each pipe is [x, gap y, passed]
+        self.pipes_created = 0
+        self.pipes = []
+        self.pipe_timer = 0
+        self.score = 0
+        self.frames = 0
+        self.bird_steps = 0
+
+        self._alive_idx = np.arange(n)
+        self._observe()
+        return self.observations
+
+    @property
+    def done(self):
+        """True once every bird has died."""
+        return self._alive_idx.size == 0
+
+    def alive_indices(self):
+        """Indices of the birds that are still flying."""
+        return self._alive_idx
+
+    def step(self, jumps):
+        """
+        Apply one frame of jump decisions (boolean array of length size).
+
+        Returns (observations, rewards, dones) like PopulationSimulator.step.
+        """
+        before = self.fitness.copy()
+        idx = self._alive_idx
+        self.frames += 1
+        self.bird_steps += idx.size
+
+        # Jump, then apply gravity and move (Bird.jump, Bird.update)
+        jumping = np.asarray(jumps, dtype=bool)[idx]
+        velocity = np.where(jumping, float(self.JUMP_STRENGTH), self.velocity[idx])
+        velocity = np.minimum(velocity + self.GRAVITY, self.MAX_VELOCITY)
+        y = self.y[idx] + velocity
+        self.velocity[idx] = velocity
+        self.y[idx] = y
+        self.rotation[idx] = np.where(velocity < 0, np.minimum(25, -velocity * 2), np.maximum(-90, -velocity * 3))
+        img_count = self.img_count[idx] + 1
+        img_count[img_count >= self.ANIMATION_FRAMES] = 0
+        self.img_count[idx] = img_count
+        self.frame[idx] = (img_count // 5) % 3
+        self.fitness[idx] += 0.1  # Survival reward
+
+        # Check ground/ceiling collision
+        out = (y <= 0) | (y >= self.GROUND_Y)
+        self.fitness[idx[out]] -= 10
+        self.alive[idx[out]] = False
+        idx = idx[~out]
+
+        # Spawn a pipe every PIPE_FREQUENCY frames
+        self.pipe_timer += 1
+        if self.pipe_timer >= self.PIPE_FREQUENCY:
+            self.pipes.append(self._new_pipe())
+            self.pipe_timer = 0
+
+        # Bird rectangles as pygame.Rect truncates them: Rect(x - 25, y - 17, 50, 35)
+        bird_left = self.BIRD_X - self.BIRD_WIDTH // 2
+        top = np.trunc(self.y[idx] - self.BIRD_HEIGHT // 2)
+        bottom = top + self.BIRD_HEIGHT
+        collided = np.zeros(idx.size, dtype=bool)
+        passed = 0
+        for pipe in self.pipes:
+            pipe[0] -= self.PIPE_SPEED
+            x, gap_y = pipe[0], self._gaps(pipe[1], idx)
+            if x < bird_left + self.BIRD_WIDTH and bird_left < x + self.PIPE_WIDTH:
+                # Top pipe spans [0, gap_y), bottom pipe [gap_y + gap, window height)
+                hits = (top < gap_y) | ((top < WINDOW_HEIGHT) & (bottom > gap_y + self.PIPE_GAP))
+                self.fitness[idx[hits & ~collided]] -= 5
+                collided |= hits
+            if not pipe[2] and x + self.PIPE_WIDTH < self.BIRD_X:
+                pipe[2] = True
+                passed += 1
+
+        self.alive[idx[collided]] = False
+        idx = idx[~collided]
+        if passed and idx.size:
+            self.score += passed
+            self.scores[idx] += passed
+            self.fitness[idx] += 15 * passed
+
+        self.pipes = [pipe for pipe in self.pipes if pipe[0] + self.PIPE_WIDTH >= 0]
+        self._alive_idx = idx
+        self._observe()
+        return self.observations, self.fitness - before, ~self.alive
+
+    def _new_pipe(self):
+        """Create a pipe at the right edge with the next gap position of the course."""
+        if self.lanes is not None:
+            courses = self.course or [None] * (int(self.lanes.max(initial=0)) + 1)
+            gap_y = np.array([random.randint(self.MIN_GAP_Y, self.MAX_GAP_Y) if c is None
+                              else c[self.pipes_created] for c in courses])
+        elif self.course is None:
+            gap_y = random.randint(self.MIN_GAP_Y, self.MAX_GAP_Y)
+        else:
+            gap_y = self.course[self.pipes_created]
+        self.pipes_created += 1
+        return [self.PIPE_SPAWN_X, gap_y, False]
+
+    def _gaps(self, gap_y, idx):
+        """Gap position of a pipe for each of the birds idx."""
+        return gap_y if self.lanes is None else gap_y[self.lanes[idx]]
+
+    def _observe(self):
+        """
+        Compute the normalized inputs of the living birds as PopulationSimulator
+        does, from the same points of the bird and pipes:
+
+        - y is the top of the bird sprite, not its center.
+        - The next pipe is the first whose right edge is not yet behind the
+          bird's left edge. Its distance is measured from that edge and capped
+          at the largest distance of the training game. Before the first pipe
+          appears, a gap in the middle of the screen stands in at that
+          distance.
+        - The velocity input is the bird's velocity in the velocity array,
+          scaled by 1/20 as in the training game.
+        """
+        idx = self._alive_idx
+        bird_left = self.BIRD_X - self.BIRD_WIDTH // 2
+        upcoming = [pipe for pipe in self.pipes if pipe[0] + self.PIPE_WIDTH >= bird_left]
+        if upcoming:
+            pipe_x, gap_y = upcoming[0][:2]
+            pipe_center = self._gaps(gap_y, idx) + self.PIPE_GAP / 2
+        else:
+            pipe_x, pipe_center = WINDOW_WIDTH + self.BIRD_X, WINDOW_HEIGHT / 2
+        y = self.y[idx] - self.SPRITE_HEIGHT / 2
+        obs = self.observations
+        obs[idx, 0] = y / WINDOW_HEIGHT
+        obs[idx, 1] = (y - pipe_center) / (WINDOW_HEIGHT / 2)
+        obs[idx, 2] = self.velocity[idx] / 20.0
+        obs[idx, 3] = min(pipe_x - bird_left, self.MAX_PIPE_DISTANCE) / WINDOW_WIDTH
+
+
+MODES = {
+    "classic": PopulationSimulator,
+    "arcade": ArcadeSimulator,
+}
+
+
+def create_simulator(mode, size, **kwargs):
+    """
+    Create a simulator for size birds with the physics of mode: "classic"
+    (flappy_bird.py, needs a collide function) or "arcade" (game.py).
+    """
+    try:
+        simulator = MODES[mode]
+    except KeyError:
+        raise ValueError("Unknown physics mode {0!r}; choose from {1}".format(mode, ", ".join(MODES)))
+    return simulator(size, **kwargs)
@@ -0,0 +1,328 @@
+"""
+Vectorized Speciation
+=====================
+
+A drop-in replacement for neat.DefaultSpeciesSet for large populations.
+
+The default species set compares every unspeciated genome with every species
+representative in Python, and each comparison walks both genomes' gene dicts.
+Here the whole population is encoded once per generation as sorted arrays of
+(genome, innovation key) ids with the gene attributes alongside, and the
+distances from one representative to every genome are computed in a single
+batch: homologous genes are found with one searchsorted, and disjoint counts
+follow from the gene counts. Rows of distances are cached per representative.
+
+Species assignments are identical to DefaultSpeciesSet:
+
+- gene distances use the same floating-point operations as
+  DefaultNodeGene/DefaultConnectionGene.distance and are summed sequentially
+  in the representative's gene order, so every distance is bit-identical to
+  DefaultGenome.distance(representative, genome);
+- genomes are visited in the same set order, ties go to the first candidate
+  as with min(), and distances are reused in the orientation first computed,
+  like GenomeDistanceCache (a distance is not exactly symmetric in floating
+  point).
+
+CompactGenome populations are read straight from their gene arrays. Genomes
+with other gene types fall back to the default implementation.
+"""
+
+import numpy as np
+from neat.genes import DefaultConnectionGene, DefaultNodeGene
+from neat.species import DefaultSpeciesSet, Species
+
+from compact_genome import CompactGenome, gene_keys
+
+
+NODE_FIELDS = ("bias", "response", "activation", "aggregation")
+CONNECTION_FIELDS = ("weight", "enabled")
+
+
+def _gene_table(genomes, connections, vocabulary):
+    """
+    The node (or connection) genes of genomes, concatenated in gene order:
+    (gene count of every genome, int64 keys, {attribute: column}). Connection
+    keys are packed like compact_genome.gene_keys and string attributes become
+    codes from vocabulary; CompactGenome gene arrays are used as they are.
+    """
+    fields = CONNECTION_FIELDS if connections else NODE_FIELDS
+    if genomes and all(isinstance(g, CompactGenome) for g in genomes):
+        arrays = [g.connection_genes if connections else g.node_genes for g in genomes]
+        genes = np.concatenate(arrays)
+        counts = np.array([len(a) for a in arrays], dtype=np.int64)
+        return counts, gene_keys(genes), {name: genes[name] for name in fields}
+
+    dicts = [g.connections if connections else g.nodes for g in genomes]
+    counts = np.array([len(genes) for genes in dicts], dtype=np.int64)
+    keys = [key for genes in dicts for key in genes]
+    keys = np.array([k[0] * 2**32 + k[1] for k in keys] if connections else keys, dtype=np.int64)
+    genes = [gene for genes in dicts for gene in genes.values()]
+    columns = {}
+    for name in fields:
+        values = [getattr(gene, name) for gene in genes]
+        if values and isinstance(values[0], str):
+            columns[name] = np.array([vocabulary.setdefault(v, len(vocabulary)) for v in values], dtype=np.int64)
+        else:
+            columns[name] = np.array(values, dtype=bool if name == "enabled" else np.float64)
+    return counts, keys, columns
+
+
+class _GeneArrays:
+    """One gene kind (nodes or connections) of a population, as sorted id arrays."""
+
+    def __init__(self, table):
+        counts, keys, columns = table
+        self.size = len(counts)
+        self.counts = counts
+        self.unique = np.unique(keys)
+        self.stride = max(1, self.unique.size)
+
+        genome = np.repeat(np.arange(self.size, dtype=np.int64), counts)
+        ids = genome * self.stride + np.searchsorted(self.unique, keys)
+        order = np.argsort(ids, kind="stable")
+        self.ids = ids[order]
+        self.values = {name: column[order] for name, column in columns.items()}
+
+    def homologous(self, keys):
+        """
+        For the gene keys of one genome, find the matching gene of every
+        population genome: returns (positions, found), shape (size, len(keys)).
+        """
+        if not self.unique.size:
+            shape = (self.size, keys.size)
+            return np.zeros(shape, dtype=np.int64), np.zeros(shape, dtype=bool)
+        codes = np.minimum(np.searchsorted(self.unique, keys), self.unique.size - 1)
+        codes = np.where(self.unique[codes] == keys, codes, -1)
+        query = np.arange(self.size, dtype=np.int64)[:, None] * self.stride + codes[None, :]
+        positions = np.minimum(np.searchsorted(self.ids, query), self.ids.size - 1)
+        found = (self.ids[positions] == query) & (codes >= 0)
+        return positions, found
+
+
+def _component(arrays, table, gene_distance, disjoint_coefficient):
+    """
+    One term of DefaultGenome.distance (node or connection genes) between the
+    genome whose genes are in table and every genome of the population.
+    """
+    _, keys, reference = table
+    size = arrays.size
+    if not keys.size:
+        # Only the other genome's genes count, all of them disjoint
+        counts = arrays.counts
+        return np.where(counts > 0, disjoint_coefficient * counts / np.maximum(counts, 1), 0.0)
+
+    positions, found = arrays.homologous(keys)
+    d = gene_distance(arrays.values, positions, reference)
+    d[~found] = 0.0
+    # Sequential sum in the genome's gene order, as the += loop does
+    total = np.cumsum(d, axis=1)[:, -1] if d.shape[1] else np.zeros(size)
+    homologous = found.sum(axis=1)
+    disjoint = (arrays.counts - homologous) + (keys.size - homologous)
+    largest = np.maximum(arrays.counts, keys.size)
+    return (total + disjoint_coefficient * disjoint) / largest
+
+
+def _node_distance(coefficient):
+    def distance(v, positions, reference):
+        d = (np.abs(reference["bias"][None, :] - v["bias"][positions])
+             + np.abs(reference["response"][None, :] - v["response"][positions]))
+        d = d + (reference["activation"][None, :] != v["activation"][positions])
+        d = d + (reference["aggregation"][None, :] != v["aggregation"][positions])
+        return d * coefficient
+    return distance
+
+
+def _connection_distance(coefficient):
+    def distance(v, positions, reference):
+        d = np.abs(reference["weight"][None, :] - v["weight"][positions])
+        d = d + (reference["enabled"][None, :] != v["enabled"][positions])
+        return d * coefficient
+    return distance
+
+
+class PopulationDistances:
+    """
+    Genomic distances from any genome to every genome of a population.
+    row(genome)[i] equals genome.distance(population[i], genome_config) exactly.
+    """
+
+    def __init__(self, genomes, genome_config):
+        self.vocabulary = {}
+        self.nodes = _GeneArrays(_gene_table(genomes, False, self.vocabulary))
+        self.connections = _GeneArrays(_gene_table(genomes, True, self.vocabulary))
+        self.disjoint = genome_config.compatibility_disjoint_coefficient
+        self.node_distance = _node_distance(genome_config.compatibility_weight_coefficient)
+        self.connection_distance = _connection_distance(genome_config.compatibility_weight_coefficient)
+        self.rows = {}
+
+    def row(self, genome):
+        """Distances from genome to the population (cached by genome key)."""
+        row = self.rows.get(genome.key)
+        if row is None:
+            nodes = _gene_table([genome], False, self.vocabulary)
+            connections = _gene_table([genome], True, self.vocabulary)
+            row = (_component(self.nodes, nodes, self.node_distance, self.disjoint)
+                   + _component(self.connections, connections, self.connection_distance, self.disjoint))
+            self.rows[genome.key] = row
+        return row
+
+
+def _distance_statistics(compared, index):
+    """
+    Mean and standard deviation of the distances a GenomeDistanceCache would
+    hold after the same comparisons: every pair of genomes once per orientation,
+    a genome compared with itself once.
+    """
+    values, weights = [], []
+    seen = []
+    for key, (row, mask) in compared.items():
+        weight = np.where(mask, 2.0, 0.0)
+        i = index.get(key)
+        if i is not None:
+            if mask[i]:
+                weight[i] = 1.0
+            for other in seen:
+                # Already counted from the other genome's side
+                if mask[index[other]] and compared[other][1][i]:
+                    weight[index[other]] = 0.0
+            seen.append(key)
+        values.append(row)
+        weights.append(weight)
+    values, weights = np.concatenate(values), np.concatenate(weights)
+    count = weights.sum()
+    average = (values * weights).sum() / count
+    return average, np.sqrt((weights * (values - average) ** 2).sum() / count)
+
+
+class VectorizedSpeciesSet(DefaultSpeciesSet):
+    """
+    DefaultSpeciesSet with batched, array-based distance computation. Load
+    configs with neat_config.load_config, which reads its parameters from the
+    [DefaultSpeciesSet] section.
+    """
+
+    config_section = "DefaultSpeciesSet"
+
+    @staticmethod
+    def supports(genome_config):
+        return (issubclass(genome_config.node_gene_type, DefaultNodeGene)
+                and issubclass(genome_config.connection_gene_type, DefaultConnectionGene))
+
+    def speciate(self, config, population, generation):
+        """Place genomes into species exactly like DefaultSpeciesSet.speciate."""
+        assert isinstance(population, dict)
+        if not self.supports(config.genome_config):
+            return super().speciate(config, population, generation)
+
+        compatibility_threshold = self.species_set_config.compatibility_threshold
+        keys = list(population)
+        index = {gid: i for i, gid in enumerate(keys)}
+        table = PopulationDistances([population[gid] for gid in keys], config.genome_config)
+        compared = {}  # genome key -> (its distances, columns it was compared with)
+
+        # GenomeDistanceCache answers (a, b) with the distance (b, a) when that
+        # was computed first. That only happens when b is a former representative
+        # still in the population, so those distance rows are remembered.
+        earlier = []  # (column of the representative, its distances, columns it was compared with)
+
+        def row(genome):
+            values = table.row(genome)
+            i = index.get(genome.key)
+            if i is not None:
+                for column, first, mask in earlier:
+                    if mask[i]:
+                        if values is table.rows[genome.key]:
+                            values = values.copy()
+                        values[column] = first[i]
+            return values
+
+        def remember(genome, values, columns):
+            entry = compared.setdefault(genome.key, [values, np.zeros(len(keys), dtype=bool)])
+            entry[0] = values
+            entry[1][columns] = True
+
+        # Find the best representatives for each existing species. Removing
+        # from a set does not reorder it, so the set is visited in this order.
+        # Built from an iterator like the default, so the set's table, and with
+        # it the visiting order, is the same (set(dict) presizes the table).
+        unspeciated = set(iter(population.keys()))
+        visit = np.fromiter((index[gid] for gid in unspeciated), dtype=np.int64, count=len(unspeciated))
+        remaining = np.ones(len(keys), dtype=bool)
+        new_representatives = {}
+        new_members = {}
+        for sid, s in self.species.items():
+            candidates = visit[remaining[visit]]
+            values = row(s.representative)
+            # The new representative is the genome closest to the current representative.
+            new_rid = keys[int(candidates[np.argmin(values[candidates])])]
+            remember(s.representative, values, candidates)
+            if s.representative.key in index:
+                earlier.append((index[s.representative.key], values, compared[s.representative.key][1].copy()))
+            new_representatives[sid] = new_rid
+            new_members[sid] = [new_rid]
+            unspeciated.remove(new_rid)
+            remaining[index[new_rid]] = False
+
+        # Partition population into species based on genetic similarity. Genomes
+        # are visited in the set's pop order and compared with every
+        # representative that exists by then, so each representative is matched
+        # against all later genomes at once, keeping the first closest one.
+        order = []
+        while unspeciated:
+            order.append(unspeciated.pop())
+        columns = np.fromiter((index[gid] for gid in order), dtype=np.int64, count=len(order))
+        closest = np.full(len(order), np.inf)
+        choice = np.full(len(order), -1)
+        species_ids = []
+        representatives = []  # (genome, its distances, position of the first genome compared with it)
+
+        def add_representative(sid, genome, start):
+            values = row(genome)
+            species_ids.append(sid)
+            representatives.append((genome, values, start))
+            d = values[columns[start:]]
+            better = (d < compatibility_threshold) & (d < closest[start:])
+            closest[start:][better] = d[better]
+            choice[start:][better] = len(species_ids) - 1
+
+        for sid, rid in new_representatives.items():
+            add_representative(sid, population[rid], 0)
+        start = 0
+        while True:
+            unmatched = np.flatnonzero(np.isinf(closest[start:]))
+            if not unmatched.size:
+                break
+            # No species is similar enough, create a new species, using
+            # this genome as its representative.
+            start += int(unmatched[0])
+            gid = order[start]
+            sid = next(self.indexer)
+            new_representatives[sid] = gid
+            new_members[sid] = [gid]
+            start += 1
+            add_representative(sid, population[gid], start)
+
+        for gid, b in zip(order, choice.tolist()):
+            if b >= 0:
+                new_members[species_ids[b]].append(gid)
+        for genome, values, first in representatives:
+            remember(genome, values, columns[first:])
+
+        # Update species collection based on new speciation.
+        self.genome_to_species = {}
+        for sid, rid in new_representatives.items():
+            s = self.species.get(sid)
+            if s is None:
+                s = Species(sid, generation)
+                self.species[sid] = s
+
+            members = new_members[sid]
+            for gid in members:
+                self.genome_to_species[gid] = sid
+
+            member_dict = dict((gid, population[gid]) for gid in members)
+            s.update(population[rid], member_dict)
+
+        gdmean, gdstdev = _distance_statistics(compared, index)
+        self.reporters.info(
+            'Mean genetic distance {0:.3f}, standard deviation {1:.3f}'.format(gdmean, gdstdev))
@@ -0,0 +1,116 @@
+"""
+Sprite Atlas
+============
+
+Pre-transformed sprites shared by flappy_bird.py and game.py, so drawing a
+frame only looks surfaces up instead of calling pygame.transform every frame.
+
+- RotationAtlas holds every bird animation frame rotated by every tilt the
+  physics can produce. The tilts are enumerated up front (flappy_tilts,
+  arcade_rotations); an unexpected angle is rotated once and cached.
+- PipeCache holds pipe segments scaled (and flipped) to a given height, built
+  on first use and kept for the most recently used heights.
+
+Once a window exists, convert() switches the cached surfaces to the display
+pixel format (convert_alpha) so blits are fast.
+"""
+
+from collections import OrderedDict
+
+import pygame
+
+
+def flappy_tilts(max_rotation, rotation_velocity, min_tilt=-90, start=0):
+    """
+    All tilts reachable by flappy_bird.Bird.move: the tilt is set to
+    max_rotation when the bird rises and otherwise drops by rotation_velocity
+    while above min_tilt.
+    """
+    tilts = set()
+    pending = [start]
+    while pending:
+        tilt = pending.pop()
+        if tilt in tilts:
+            continue
+        tilts.add(tilt)
+        if tilt < max_rotation:
+            pending.append(max_rotation)
+        if tilt > min_tilt:
+            pending.append(tilt - rotation_velocity)
+    return sorted(tilts)
+
+
+def arcade_rotations(gravity, jump_strength, max_velocity, start=0):
+    """
+    All rotations reachable by game.Bird.update: the velocity falls from start
+    or jump_strength by gravity per frame up to max_velocity, and the rotation
+    is derived from it. The float arithmetic is repeated exactly as the game
+    does it, so the angles compare equal.
+    """
+    rotations = set()
+    for velocity in (start, jump_strength):
+        while True:
+            velocity += gravity
+            if velocity > max_velocity:
+                velocity = max_velocity
+            if velocity < 0:
+                rotations.add(min(25, -velocity * 2))
+            else:
+                rotations.add(max(-90, -velocity * 3))
+            if velocity == max_velocity:
+                break
+    rotations.add(0)
+    return sorted(rotations)
+
+
+class RotationAtlas:
+    """Bird frames pre-rotated by every expected angle, looked up by (image, angle)."""
+
+    def __init__(self, images, angles):
+        """Rotate every surface in images by every angle in angles."""
+        self.surfaces = {}
+        for img in images:
+            for angle in angles:
+                self.surfaces[img, angle] = pygame.transform.rotate(img, angle)
+
+    def rotated(self, img, angle):
+        """Return img rotated by angle, rotating (once) if it was not prebuilt."""
+        surface = self.surfaces.get((img, angle))
+        if surface is None:
+            surface = pygame.transform.rotate(img, angle)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha()
+            self.surfaces[img, angle] = surface
+        return surface
+
+    def convert(self):
+        """Convert all cached surfaces to the display format; needs an open window."""
+        for key, surface in self.surfaces.items():
+            self.surfaces[key] = surface.convert_alpha()
+
+
+class PipeCache:
+    """Pipe segments scaled to a width and height (optionally flipped), built on demand."""
+
+    def __init__(self, img, width, max_size=32):
+        """Keep at most max_size scaled segments; only a few pipes are on screen at once."""
+        self.img = img
+        self.flipped = pygame.transform.flip(img, False, True)
+        self.width = width
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+
+    def segment(self, height, flipped=False):
+        """Return the pipe image scaled to (width, height), vertically flipped if asked."""
+        key = (height, flipped)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = pygame.transform.scale(self.flipped if flipped else self.img, (self.width, height))
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha()
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.max_size:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
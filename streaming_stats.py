@@ -0,0 +1,195 @@
+"""
+Streaming Training Statistics
+=============================
+
+A NEAT reporter that appends a one-line summary of every generation to a CSV
+log instead of keeping the run's history in memory, as neat's
+StatisticsReporter does (a deep copy of every generation's best genome and
+every genome's fitness). Memory stays flat however long training runs: only
+the last few summaries and the best genome so far are kept.
+
+Each summary holds fitness quantiles, species sizes, genome complexity and
+the evaluation and evolution wall times. The log is append-only and every row
+is flushed as one complete line, so it can be read while training runs:
+
+    for row in read_stats("stats.csv", follow=True):
+        print(row["generation"], row["fitness_max"])
+
+    python streaming_stats.py stats.csv --follow
+
+A new run starts the log afresh. A run resumed from a checkpoint appends to
+it instead (append=True), so generations after the checkpoint appear again;
+the later row of a generation is the one that counts.
+"""
+
+import argparse
+import copy
+import csv
+import io
+import os
+import time
+from collections import deque
+
+import numpy as np
+from neat.reporting import BaseReporter
+
+FIELDS = ["generation", "population", "species", "fitness_min", "fitness_q25", "fitness_median",
+          "fitness_q75", "fitness_max", "fitness_mean", "fitness_stdev", "best_genome", "best_species",
+          "species_size_min", "species_size_mean", "species_size_max", "species_sizes", "mean_nodes",
+          "mean_connections", "max_nodes", "max_connections", "extinctions", "evaluate_time", "evolve_time"]
+WINDOW = 100  # Summaries kept in memory
+
+
+class StreamingStatsReporter(BaseReporter):
+    """
+    Appends a summary row per generation to filename and keeps the last window
+    summaries (as dicts, oldest first) in self.window. species_sizes lists the
+    sizes of the evaluated species, ordered by species id, separated by spaces.
+
+    An existing log is overwritten, unless append is set to continue it, as
+    for a resumed run.
+    """
+
+    def __init__(self, filename, window=WINDOW, append=False):
+        self.filename = filename
+        self.window = deque(maxlen=window)
+        self.best_genome = None  # Copy of the fittest genome seen so far
+        self.extinctions = 0
+        self.file = open(filename, "a" if append else "w", newline="")
+        if self.file.tell() == 0:
+            self._write_line(FIELDS)
+        else:
+            with open(filename, newline="") as f:
+                header = next(csv.reader(f), None)
+            if header != FIELDS:
+                self.file.close()
+                raise ValueError("{0} is a statistics log with different columns".format(filename))
+        self.record = None
+        self.generation = None
+        self.generation_start = None
+        self.evaluated = None
+
+    def start_generation(self, generation):
+        self.generation = generation
+        self.generation_start = time.perf_counter()
+
+    def post_evaluate(self, config, population, species, best_genome):
+        self.evaluated = time.perf_counter()
+        genomes = list(population.values())
+        fitness = np.array([g.fitness for g in genomes], dtype=np.float64)
+        q25, median, q75 = np.quantile(fitness, [0.25, 0.5, 0.75])
+        sizes = np.array([len(species.species[sid].members) for sid in sorted(species.species)])
+        complexity = np.array([g.size() for g in genomes]).reshape(-1, 2)
+        if self.best_genome is None or best_genome.fitness > self.best_genome.fitness:
+            self.best_genome = copy.deepcopy(best_genome)
+        self.record = {
+            "generation": self.generation,
+            "population": len(genomes),
+            "species": len(sizes),
+            "fitness_min": fitness.min(),
+            "fitness_q25": q25,
+            "fitness_median": median,
+            "fitness_q75": q75,
+            "fitness_max": fitness.max(),
+            "fitness_mean": fitness.mean(),
+            "fitness_stdev": fitness.std(),
+            "best_genome": best_genome.key,
+            "best_species": species.get_species_id(best_genome.key),
+            "species_size_min": sizes.min() if sizes.size else 0,
+            "species_size_mean": sizes.mean() if sizes.size else 0.0,
+            "species_size_max": sizes.max() if sizes.size else 0,
+            "species_sizes": " ".join(map(str, sizes.tolist())),
+            "mean_nodes": complexity[:, 0].mean(),
+            "mean_connections": complexity[:, 1].mean(),
+            "max_nodes": complexity[:, 0].max(),
+            "max_connections": complexity[:, 1].max(),
+            "evaluate_time": self.evaluated - self.generation_start,
+        }
+
+    def complete_extinction(self):
+        self.extinctions += 1
+
+    def end_generation(self, config, population, species_set):
+        if self.record is not None:
+            self._write(time.perf_counter() - self.evaluated)
+
+    def found_solution(self, config, generation, best):
+        # The run stops before reproduction, so there is no evolve phase
+        if self.record is not None:
+            self._write(0.0)
+
+    def _write(self, evolve_time):
+        self.record["extinctions"] = self.extinctions
+        self.record["evolve_time"] = evolve_time
+        self._write_line([self.record[field] for field in FIELDS])
+        self.window.append(self.record)
+        self.record = None
+
+    def _write_line(self, values):
+        # One write of one complete line, so readers never see half a row
+        line = io.StringIO()
+        csv.writer(line).writerow([_format(v) for v in values])
+        self.file.write(line.getvalue())
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def _format(value):
+    """Plain numbers for NumPy scalars; floats with full precision."""
+    if isinstance(value, (np.integer, int)):
+        return int(value)
+    if isinstance(value, (np.floating, float)):
+        return repr(float(value))
+    return value
+
+
+def _parse(value):
+    for convert in (int, float):
+        try:
+            return convert(value)
+        except ValueError:
+            pass
+    return value
+
+
+def read_stats(filename, follow=False, poll=1.0):
+    """
+    Yield the rows of a statistics log as dicts with numbers parsed, as far as
+    it has been written. With follow, keep waiting for new rows like tail -f,
+    checking every poll seconds.
+    """
+    with open(filename, newline="") as f:
+        header = None
+        pending = ""
+        while True:
+            pending += f.readline()
+            if not pending.endswith("\n"):
+                # End of the log, or a row still being written
+                if not follow:
+                    return
+                time.sleep(poll)
+                continue
+            values = next(csv.reader([pending]))
+            pending = ""
+            if header is None:
+                header = values
+                continue
+            row = dict(zip(header, map(_parse, values)))
+            row["species_sizes"] = [int(s) for s in str(row["species_sizes"]).split()]
+            yield row
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print a training statistics log, optionally as it grows")
+    parser.add_argument("log", nargs="?", default="stats.csv", help="statistics log (default: %(default)s)")
+    parser.add_argument("--follow", action="store_true", help="keep printing new generations as they finish")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.log):
+        parser.error("{0} does not exist".format(args.log))
+    for row in read_stats(args.log, follow=args.follow):
+        print("gen {generation:>6}  fitness max {fitness_max:9.2f}  median {fitness_median:9.2f}  "
+              "species {species:>4}  nodes {mean_nodes:5.2f}  links {mean_connections:6.2f}  "
+              "{evaluate_time:7.3f}s eval  {evolve_time:6.3f}s evolve".format(**row))
@@ -0,0 +1,78 @@
+"""
+Shared fixtures for the regression tests.
+
+The modules live at the top level of the repository and load their images
+from imgs/ relative to the working directory, so the tests run from there
+with pygame's dummy video driver.
+"""
+
+import os
+import random
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import neat  # noqa: E402
+
+import neat_config  # noqa: E402
+
+CONFIG_PATH = os.path.join(ROOT, "config-feedforward.txt")
+
+
+@pytest.fixture(autouse=True)
+def repo_cwd(monkeypatch):
+    monkeypatch.chdir(ROOT)
+
+
+def load_config(genome_type=neat.DefaultGenome, species_set_type=neat.DefaultSpeciesSet):
+    return neat_config.load_config(CONFIG_PATH, genome_type, species_set_type)
+
+
+@pytest.fixture
+def config():
+    return load_config()
+
+
+def evolved_genomes(config, count, seed, mutations=20):
+    """
+    count genomes grown from the config's initial topology by mutations rounds
+    of mutation, with structural mutations made likely so that the networks
+    have hidden nodes, disabled connections and several layers.
+    """
+    random.seed(seed)
+    genome_config = config.genome_config
+    genome_config.node_add_prob = 0.3
+    genome_config.conn_add_prob = 0.5
+    genomes = []
+    for key in range(count):
+        genome = config.genome_type(key)
+        genome.configure_new(genome_config)
+        for _ in range(random.randrange(mutations + 1)):
+            genome.mutate(genome_config)
+        genomes.append(genome)
+    return genomes
+
+
+def steering_genomes(config, count, seed):
+    """
+    Genomes that fly well without training: they jump when the bird is below
+    the centre of the pipe gap (input 2), with randomized gains and biases.
+    """
+    rng = random.Random(seed)
+    genome_config = config.genome_config
+    genomes = []
+    for key in range(count):
+        genome = config.genome_type(key)
+        genome.configure_new(genome_config)
+        for connection in genome.connections.values():
+            connection.weight = 0.0
+        genome.connections[(-2, 0)].weight = rng.uniform(3.0, 5.0)
+        genome.connections[(-3, 0)].weight = rng.uniform(-1.0, 1.0)
+        genome.nodes[0].bias = rng.uniform(-0.3, 0.1)
+        genome.nodes[0].response = 1.0
+        genomes.append(genome)
+    return genomes
@@ -0,0 +1,83 @@
+"""ArcadeSimulator against the game.py Bird/Pipe loop it replaced."""
+
+import random
+
+import game
+from course import get_course
+from simulation import ArcadeSimulator
+
+MAX_FRAMES = 5000
+
+
+def steering_jumps(seed):
+    """Jump decisions from the bird's height and the next gap, with some noise, so birds score and still die."""
+    rng = random.Random(seed)
+    aim = rng.uniform(100, 160)
+    noise = rng.uniform(0.0, 0.03)
+
+    def decide(y, velocity, gap_y):
+        return rng.random() < noise or (velocity > 0 and y > gap_y + aim)
+    return decide
+
+
+def reference_game(course, decide):
+    """
+    Game.update_game before the simulator: one Bird and a list of Pipes.
+    Returns the frame the bird died in (None if it lived MAX_FRAMES frames),
+    the score, every frame's jump decision and the state after each frame survived.
+    """
+    bird = game.Bird(ArcadeSimulator.BIRD_X, game.WINDOW_HEIGHT // 2)
+    pipes = []
+    score = pipe_timer = pipes_created = 0
+    jumps, states = [], []
+    for frame in range(1, MAX_FRAMES + 1):
+        upcoming = [p for p in pipes if p.x + p.width >= bird.x]
+        jumps.append(decide(bird.y, bird.velocity, upcoming[0].gap_y if upcoming else game.WINDOW_HEIGHT / 2))
+        if jumps[-1]:
+            bird.jump()
+        bird.update()
+        if bird.y <= 0 or bird.y >= game.WINDOW_HEIGHT - 100:
+            return frame, score, jumps, states
+        pipe_timer += 1
+        if pipe_timer >= ArcadeSimulator.PIPE_FREQUENCY:
+            pipes.append(game.Pipe(game.WINDOW_WIDTH, course[pipes_created]))
+            pipes_created += 1
+            pipe_timer = 0
+        for pipe in pipes[:]:
+            pipe.update()
+            if pipe.collides_with(bird):
+                return frame, score, jumps, states
+            if not pipe.passed and pipe.x + pipe.width < bird.x:
+                pipe.passed = True
+                score += 1
+            if pipe.is_off_screen():
+                pipes.remove(pipe)
+        states.append((bird.y, bird.velocity, score, [(p.x, p.gap_y) for p in pipes]))
+    return None, score, jumps, states
+
+
+def simulated_game(course, jumps):
+    """ArcadeSimulator(1) fed the given jump decisions; returns what reference_game does."""
+    sim = ArcadeSimulator(1, course=course)
+    sim.reset()
+    states = []
+    for jump in jumps:
+        sim.step([jump])
+        if sim.done:
+            return sim.frames, sim.score, jumps[:sim.frames], states
+        states.append((float(sim.y[0]), float(sim.velocity[0]), sim.score,
+                       [(x, gap_y) for x, gap_y, _ in sim.pipes]))
+    return None, sim.score, jumps, states
+
+
+def test_simulator_matches_reference_game():
+    scores = []
+    for seed in range(12):
+        course = get_course(100 + seed, ArcadeSimulator.MIN_GAP_Y, ArcadeSimulator.MAX_GAP_Y + 1)
+        reference = reference_game(course, steering_jumps(seed))
+        simulated = simulated_game(course, reference[2])
+        assert simulated == reference, "seed {0}".format(seed)
+
+        scores.append(reference[1])
+    # The jumps steer through some pipes before the birds crash
+    assert max(scores) >= 3 and len(set(scores)) > 2
@@ -0,0 +1,31 @@
+"""Policies trained on the classic game playing the arcade game of game.py."""
+
+import pytest
+
+import game
+from policy import compile_genome
+
+# Winner of a flappy_bird.py --headless --courses 3 run: (bias, response, input weights). Its
+# velocity weight is small; winners leaning on velocity do not carry over to arcade velocities
+WINNERS = {
+    "seed-7": (0.18772762572712423, 0.6900846434903035,
+               [-0.15432676219628894, 2.360838072506882, 0.19376359107627084, -0.760844991695518]),
+}
+
+
+def winner_policy(config, bias, response, weights):
+    genome = config.genome_type(0)
+    genome.configure_new(config.genome_config)
+    for i, weight in enumerate(weights):
+        genome.connections[(-1 - i, 0)].weight = weight
+    genome.nodes[0].bias = bias
+    genome.nodes[0].response = response
+    return compile_genome(genome, config)
+
+
+@pytest.mark.parametrize("name", sorted(WINNERS))
+def test_trained_policy_plays_arcade_game(config, name):
+    policy = winner_policy(config, *WINNERS[name])
+    scores, frames = game.play_headless(policy, 100, seed=1, max_frames=3000)
+    # 3000 frames hold 31 pipes; measured from the arcade bird's center and pipe edges, it scored under 1
+    assert scores.mean() >= 20
@@ -0,0 +1,36 @@
+"""BatchedNetwork against neat's FeedForwardNetwork."""
+
+import neat
+import numpy as np
+
+from batched_network import BatchedNetwork
+from conftest import evolved_genomes
+
+
+def observations(count, seed):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-1.5, 1.5, size=(count, 4))
+
+
+def test_batched_network_matches_feed_forward_network(config):
+    genomes = evolved_genomes(config, 300, seed=5)
+    nets = BatchedNetwork.create(genomes, config)
+    # Pruning removes nodes and links without changing the outputs
+    (genome_nodes, genome_links), (nodes, links) = nets.sizes
+    assert nodes < genome_nodes and links < genome_links
+    for seed in range(5):
+        inputs = observations(len(genomes), seed)
+        outputs = nets.activate(inputs)
+        expected = np.array([neat.nn.FeedForwardNetwork.create(g, config).activate(x.tolist())
+                             for g, x in zip(genomes, inputs)])
+        # Sums and products are bit-identical, but np.tanh may differ from math.tanh in the last
+        # bit, and a hidden node's last-bit difference grows slightly through later layers
+        assert np.abs(outputs - expected).max() <= 1e-13
+
+
+def test_batched_network_rows(config):
+    genomes = evolved_genomes(config, 50, seed=6)
+    nets = BatchedNetwork.create(genomes, config)
+    inputs = observations(len(genomes), 7)
+    rows = np.array([3, 17, 18, 42])
+    assert np.array_equal(nets.activate(inputs[rows], rows), nets.activate(inputs)[rows])
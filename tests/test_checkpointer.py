@@ -0,0 +1,50 @@
+"""AsyncCheckpointer rotation and the innovation counters in snapshots."""
+
+import os
+from itertools import count
+
+import neat
+
+from checkpointer import AsyncCheckpointer, latest_checkpoint, snapshot
+
+
+def test_snapshot_keeps_counters_going(config):
+    population = neat.Population(config)
+    config.genome_config.node_indexer = count(40)
+    population.species.indexer = count(7)
+    state = snapshot(config, population.population, population.species, 0)
+    assert (state["next_node_key"], state["next_species_key"]) == (40, 7)
+    # Taking the snapshot does not use the keys up
+    assert config.genome_config.get_new_node_key({}) == 40
+    assert next(population.species.indexer) == 7
+
+
+def test_stale_checkpoints_are_rotated(config, tmp_path):
+    prefix = str(tmp_path / "run-")
+    for generation in (10, 20, 30):  # Left behind by an earlier, longer run
+        path = "{0}{1}.ckpt".format(prefix, generation)
+        open(path, "wb").close()
+        os.utime(path, (generation, generation))
+
+    population = neat.Population(config)
+    checkpointer = AsyncCheckpointer(generation_interval=1, keep_last=2, filename_prefix=prefix)
+    for generation in range(3):
+        checkpointer.start_generation(generation)
+        checkpointer.end_generation(config, population.population, population.species)
+    checkpointer.close()
+
+    assert sorted(os.listdir(tmp_path)) == ["run-1.ckpt", "run-2.ckpt"]
+    assert latest_checkpoint(prefix) == prefix + "2.ckpt"
+
+
+def test_rerun_keeps_its_newest_checkpoints(config, tmp_path):
+    prefix = str(tmp_path / "run-")
+    population = neat.Population(config)
+    for _ in range(2):  # The second run writes the same file names again
+        checkpointer = AsyncCheckpointer(generation_interval=1, keep_last=3, filename_prefix=prefix)
+        for generation in range(3):
+            checkpointer.start_generation(generation)
+            checkpointer.end_generation(config, population.population, population.species)
+        checkpointer.close()
+        assert sorted(os.listdir(tmp_path)) == ["run-0.ckpt", "run-1.ckpt", "run-2.ckpt"]
+    assert latest_checkpoint(prefix) == prefix + "2.ckpt"
@@ -0,0 +1,32 @@
+"""The vectorized SpriteCollider against Pipe.collide's pixel masks."""
+
+import numpy as np
+
+import flappy_bird as fb
+
+
+def test_sprite_collider_matches_pipe_masks():
+    collide = fb.ASSETS.sprite_collider
+    bird_width = fb.ASSETS.bird_imgs[0].get_width()
+    pipe_width = fb.ASSETS.pipe_img.get_width()
+    rng = np.random.default_rng(6)
+    hits = 0
+    for _ in range(300):
+        pipe = fb.Pipe(int(rng.integers(fb.PopulationSimulator.BIRD_X - pipe_width - 5,
+                                         fb.PopulationSimulator.BIRD_X + bird_width + 5)),
+                       int(rng.integers(50, 450)))
+        # Half the birds anywhere on screen, half near the gap's edges where the masks decide
+        ys = np.concatenate([rng.uniform(-60.0, 800.0, 100),
+                             pipe.height + rng.uniform(-40.0, 10.0, 50),
+                             pipe.bottom + rng.uniform(-60.0, 0.0, 50)])
+        frames = rng.integers(0, 3, ys.size)
+
+        expected = np.zeros(ys.size, dtype=bool)
+        for i, (y, frame) in enumerate(zip(ys.tolist(), frames.tolist())):
+            bird = fb.Bird(fb.PopulationSimulator.BIRD_X, y)
+            bird.img = fb.ASSETS.bird_imgs[frame]
+            expected[i] = bool(pipe.collide(bird))
+
+        assert np.array_equal(collide(pipe.x, pipe.height, ys, frames), expected)
+        hits += expected.sum()
+    assert 0 < hits < 300 * ys.size  # Both outcomes are exercised
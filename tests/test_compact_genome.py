@@ -0,0 +1,66 @@
+"""CompactGenome against DefaultGenome, and genome_codec round trips."""
+
+import copy
+import pickle
+
+import neat
+import numpy as np
+import pytest
+
+from compact_genome import CompactGenome
+from conftest import evolved_genomes, load_config
+from genome_codec import decode_genomes, encode_genomes
+
+
+def compact_copies(genomes, compact_config):
+    layout = compact_config.genome_config.layout
+    return [CompactGenome.from_arrays(g.key, layout, layout.to_array(g.nodes),
+                                      layout.to_array(g.connections, connections=True), g.fitness)
+            for g in genomes]
+
+
+def gene_values(genes):
+    return {key: tuple(getattr(gene, a.name) for a in gene._gene_attributes) for key, gene in genes.items()}
+
+
+def test_distance_matches_default_genome(config):
+    genomes = evolved_genomes(config, 40, seed=20)
+    compact = compact_copies(genomes, load_config(CompactGenome))
+    for i, (a, b) in enumerate(zip(genomes, compact)):
+        for c, d in zip(genomes[i:], compact[i:]):
+            assert b.distance(d, config.genome_config) == a.distance(c, config.genome_config)
+
+
+@pytest.mark.parametrize("genome_type", [neat.DefaultGenome, CompactGenome], ids=["default", "compact"])
+def test_codec_round_trip(genome_type):
+    config = load_config(genome_type)
+    genomes = evolved_genomes(config, 60, seed=21)
+    for i, genome in enumerate(genomes):
+        genome.fitness = None if i % 7 == 0 else i / 3
+    decoded = decode_genomes(encode_genomes(genomes, config.genome_config), config.genome_config, genome_type)
+    for genome, copied in zip(genomes, decoded):
+        assert type(copied) is genome_type
+        assert (copied.key, copied.fitness) == (genome.key, genome.fitness)
+        assert gene_values(copied.nodes) == gene_values(genome.nodes)
+        assert gene_values(copied.connections) == gene_values(genome.connections)
+
+
+def test_pickle_leaves_out_the_layout():
+    config = load_config(CompactGenome)
+    genome = evolved_genomes(config, 1, seed=22)[0]
+    data = pickle.dumps(genome, protocol=pickle.HIGHEST_PROTOCOL)
+    assert b"GeneLayout" not in data
+
+    copied = pickle.loads(data)
+    assert copied.layout is None
+    with pytest.raises(RuntimeError):
+        copied.nodes
+    copied.bind(config.genome_config)
+    assert np.array_equal(copied.connection_genes, genome.connection_genes)
+    assert gene_values(copied.nodes) == gene_values(genome.nodes)
+
+    # Copies share the layout but not the genes
+    deep = copy.deepcopy(genome)
+    assert deep.layout is genome.layout
+    deep.connection_genes["weight"] += 1.0
+    assert not np.array_equal(deep.connection_genes, genome.connection_genes)
@@ -0,0 +1,85 @@
+"""A coordinator and workers on 127.0.0.1 against serial evaluation."""
+
+import copy
+import socket
+import threading
+import time
+
+import numpy as np
+
+import flappy_bird as fb
+from conftest import evolved_genomes, steering_genomes
+from course import get_course
+from distributed import DistributedEvaluator, recv_message, run_worker, send_message
+
+OPTIONS = {"max_frames": 1500}
+
+
+def population(config):
+    genomes = steering_genomes(config, 10, seed=30) + evolved_genomes(config, 14, seed=31)
+    for key, genome in enumerate(genomes):
+        genome.key = key
+    return genomes
+
+
+def serial_fitness(genomes, config, seeds):
+    genomes = copy.deepcopy(genomes)
+    sim = fb.simulate_episode(genomes, config, [get_course(s) for s in seeds], **OPTIONS)
+    return sim.genome_fitness.tolist()
+
+
+def start_worker(evaluator, name):
+    thread = threading.Thread(target=run_worker, args=evaluator.address, kwargs={"name": name, "retry_delay": None},
+                              daemon=True)
+    thread.start()
+    return thread
+
+
+def wait_for_workers(evaluator, count, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while len(evaluator.live_workers()) < count:
+        assert time.monotonic() < deadline, "workers did not connect"
+        time.sleep(0.05)
+
+
+def test_workers_match_serial_evaluation(config):
+    genomes = population(config)
+    evaluator = DistributedEvaluator(config, port=0, seed=7, courses=2, options=OPTIONS)
+    workers = [start_worker(evaluator, "w{0}".format(i)) for i in range(2)]
+    try:
+        wait_for_workers(evaluator, 2)
+        evaluator.evaluate(list(enumerate(genomes)), config)
+        assert [w.batches for w in evaluator.workers] == [1, 1]
+    finally:
+        evaluator.close()
+    for worker in workers:
+        worker.join(timeout=10.0)
+    assert [g.fitness for g in genomes] == serial_fitness(genomes, config, evaluator.course_seeds(0))
+
+
+def test_killed_workers_batch_is_reassigned(config):
+    genomes = population(config)
+    evaluator = DistributedEvaluator(config, port=0, seed=8, chunks_per_worker=2, options=OPTIONS)
+    worker = None
+    try:
+        # A worker that dies as soon as it has been given a batch
+        with socket.create_connection(evaluator.address) as doomed:
+            send_message(doomed, {"type": "hello", "name": "doomed"})
+            recv_message(doomed)
+            wait_for_workers(evaluator, 1)
+            generation = threading.Thread(target=evaluator.evaluate, args=(list(enumerate(genomes)), config))
+            generation.start()
+            header, _ = recv_message(doomed)
+            assert header["type"] == "evaluate"
+        worker = start_worker(evaluator, "survivor")
+        generation.join(timeout=60.0)
+        assert not generation.is_alive()
+        survivor, = evaluator.live_workers()
+        assert survivor.batches == 2
+    finally:
+        evaluator.close()
+    if worker is not None:
+        worker.join(timeout=10.0)
+    fitness = [g.fitness for g in genomes]
+    assert None not in fitness
+    assert np.array_equal(fitness, serial_fitness(genomes, config, evaluator.course_seeds(0)))
@@ -0,0 +1,19 @@
+"""Training and worker modules import without pygame."""
+
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+
+# Modules worker processes import; pygame is loaded only when something is drawn or collided
+HEADLESS_MODULES = ["flappy_bird", "simulation", "parallel_evaluator", "distributed", "policy", "replay"]
+
+
+@pytest.mark.parametrize("module", HEADLESS_MODULES)
+def test_import_does_not_load_pygame(module):
+    code = "import sys, {0}; print('pygame' in sys.modules)".format(module)
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+                            check=True).stdout
+    assert output.split()[-1] == "False"
@@ -0,0 +1,25 @@
+"""ParallelEvaluator's process pool against serial evaluation."""
+
+import copy
+
+import flappy_bird as fb
+from conftest import evolved_genomes, steering_genomes
+from course import get_course
+from parallel_evaluator import ParallelEvaluator
+
+OPTIONS = {"max_frames": 1500}
+
+
+def test_pool_matches_serial_evaluation(config):
+    genomes = steering_genomes(config, 10, seed=40) + evolved_genomes(config, 15, seed=41)
+    for key, genome in enumerate(genomes):
+        genome.key = key
+    serial = copy.deepcopy(genomes)
+
+    with ParallelEvaluator(config, 2, seed=9, chunks_per_worker=2, options=OPTIONS, courses=2) as evaluator:
+        evaluator.evaluate(list(enumerate(genomes)), config)
+        seeds = evaluator.course_seeds(0)
+    assert evaluator.pool is None
+
+    sim = fb.simulate_episode(serial, config, [get_course(s) for s in seeds], **OPTIONS)
+    assert [g.fitness for g in genomes] == sim.genome_fitness.tolist()
@@ -0,0 +1,41 @@
+"""Recorded episodes replay exactly, and a changed recording does not."""
+
+import numpy as np
+
+import flappy_bird as fb
+from conftest import evolved_genomes, steering_genomes
+from course import get_course
+from replay import EpisodeRecorder, Recording, matches, replay
+
+SEEDS = [11, 12]
+
+
+def recorded_episode(config, path):
+    genomes = steering_genomes(config, 20, seed=25) + evolved_genomes(config, 20, seed=26)[1:]
+    for key, genome in enumerate(genomes):
+        genome.key = key
+    recorder = EpisodeRecorder([g.key for g in genomes], SEEDS)
+    sim = fb.simulate_episode(genomes, config, [get_course(s) for s in SEEDS], max_frames=1500,
+                              recorder=recorder)
+    recorder.save(path, sim, generation=3)
+    return sim
+
+
+def replayed(recording):
+    assets = fb.ASSETS
+    return replay(recording, assets.sprite_collider, bird_height=assets.bird_imgs[0].get_height(),
+                  pipe_width=assets.pipe_img.get_width(), pipe_height=assets.pipe_img.get_height())
+
+
+def test_replay_matches_recording(config, tmp_path):
+    path = str(tmp_path / "episode.npz")
+    sim = recorded_episode(config, path)
+    recording = Recording.load(path)
+    assert recording.generation == 3 and recording.seeds == SEEDS
+    assert sim.score >= 5 and len(np.unique(sim.fitness)) > 10
+
+    assert matches(recording, replayed(recording))
+
+    # Other decisions make another episode
+    recording.jumps[:recording.jumps.size // 4] ^= 0xFF
+    assert not matches(recording, replayed(recording))
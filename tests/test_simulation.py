@@ -0,0 +1,100 @@
+"""PopulationSimulator against the per-bird Bird/Pipe loop it replaced."""
+
+import neat
+import numpy as np
+
+import flappy_bird as fb
+from conftest import evolved_genomes, steering_genomes
+from course import get_course
+from simulation import PopulationSimulator
+
+MAX_FRAMES = 1500
+
+
+def reference_episode(genomes, config, course):
+    """The training loop before the simulator: one Bird, Pipe.collide and network per genome."""
+    nets = [neat.nn.FeedForwardNetwork.create(g, config) for g in genomes]
+    birds = [fb.Bird(230, 300) for _ in genomes]
+    fitness = [0.0] * len(genomes)
+    living = list(range(len(genomes)))
+    pipes = [fb.Pipe(600, course[0])]
+    created = 1
+    score = frames = 0
+    while living:
+        frames += 1
+        pipe_ind = 0
+        if len(pipes) > 1 and birds[0].x > pipes[0].x + fb.ASSETS.pipe_top_img.get_width():
+            pipe_ind = 1
+        for i in living:
+            bird = birds[i]
+            bird.move()
+            fitness[i] += 0.1
+            if abs(bird.y - fb.WINDOW_HEIGHT / 2) < 100:
+                fitness[i] += 0.05
+            fitness[i] += 0.02
+            pipe = pipes[pipe_ind]
+            inputs = (bird.y / fb.WINDOW_HEIGHT, (bird.y - (pipe.height + pipe.GAP / 2)) / (fb.WINDOW_HEIGHT / 2),
+                      bird.velocity / 20.0, (pipe.x - bird.x) / fb.WINDOW_WIDTH)
+            if nets[i].activate(inputs)[0] > 0.3:
+                bird.jump()
+        # The simulator stops after moving the birds, before the next collision checks
+        if frames > MAX_FRAMES:
+            break
+
+        add_pipe = False
+        removed = []
+        dead = set()
+        for pipe in pipes:
+            for i in living:
+                if pipe.collide(birds[i]):
+                    fitness[i] -= 5
+                    dead.add(i)
+            if not pipe.passed and pipe.x < 230:
+                pipe.passed = add_pipe = True
+            if pipe.x + fb.ASSETS.pipe_top_img.get_width() < 0:
+                removed.append(pipe)
+        living = [i for i in living if i not in dead]
+        for pipe in pipes:
+            pipe.move()
+        if add_pipe:
+            score += 1
+            for i in living:
+                fitness[i] += 15
+            pipes.append(fb.Pipe(600, course[created]))
+            created += 1
+        for pipe in removed:
+            pipes.remove(pipe)
+
+        out = [i for i in living if birds[i].y + birds[i].img.get_height() >= 730 or birds[i].y < 0]
+        for i in out:
+            fitness[i] -= 10
+        living = [i for i in living if i not in out]
+        for i in living:
+            birds[i].animate()
+    return np.array(fitness), score
+
+
+def simulated_episode(genomes, config, course):
+    nets = [neat.nn.FeedForwardNetwork.create(g, config) for g in genomes]
+    sim = PopulationSimulator(len(genomes), fb.pipe_collisions, course=course,
+                              bird_height=fb.ASSETS.bird_imgs[0].get_height(),
+                              pipe_width=fb.ASSETS.pipe_img.get_width(),
+                              pipe_height=fb.ASSETS.pipe_img.get_height())
+    inputs = sim.reset()
+    while not sim.done and sim.frames <= MAX_FRAMES:
+        jumps = np.zeros(len(genomes), dtype=bool)
+        for i in sim.alive_indices():
+            jumps[i] = nets[i].activate(inputs[i].tolist())[0] > 0.3
+        inputs, _, _ = sim.step(jumps)
+    return sim.fitness, sim.score
+
+
+def test_simulator_matches_bird_and_pipe_loop(config):
+    genomes = steering_genomes(config, 12, seed=1) + evolved_genomes(config, 12, seed=2)
+    for seed in (3, 4):
+        course = get_course(seed)
+        expected, expected_score = reference_episode(genomes, config, course)
+        fitness, score = simulated_episode(genomes, config, course)
+        assert expected_score >= 10  # Long enough to pass, spawn and remove pipes
+        assert score == expected_score
+        assert np.array_equal(fitness, expected)
@@ -0,0 +1,46 @@
+"""VectorizedSpeciesSet against neat's DefaultSpeciesSet."""
+
+import copy
+import random
+
+import neat
+import pytest
+from neat.reporting import ReporterSet
+
+from compact_genome import CompactGenome
+from conftest import evolved_genomes, load_config
+from speciation import VectorizedSpeciesSet
+
+
+def species_state(species_set):
+    return ({sid: (s.representative.key, sorted(s.members)) for sid, s in species_set.species.items()},
+            species_set.genome_to_species)
+
+
+@pytest.mark.parametrize("genome_type", [neat.DefaultGenome, CompactGenome], ids=["default", "compact"])
+def test_species_match_default_species_set(genome_type):
+    config = load_config(genome_type, VectorizedSpeciesSet)
+    config.species_set_config.compatibility_threshold = 1.5  # Many species, so assignments are contested
+    vectorized = VectorizedSpeciesSet(config.species_set_config, ReporterSet())
+    default = neat.DefaultSpeciesSet(config.species_set_config, ReporterSet())
+
+    genomes = evolved_genomes(config, 150, seed=19, mutations=10)
+    rng = random.Random(20)
+    next_key = len(genomes)
+    for generation in range(4):
+        population = {g.key: g for g in genomes}
+        vectorized.speciate(config, population, generation)
+        default.speciate(config, population, generation)
+        assert species_state(vectorized) == species_state(default)
+
+        # Keep some genomes, including former representatives, and add mutated children
+        survivors = rng.sample(genomes, len(genomes) // 2)
+        children = []
+        for parent in rng.choices(genomes, k=len(genomes) - len(survivors)):
+            child = copy.deepcopy(parent)
+            child.key = next_key
+            next_key += 1
+            child.mutate(config.genome_config)
+            children.append(child)
+        genomes = survivors + children
+    assert len(default.species) > 5
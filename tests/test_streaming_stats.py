@@ -0,0 +1,33 @@
+"""StreamingStatsReporter's log on new and resumed runs."""
+
+import neat
+import pytest
+
+from streaming_stats import FIELDS, StreamingStatsReporter, read_stats
+
+
+def run_generation(config, reporter, generation):
+    population = neat.Population(config)
+    for i, genome in enumerate(population.population.values()):
+        genome.fitness = float(i)
+    best = max(population.population.values(), key=lambda g: g.fitness)
+    reporter.start_generation(generation)
+    reporter.post_evaluate(config, population.population, population.species, best)
+    reporter.end_generation(config, population.population, population.species)
+
+
+def test_new_runs_overwrite_and_resumed_runs_append(config, tmp_path):
+    path = str(tmp_path / "stats.csv")
+    for generations, append in ((range(3), False), (range(2), False), (range(2, 4), True)):
+        reporter = StreamingStatsReporter(path, append=append)
+        for generation in generations:
+            run_generation(config, reporter, generation)
+        reporter.close()
+    assert [row["generation"] for row in read_stats(path)] == [0, 1, 2, 3]
+
+
+def test_appending_needs_the_same_columns(tmp_path):
+    path = tmp_path / "stats.csv"
+    path.write_text(",".join(FIELDS[:-1]) + "\n")
+    with pytest.raises(ValueError):
+        StreamingStatsReporter(str(path), append=True)